@@ -0,0 +1,96 @@
+""" Bounded cache for markup conversions shared by the transceivers """
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+DEFAULT_MAX_ENTRIES = 8192
+
+
+class ConversionCache:
+    """ least recently used cache for converted field contents; entries are keyed by
+    (direction, content hash, config), so the same text converted in another direction or with
+    another config is a separate entry
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        :param max_entries: maximum number of cached conversions, 0 disables the cache
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(direction: str, content: str, config: Hashable = None) -> tuple:
+        """ builds the cache key of a conversion
+
+        :param direction: name of the conversion, e.g. 'jira_to_xhtml'
+        :param content: content to convert
+        :param config: hashable value of everything else the result depends on
+        :returns: cache key
+        """
+        content_hash = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+        return direction, content_hash, config
+
+    def convert(self, direction: str, content: str, conversion: Callable[[str], str],
+                config: Hashable = None) -> str:
+        """ returns the cached result of the conversion or converts and caches the content
+
+        :param direction: name of the conversion, e.g. 'jira_to_xhtml'
+        :param content: content to convert
+        :param conversion: function converting the content
+        :param config: hashable value of everything else the result depends on
+        :returns: converted content
+        """
+        if not self.max_entries:
+            return conversion(content)
+
+        key = self.make_key(direction, content, config)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        converted = conversion(content)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = converted
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return converted
+
+    def clear(self):
+        """ removes all entries and resets the counters """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def add_stats(self, hits: int, misses: int):
+        """ adds the counters of a cache in another process, e.g. a worker process converting a
+        part of the document; its entries stay in that process
+
+        :param hits: number of hits of the other cache
+        :param misses: number of misses of the other cache
+        """
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def stats(self) -> dict:
+        """ returns the hit and miss counters
+
+        :returns: dictonary with hits, misses and the current number of entries
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+CONVERSION_CACHE = ConversionCache()
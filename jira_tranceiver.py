@@ -1,7 +1,15 @@
-import asyncio
+import hashlib
+import json
 import logging
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import chain
 from typing import List, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from em_jira.exceptions import InvalidArgumentsException
 from em_jira.jira import Jira, JiraCFMapping as jconst
@@ -9,6 +17,7 @@ from em_utils.exceptions import UserErrorList
 from em_utils.progress import progress
 from jira import JIRAError, Issue
 
+from requirements.conversion_cache import CONVERSION_CACHE
 from requirements.exceptions import UserError
 from requirements.helpers import parse_enum_entry
 from requirements.summary_helpers import get_summary_from_description
@@ -20,7 +29,7 @@ from requirements.jira.jira_helper import parse_req_id, parse_status, parse_link
 from requirements.jira.jira_requirement import JiraRequirement
 from requirements.req_tree import ReqTree
 from requirements.requirement import RequirementCategory, InternalStatus, RequirementAttributes, \
-    RequirementStatus, Requirement, MAX_LENGTH_SUMMARY
+    RequirementStatus, Requirement, MAX_LENGTH_SUMMARY, xhtml_to_raw
 from requirements.xhtml_config import DEFAULT_BOLD, DEFAULT_LIST, DEFAULT_LIST_TYPE, DEFAULT_SUB, \
     DEFAULT_SUP, \
     DEFAULT_ITALIC, DEFAULT_IMAGE, DEFAULT_STRIKE_TROUGH, DEFAULT_TABLE_HEAD, DEFAULT_TABLE_CELL, \
@@ -32,6 +41,9 @@ from em_jira.jira_custom_field_mapping import JiraCFMapping
 _reporter = progress.get_reporter(__name__)
 _logger = logging.getLogger(__name__)
 
+# hours the timezone of a jira user can be behind UTC
+_MAX_UTC_OFFSET_BEHIND = 12
+
 BOLD = r'\*.*\*'
 LIST = r'\* .*'
 SUP = r'\^.*\^'
@@ -40,6 +52,144 @@ ITALIC = r' \_.*?\_ '
 STRIKE_THROUGH = r' \-.*?\- '
 IMAGE = '!\w+\.\w+!'
 TABLE = r'\|\|.*\|'
+XHTML_TABLE = re.compile(re.escape(DEFAULT_TABLE_HEAD) + '(.*?)' + re.escape(DEFAULT_TABLE_HEAD.replace('<', '</')),
+                         re.DOTALL)
+XHTML_TABLE_ROW = re.compile(re.escape(DEFAULT_TABLE_ROW) + '(.*?)' + re.escape(DEFAULT_TABLE_ROW.replace('<', '</')),
+                             re.DOTALL)
+XHTML_TABLE_CELL = re.compile(re.escape(DEFAULT_TABLE_CELL) + '(.*?)' +
+                              re.escape(DEFAULT_TABLE_CELL.replace('<', '</')), re.DOTALL)
+# a header row of a Jira table only has '||' as cell delimiters, a body row only '|'
+JIRA_TABLE_HEADER_ROW = re.compile(r'\|\|(?:[^|]*\|\|)+')
+_WHITESPACE = re.compile(r'\s+')
+
+_MARKUP_TAGS = {'*': DEFAULT_BOLD, '~': DEFAULT_SUB, '^': DEFAULT_SUP, '_': DEFAULT_ITALIC,
+                '-': DEFAULT_STRIKE_TROUGH}
+_MARKUP_CHARS = re.compile(r'[*~^_\-!]')
+# single scan over text effects, images and lists; a text effect is one of:
+# - 'content': span after start or whitespace, closed by the next markup char as long as some
+#   later markup char is followed by [\s.!?:]
+# - 'end_content': span at the very end of the string after [\s.!?:]
+# - 'whole_content': span from start to end of the string
+JIRA_MARKUP = re.compile(
+    r'(?:^|(?<=\s))(?P<char>[*~^_\-])(?P<content>(?:(?!(?P=char)).)*)(?P=char)'
+    r'(?=[\s.!?:]|.*?(?P=char)[\s.!?:])'
+    r'|(?<=[\s.!?:])(?P<end_char>[*~^_\-])(?P<end_content>(?:(?!(?P=end_char)).)*)(?P=end_char)$'
+    r'|^(?P<whole_char>[*~^_\-])'
+    r'(?!.*[\s.!?:](?P=whole_char)(?:(?!(?P=whole_char)).)*(?P=whole_char)$)'
+    r'(?P<whole_content>.*)(?P=whole_char)$'
+    r'|!(?P<image>\w+\.\w+)!'
+    r'|(?P<list>\* )')
+
+# jira fields that represent a single requirement attribute; satisfies is left out, because it
+# also triggers the update of the links
+_FIELD_ATTRIBUTES = {
+    jconst.SUMMARY: RequirementAttributes.SUMMARY,
+    jconst.DESCRIPTION: RequirementAttributes.CONTENT,
+    jconst.ISSUETYPE: RequirementAttributes.CATEGORY,
+    jconst.STATUS_CUSTOMER: RequirementAttributes.STATUS_CUSTOMER,
+    jconst.REVIEW_COMMENTS: RequirementAttributes.REVIEW_COMMENTS,
+    jconst.CUSTOMER_COMMENTS: RequirementAttributes.CUSTOMER_COMMENTS,
+    jconst.INTERNAL_COMMENTS: RequirementAttributes.INTERNAL_COMMENTS,
+    jconst.REQUIREMENT_ID: RequirementAttributes.REQ_ID,
+    jconst.ASIL: RequirementAttributes.ASIL,
+    jconst.TEST_LEVELS: RequirementAttributes.TEST_LEVELS,
+    jconst.FIX_VERSIONS: RequirementAttributes.RELEASE,
+}
+
+
+def _normalize_field_value(value):
+    """ Reduces the value of a field, as read from jira or as written to it, to what is compared;
+    options, versions and components to their value or name, lists independent of their order
+
+    :param value: value of a jira field
+    :returns: normalized value that can be serialized as json
+    """
+    if isinstance(value, dict):
+        for key in ("value", "name", "key"):
+            if key in value:
+                return _normalize_field_value(value[key])
+        return json.dumps(value, sort_keys=True, default=str)
+    if isinstance(value, list):
+        return sorted((_normalize_field_value(_item) for _item in value), key=str) or None
+    if isinstance(value, str):
+        return value.replace('\r\n', '\n').strip() or None
+    return value
+
+
+def _field_digest(value) -> bytes:
+    """ Digest of the normalized value of a jira field
+
+    :param value: value of a jira field
+    :returns: digest of the value
+    """
+    normalized = json.dumps(_normalize_field_value(value), sort_keys=True, default=str)
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).digest()
+
+
+def _get_set_values(operations: list) -> list:
+    """ Values set by the operations of a field in the update dict of the jira rest api
+
+    :param operations: operations of a field, e.g. [{"set": [...]}]
+    :returns: list of the values that are set
+    """
+    return [_value for _operation in operations for _value in _operation.get("set", [])]
+
+
+class RateLimiter:
+    """ Limits the rate of requests to a host over all threads """
+
+    def __init__(self, requests_per_second: float = None):
+        self.requests_per_second = requests_per_second
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_request = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """ Blocks until the next request to the host is allowed """
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            request_time = max(self._next_request, now)
+            self._next_request = request_time + self._interval
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, requests_per_second: float = None) -> RateLimiter:
+    """ Gets the rate limiter of a host, so that all tranceivers talking to the same host
+    share one limit. The limit of the first tranceiver of a host is kept, another limit is
+    only reported.
+
+    :param host: url of the jira server
+    :param requests_per_second: maximum number of requests per second, None for no limit
+    :returns: the RateLimiter of the host
+    """
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter(requests_per_second)
+        elif _rate_limiters[host].requests_per_second != requests_per_second:
+            _logger.warning("The requests to %s are already limited to %s per second, "
+                            "the limit %s is ignored", host,
+                            _rate_limiters[host].requests_per_second, requests_per_second)
+        return _rate_limiters[host]
+
+
+def _is_retryable(ex: JIRAError, retry_server_errors: bool) -> bool:
+    """ Checks if a failed jira request should be retried
+
+    :param ex: error of the failed request
+    :param retry_server_errors: if server errors (5xx) should be retried,
+                                should be False for requests that are not idempotent
+    :returns: True for 429 (too many requests) and, if enabled, for 5xx
+    """
+    if ex.status_code == 429:
+        return True
+    return retry_server_errors and ex.status_code is not None and 500 <= ex.status_code < 600
 
 
 def get_attachment_hashes_from_description(description: str):
@@ -64,7 +214,10 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
                  labels: list = None, link_map: dict = None, use_implements: bool = False,
                  move_deleted: bool = True, updated_attributes: list = None,
                  deleted_folder: str = None, unit_template: str = None, config_filter: dict = None,
-                 read_reqs_from_folder: bool = False):
+                 read_reqs_from_folder: bool = False, bulk_create_size: int = 0,
+                 max_workers: int = 16, requests_per_second: float = None,
+                 max_retries: int = 3, retry_backoff: float = 1.0, snapshot_file: str = None,
+                 snapshot_max_age: float = 24):
         self.req_path = req_path
         self.components = components
         self.labels = labels
@@ -72,6 +225,8 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         self._use_implements = use_implements
         self._move_deleted = move_deleted
         self._updated_attributes = updated_attributes
+        # names of the jira fields that may be updated, derived once from updated_attributes
+        self._updated_field_names = self._get_updated_field_names(updated_attributes)
         self._unit_template = unit_template
 
         self.folder_id = None
@@ -94,6 +249,33 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         self.reqs_processed = 0
         self.config_filter = config_filter
         self.read_reqs_from_folder = read_reqs_from_folder
+        # opt-in, a rejected bulk request fails all issues of its batch instead of a single one
+        self._bulk_create_size = bulk_create_size
+
+        # concurrent execution of the rest calls while writing
+        self._max_workers = max_workers
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._rate_limiter = get_rate_limiter(getattr(jira_instance, "server_url", None),
+                                              requests_per_second)
+        # guards reqs_processed, link_map, existing_jira_components and _component_creations
+        self._lock = threading.Lock()
+        # components that are created right now (name <-> event set after the creation)
+        self._component_creations = {}
+        # raw issues of the last read (jira_id <-> issue dict)
+        self._raw_issues = {}
+        # Jira markup of the xhtml fields of the current read or write
+        # ((jira_id, field) <-> (xhtml, config, markup))
+        self._jira_markup = {}
+        # if set, the issues are read incrementally based on this snapshot of the last read; the
+        # issues are selected by a query of the components and labels then, see _get_filter_jql
+        if snapshot_file and config_filter:
+            _logger.warning("Config filters can not be read incrementally, all issues are read")
+            snapshot_file = None
+        self._snapshot_file = snapshot_file
+        # hours after which all issues are read again, this drops the deleted issues and the
+        # issues not matching the filter anymore from the snapshot
+        self._snapshot_max_age = snapshot_max_age
 
     def read(self):
         """ Retrieves a ReqTree from a jira project
@@ -101,14 +283,54 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         :returns: A ReqTree, holding a list of requirements and the R4J Tree structure of the
                   given req_path
         """
+        self._jira_markup.clear()
 
         # Determine the folder ID from the req_path, this is later needed for linking reqs
         # at the root level
         self._determine_folder_id(self.req_path)
 
+        # Get tree structure from jira with the given req path
+        r4j_tree = self.jira_instance.get_folder_by_id(self.project, self.folder_id).get("issues")
+
         # Get all jira requirement issues for the given components and levels
         _reporter.status("Fetch requirement issues from Jira")
-        if self.config_filter:
+        all_req_issues = self._get_req_issues()
+
+        # Keep the raw issues, so that writing does not need to fetch them again
+        self._raw_issues = {_req_issue["key"]: _req_issue for _req_issue in all_req_issues}
+
+        # Create a list of internal JiraRequirement objects from the jira issues
+        _reporter.start('Convert Jira Issues to Requirement Objects', len(all_req_issues))
+        all_reqs = []
+        for _idx, _req_issue in enumerate(all_req_issues):
+            all_reqs.append(self.raw_to_req(_req_issue, self.link_map))
+            _reporter.progress(_idx + 1)
+        _reporter.finish()
+        _logger.debug("Markup conversion cache: %s", CONVERSION_CACHE.stats())
+
+        # Build child-parent tree
+        req_path_tree = self._build_req_path_tree({req.jira_id: req for req in all_reqs}, r4j_tree)
+
+        # Create an instance of ReqTree that holds all requirements and the requirement tree
+        self.req_tree = ReqTree(req_path_tree, all_reqs)
+
+        return self.req_tree
+
+    def _get_req_issues(self) -> list:
+        """ Gets all jira requirement issues, incrementally if there is a snapshot of the last read
+
+        :returns: list of raw jira issues
+        """
+        server_time = self._get_server_time() if self._snapshot_file else None
+        snapshot = self._load_snapshot(server_time)
+        if snapshot:
+            all_req_issues = self._get_req_issues_from_snapshot(snapshot)
+        elif self._snapshot_file:
+            # the same query as for the incremental reads, so that both select the same issues
+            filter_jql = self._get_filter_jql()
+            all_req_issues = self.jira_instance.get_all_issues_from_query(filter_jql, json_result=True) \
+                if filter_jql else []
+        elif self.config_filter:
             all_req_issues = self.jira_instance.get_issues_by_config_filter(self.project,
                                                                             self.config_filter['type'],
                                                                             self.config_filter['value'],
@@ -126,28 +348,140 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         if self.read_reqs_from_folder:
             self._add_reqs_from_folder(all_req_issues)
 
-        # Create a list of internal JiraRequirement objects from the jira issues
-        _reporter.start('Convert Jira Issues to Requirement Objects', len(all_req_issues))
-        all_reqs = []
-        for _idx, _req_issue in enumerate(all_req_issues):
-            all_reqs.append(self.raw_to_req(_req_issue, self.link_map))
-            _reporter.progress(_idx + 1)
-        _reporter.finish()
+        if self._snapshot_file:
+            full_sync = snapshot["full_sync"] if snapshot else server_time.isoformat()
+            self._save_snapshot(all_req_issues, self._get_sync_time(server_time), full_sync)
 
-        # Get tree structure from jira with the given req path
-        r4j_tree = self.jira_instance.get_folder_by_id(self.project, self.folder_id).get("issues")
+        return all_req_issues
 
-        # Build child-parent tree
-        req_path_tree = self._build_req_path_tree({req.jira_id: req for req in all_reqs}, r4j_tree)
+    def _get_filter_jql(self) -> str:
+        """ Builds the query selecting the requirement issues of the components and labels, it is
+        used for the full and for the incremental reads of a snapshot
 
-        # Create an instance of ReqTree that holds all requirements and the requirement tree
-        self.req_tree = ReqTree(req_path_tree, all_reqs)
+        :returns: JQL string or None if a component does not exist, then no issue is selected
+        """
+        if not all(_cmp in self.existing_jira_components for _cmp in self.components):
+            return None
+        clauses = ['project = "{}"'.format(self.project)]
+        if self.components:
+            clauses.append('component in ({})'.format(', '.join('"{}"'.format(_cmp) for _cmp in self.components)))
+        if self.labels:
+            clauses.append('labels in ({})'.format(', '.join('"{}"'.format(_label) for _label in self.labels)))
+        return ' AND '.join(clauses)
+
+    def _get_folder_jql(self) -> str:
+        """ Builds the query selecting the issues of the requirement folder
+
+        :returns: JQL string
+        """
+        return 'issue in requirementsPath("{}/{}")'.format(self.jira_instance.project(self.project).name,
+                                                           self.req_path)
 
-        return self.req_tree
+    def _load_snapshot(self, server_time: datetime) -> dict:
+        """ Loads the snapshot of the last read, if incremental reading is enabled
+
+        :param server_time: current time of the jira server
+        :returns: snapshot dict or None if there is no (readable) snapshot or all issues have to be
+                  read again
+        """
+        if not self._snapshot_file or not os.path.isfile(self._snapshot_file):
+            return None
+        try:
+            with open(self._snapshot_file, 'r', encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError):
+            _logger.warning("The snapshot %s could not be read, reading all issues",
+                            self._snapshot_file)
+            return None
+        if snapshot.get("project") != self.project or snapshot.get("req_path") != self.req_path or \
+                snapshot.get("filter") != self._get_filter_jql() or \
+                snapshot.get("read_reqs_from_folder") != self.read_reqs_from_folder:
+            return None
+        if not snapshot.get("full_sync") or server_time - datetime.fromisoformat(
+                snapshot["full_sync"]) > timedelta(hours=self._snapshot_max_age):
+            return None
+        return snapshot
+
+    def _save_snapshot(self, all_req_issues: list, sync_time: str, full_sync: str):
+        """ Saves the read issues and the link map as snapshot for the next incremental read
+
+        :param all_req_issues: raw jira issues that were read
+        :param sync_time: jira server time before the issues were fetched, as used in JQL
+        :param full_sync: jira server time of the last read of all issues (ISO format)
+        """
+        snapshot = {
+            "project": self.project,
+            "req_path": self.req_path,
+            "filter": self._get_filter_jql(),
+            "read_reqs_from_folder": self.read_reqs_from_folder,
+            "last_sync": sync_time,
+            "full_sync": full_sync,
+            "issues": all_req_issues,
+            "link_map": self.link_map
+        }
+        tmp_file = self._snapshot_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(tmp_file, self._snapshot_file)
+
+    def _get_server_time(self) -> datetime:
+        """ Gets the current time of the jira server
+
+        :returns: timezone aware datetime
+        """
+        return datetime.strptime(self.jira_instance.server_info()["serverTime"],
+                                 "%Y-%m-%dT%H:%M:%S.%f%z")
+
+    def _get_sync_time(self, server_time: datetime) -> str:
+        """ Converts a time of the jira server to the format used in JQL. JQL reads the time in
+        the timezone of the user profile, so the time is converted to it; if the timezone is not
+        known, the largest offset behind UTC is subtracted instead. As JQL only supports minutes,
+        one minute is subtracted as well to not miss any update.
+
+        :param server_time: timezone aware time of the jira server
+        :returns: time string (yyyy/MM/dd HH:mm)
+        """
+        try:
+            sync_time = server_time.astimezone(ZoneInfo(self.jira_instance.myself()["timeZone"]))
+        except (JIRAError, KeyError, ValueError, ZoneInfoNotFoundError):
+            _logger.warning("The timezone of the jira user is unknown, the incremental read "
+                            "covers the last %s hours more", _MAX_UTC_OFFSET_BEHIND)
+            sync_time = server_time.astimezone(timezone.utc) - timedelta(hours=_MAX_UTC_OFFSET_BEHIND)
+        return (sync_time - timedelta(minutes=1)).strftime("%Y/%m/%d %H:%M")
+
+    def _get_req_issues_from_snapshot(self, snapshot: dict) -> list:
+        """ Patches the issues of the snapshot with the issues updated since the last read, selected
+        by the same query as the full read. Deleted issues and issues not matching the query anymore
+        are only dropped by the next full read, see snapshot_max_age.
+
+        :param snapshot: snapshot of the last read
+        :returns: list of raw jira issues
+        """
+        for req_id, jira_id in snapshot["link_map"].items():
+            self.link_map.setdefault(req_id, jira_id)
+
+        issues = {issue["key"]: issue for issue in snapshot["issues"]}
+        queries = [self._get_filter_jql()]
+        if self.read_reqs_from_folder:
+            # the issues added from the folder are updated as well, missing ones are added afterwards
+            queries.append(self._get_folder_jql())
+        selection = ' OR '.join('({})'.format(_query) for _query in queries if _query)
+        updated_issues = []
+        if selection:
+            updated_issues = self.jira_instance.get_all_issues_from_query(
+                '({}) AND updated >= "{}"'.format(selection, snapshot["last_sync"]), json_result=True)
+        for issue in updated_issues:
+            issues[issue["key"]] = issue
+
+        _reporter.status("Updated {} of {} requirement issues from snapshot".format(
+            len(updated_issues), len(issues)))
+
+        return list(issues.values())
 
     def write(self):
         """ Writes/Updates Jira requirements in a R4J Jira project by the given ReqTree. """
 
+        self._jira_markup.clear()
         self._determine_folder_id(self.req_path)
         self._create_new_reqs(self.req_tree.get_all_requirements_list())
         self._update_reqs(self.req_tree.get_all_requirements_list())
@@ -186,37 +520,137 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
             folder = get_or_create_folder(self.jira_instance, self.project, req_path)
             self.folder_id = folder["id"]
 
+    def _call_jira(self, method, *args, retry_server_errors: bool = True, **kwargs):
+        """ Calls a method of the jira instance, limited to the request rate of the host and
+        retried with exponential backoff if jira answers with 429 or 5xx
+
+        :param method: bound method doing the rest call
+        :param retry_server_errors: if 5xx should be retried, False for non idempotent calls
+        :returns: return value of the method
+        """
+        attempt = 0
+        while True:
+            self._rate_limiter.wait()
+            try:
+                return method(*args, **kwargs)
+            except JIRAError as ex:
+                if attempt >= self._max_retries or not _is_retryable(ex, retry_server_errors):
+                    raise
+                delay = self._retry_backoff * 2 ** attempt
+                retry_after = ex.response.headers.get("Retry-After") \
+                    if ex.response is not None else None
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                _logger.info("Jira request failed with status %s, retrying in %s seconds",
+                             ex.status_code, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _get_issue(self, jira_id: str, fields: list = None) -> Issue:
+        """ Gets a jira issue from the raw issues of the last read. The issue is only fetched,
+        if it was not read or the given fields were not part of the read.
+
+        :param jira_id: key of the jira issue
+        :param fields: fields that are needed from the issue
+        :returns: the jira issue
+        """
+        raw_issue = self._raw_issues.get(jira_id)
+        if raw_issue and raw_issue.get("self") and \
+                all(field in raw_issue["fields"] for field in fields or []):
+            return Issue(self.jira_instance._options,  # pylint: disable=protected-access
+                         self.jira_instance._session,  # pylint: disable=protected-access
+                         raw=raw_issue)
+        return self._call_jira(self.jira_instance.issue, jira_id, fields=fields)
+
+    def _put_issue(self, jira_id: str, fields: dict, update: dict):
+        """ Updates the fields of a jira issue without fetching it
+
+        :param jira_id: key of the jira issue
+        :param fields: fields to set
+        :param update: fields to update with operations (e.g. set)
+        """
+        self.jira_instance._session.put(  # pylint: disable=protected-access
+            self.jira_instance._get_url("issue/{}".format(jira_id)),  # pylint: disable=protected-access
+            data=json.dumps({"fields": fields, "update": update}))
+
+    def _run_concurrently(self, func, reqs: list) -> list:
+        """ Runs the given function for each requirement in a bounded pool of threads
+
+        :param func: function doing the rest calls for a single requirement
+        :param reqs: list of requirements
+        :returns: list of exceptions raised by the function
+        """
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            futures = [executor.submit(func, _req) for _req in reqs]
+        return [future.exception() for future in futures if future.exception()]
+
+    def _increment_processed(self):
+        """ Counts a processed requirement and reports the progress """
+        with self._lock:
+            self.reqs_processed += 1
+            _reporter.progress(self.reqs_processed)
+
+    def _create_missing_components(self, jira_fields_dict: dict):
+        """ Creates components in jira that don't exist yet
+
+        :param jira_fields_dict: fields of an issue
+        """
+        for _cmp in jira_fields_dict.get(jconst.COMPONENTS, []):
+            name = _cmp["name"]
+            # the component is reserved under the lock, the rest call is done without holding it
+            with self._lock:
+                if name in self.existing_jira_components:
+                    continue
+                creation = self._component_creations.get(name)
+                is_creator = creation is None
+                if is_creator:
+                    creation = self._component_creations[name] = threading.Event()
+            if not is_creator:
+                # the issue can only be created after the component was created by another thread
+                creation.wait()
+                continue
+            try:
+                self._call_jira(self.jira_instance.create_component, name, self.project)
+                with self._lock:
+                    self.existing_jira_components.append(name)
+            finally:
+                with self._lock:
+                    del self._component_creations[name]
+                creation.set()
+
     def _link_reqs(self, all_reqs: List[JiraRequirement]):
-        """ Asynchronously updated the links from the give list of requirements
+        """ Concurrently updates the links from the give list of requirements
 
         :param all_reqs: List of requirements to update links for
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
         # Only if the RequirementAttribute LINKS has changed we need to update the links
-        tasks = [
-            self._link_req(_req) for _req in all_reqs if
+        reqs_to_link = [
+            _req for _req in all_reqs if
             RequirementAttributes.LINKS in _req.updated_fields
             or RequirementAttributes.SATISFIES in _req.updated_fields
             or (InternalStatus.CREATED in _req.internal_status and (
                     _req.links or _req.satisfies))]
 
-        if tasks:
-            _reporter.start("Link requirements", len(tasks))
-            loop.run_until_complete(asyncio.wait(tasks))
+        if reqs_to_link:
+            _reporter.start("Link requirements", len(reqs_to_link))
+            for exception in self._run_concurrently(self._link_req, reqs_to_link):
+                _logger.warning("Linking of a requirement failed: %s", str(exception))
             self.reqs_processed = 0
             _reporter.finish()
 
-    async def _link_req(self, jira_req: JiraRequirement):
+    def _link_req(self, jira_req: JiraRequirement):
         """ Updates the links for a given JiraRequirement
 
         :param jira_req: JiraRequirement to update the links for
         """
-        jira_req_issue = self.jira_instance.issue(jira_req.jira_id, fields=[jconst.ISSUELINKS])
+        if InternalStatus.CREATED in jira_req.internal_status:
+            # The issue was just created, so there are no existing links
+            _existing_issue_links = {}
+        else:
+            jira_req_issue = self._get_issue(jira_req.jira_id, fields=[jconst.ISSUELINKS])
 
-        # Get a list of existing links from the jira issue
-        _existing_issue_links = self._get_existing_issue_link_mapping_from_req(jira_req_issue)
+            # Get a list of existing links from the jira issue
+            _existing_issue_links = self._get_existing_issue_link_mapping_from_req(jira_req_issue)
 
         link_id_list = []
         if jira_req.satisfies:
@@ -237,9 +671,10 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
                 continue
 
             try:
-                link_res = self.jira_instance.create_issue_link(
+                link_res = self._call_jira(
+                    self.jira_instance.create_issue_link,
                     "satisfies" if not self._use_implements else 'implements',
-                    jira_req.jira_id, _jira_link_id)
+                    jira_req.jira_id, _jira_link_id, retry_server_errors=False)
                 if link_res.status_code != 201:  # pragma: no cover
                     _logger.warning(
                         "The requirement %s with jira id %s could not be linked with %s",
@@ -254,9 +689,13 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         if _existing_issue_links:
             _reporter.status("Deleting obsolete links")
             for _, link_id in _existing_issue_links.items():
-                self.jira_instance.delete_issue_link(link_id)
-        self.reqs_processed += 1
-        _reporter.progress(self.reqs_processed)
+                self._call_jira(self.jira_instance.delete_issue_link, link_id)
+
+        # The links of the read issue are outdated now
+        raw_issue = self._raw_issues.get(jira_req.jira_id)
+        if raw_issue:
+            raw_issue["fields"].pop(jconst.ISSUELINKS, None)
+        self._increment_processed()
 
     def _get_issue_key_from_link_map(self, _link_id: str) -> str:
         """ Gets the jira issue key for a given req_id from the link map.
@@ -265,15 +704,16 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
                             given here, just return this
         :returns: Issue key of the issue that is represented by the link
         """
-        if self.link_map.get(_link_id):
-            # If _link is an external req_id linking to a jira issue id, use the issue id
-            _link_id = self.link_map[_link_id]
-        elif _link_id in self.link_map.values():
-            # If _link is already an jira issue id, do nothing
-            pass
-        else:
-            # Linked issue could not be found
-            return ''
+        with self._lock:
+            if self.link_map.get(_link_id):
+                # If _link is an external req_id linking to a jira issue id, use the issue id
+                _link_id = self.link_map[_link_id]
+            elif _link_id in self.link_map.values():
+                # If _link is already an jira issue id, do nothing
+                pass
+            else:
+                # Linked issue could not be found
+                return ''
         return _link_id
 
     @staticmethod
@@ -294,125 +734,181 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         return _existing_issue_links
 
     def _transition_reqs(self, all_reqs: List[JiraRequirement]):
-        """ Asynchronously transitions the Requirements from the given list.
+        """ Concurrently transitions the Requirements from the given list.
 
         :param all_reqs: List of Requirements where to look up for transitions to make
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
         error_list = UserErrorList()
-        # Only create a task for Requirements that have the RequirementAttribute STATUS in the
+        # Only transition Requirements that have the RequirementAttribute STATUS in the
         # set of updated attributes and have a status set
-        tasks = [self._transition_req(_req) for _req in all_reqs if
-                 (RequirementAttributes.STATUS in _req.updated_fields
-                  or InternalStatus.CREATED in _req.internal_status)
-                 and _req.status is not None]
-
-        if tasks:
-            _reporter.start("Transition requirements", len(tasks))
-            result = loop.run_until_complete(asyncio.wait(tasks))
+        reqs_to_transition = [_req for _req in all_reqs if
+                              (RequirementAttributes.STATUS in _req.updated_fields
+                               or InternalStatus.CREATED in _req.internal_status)
+                              and _req.status is not None]
+
+        if reqs_to_transition:
+            _reporter.start("Transition requirements", len(reqs_to_transition))
+            exceptions = self._run_concurrently(self._transition_req, reqs_to_transition)
             self.reqs_processed = 0
-            for res in result:
-                for task in res:
-                    if task._exception:
-                        error_list.add_message(task._exception.args[0])
+            for exception in exceptions:
+                error_list.add_message(exception.args[0])
             if error_list.get_messages():
                 raise error_list
             _reporter.finish()
 
-    async def _transition_req(self, jira_req: JiraRequirement):
+    def _transition_req(self, jira_req: JiraRequirement):
         """ Transitions a single requirement to another status in jira
 
         :param jira_req: JiraRequirement that should be transitioned to another status
         """
         try:
-            jira_req_issue = self.jira_instance.issue(jira_req.jira_id)
+            jira_req_issue = self._get_issue(jira_req.jira_id)
 
             # the status is ACCEPTED or REJECTED, the transition needs to be to status Done
             if jira_req.status == RequirementStatus.ACCEPTED:
-                self.jira_instance.transition_issue_status(jira_req_issue, "Done",
-                                                           transition_name="Accept Issue")
+                self._call_jira(self.jira_instance.transition_issue_status, jira_req_issue,
+                                "Done", transition_name="Accept Issue")
             elif jira_req.status == RequirementStatus.REJECTED:
-                self.jira_instance.transition_issue_status(jira_req_issue, "Done",
-                                                           transition_name="Reject Issue")
+                self._call_jira(self.jira_instance.transition_issue_status, jira_req_issue,
+                                "Done", transition_name="Reject Issue")
             # the status is another one, so just use the value from the RequirementStatus Enum
             else:
-                self.jira_instance.transition_issue_status(jira_req_issue, jira_req.status.value)
-            self.reqs_processed += 1
-            _reporter.progress(self.reqs_processed)
+                self._call_jira(self.jira_instance.transition_issue_status, jira_req_issue,
+                                jira_req.status.value)
+            self._increment_processed()
         except JIRAError as ex:
             raise UserError(
-                'JIRAError during asyncronus transitioning of {}: {}'.format(jira_req.req_id,
+                'JIRAError during concurrent transitioning of {}: {}'.format(jira_req.req_id,
                                                                              ex.text))
 
     def _create_new_reqs(self, all_reqs: List[Union[JiraRequirement, Requirement]]):
-        """ Aynchronously creates new jira issues from the given list of requirements-
+        """ Creates new jira issues from the given list of requirements. If a bulk create size is
+        set, the issues are created in batches via the bulk endpoint, otherwise concurrently
+        one by one.
 
         :param all_reqs: List of Requirements where to look for new ones in
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        error_list = UserErrorList()
-        # Only create tasks for requirements that are marked as CREATED
-        tasks = [self._create_new_req(_req) for _req in all_reqs if
-                 InternalStatus.CREATED in _req.internal_status]
+        # Only create requirements that are marked as CREATED
+        new_reqs = [_req for _req in all_reqs if InternalStatus.CREATED in _req.internal_status]
+
+        if new_reqs and self._bulk_create_size:
+            self._create_new_reqs_in_bulk(new_reqs)
+        elif new_reqs:
+            error_list = UserErrorList()
 
-        if tasks:
-            _reporter.start("Creating new reqs", len(tasks))
-            result = loop.run_until_complete(asyncio.wait(tasks))
+            _reporter.start("Creating new reqs", len(new_reqs))
+            exceptions = self._run_concurrently(self._create_new_req, new_reqs)
             self.reqs_processed = 0
-            for res in result:
-                for task in res:
-                    if task._exception:
-                        error_list.add_message(task._exception.args[0])
+            for exception in exceptions:
+                error_list.add_message(exception.args[0])
             if error_list.get_messages():
                 raise error_list
             _reporter.finish()
 
-    async def _create_new_req(self, req: Union[JiraRequirement, Requirement]):
+    def _create_new_reqs_in_bulk(self, new_reqs: List[Union[JiraRequirement, Requirement]]):
+        """ Creates new jira issues in batches of the bulk create size via the bulk endpoint.
+        The keys of the created issues are mapped back to the requirements, requirements that
+        could not be created are reported all together.
+
+        :param new_reqs: List of Requirements that should be created in jira
+        """
+        error_list = UserErrorList()
+        _reporter.start("Creating new reqs", len(new_reqs))
+        for idx in range(0, len(new_reqs), self._bulk_create_size):
+            batch_reqs = []
+            batch_fields = []
+            for req in new_reqs[idx:idx + self._bulk_create_size]:
+                try:
+                    batch_fields.append(self._get_fields_for_creation(req))
+                    batch_reqs.append(req)
+                except JIRAError as ex:
+                    error_list.add_message(
+                        'JIRAError during bulk creation of {}: {}'.format(req.req_id, ex.text))
+
+            if not batch_fields:
+                continue
+
+            try:
+                results = self._call_jira(self.jira_instance.create_issues,
+                                          field_list=batch_fields, prefetch=False,
+                                          retry_server_errors=False)
+            except JIRAError as ex:
+                for req in batch_reqs:
+                    error_list.add_message(
+                        'JIRAError during bulk creation of {}: {}'.format(req.req_id, ex.text))
+                continue
+
+            # The results are in the same order as the given field list
+            for req, result in zip(batch_reqs, results):
+                if result["status"] == "Success":
+                    req.jira_id = result["issue"].key
+                    # fill link map with all requirements, since each req can be linked to each req
+                    with self._lock:
+                        self.link_map[req.req_id] = req.jira_id
+                else:
+                    error_list.add_message(
+                        'JIRAError during bulk creation of {}: {}'.format(req.req_id,
+                                                                          result["error"]))
+                self._increment_processed()
+
+        self.reqs_processed = 0
+        if error_list.get_messages():
+            raise error_list
+        _reporter.finish()
+
+    def _create_new_req(self, req: Union[JiraRequirement, Requirement]):
         """ Creates a new jira issue from a given Requirement
 
         :param req: Requirement that should be created in jira
         """
 
-        # Convert the Requirement object to a dict as needed by the Jira API
         try:
-            raw_update_req = self._req_to_raw(req)
-            jira_fields_dict = raw_update_req["fields"]
-            jira_update_dict = raw_update_req["update"]
-            jira_fields_dict[jconst.PROJECT] = self.project
-
-            # Append tranceiver specific components to the list of components for the issue
-            if self.components:
-                existing_components = jira_fields_dict.get(jconst.COMPONENTS, [])
-                existing_components.extend([
-                    {"name": component}
-                    for component in self.components
-                ])
-                jira_fields_dict[jconst.COMPONENTS] = existing_components
-
-            # Create components in jira that don't exist yet
-            for _cmp in jira_fields_dict.get(jconst.COMPONENTS, []):
-                if _cmp["name"] not in self.existing_jira_components:
-                    self.jira_instance.create_component(_cmp["name"], self.project)
-                    self.existing_jira_components.append(_cmp["name"])
-
-            # Set tranceiver specific labels for the issue
-            if self.labels:
-                jira_fields_dict[jconst.LABELS] = self.labels
-
-            # Add update fields (format with set) to fields dict
-            # because the create expects another format then update
-            add_update_values_to_fields_dict(jira_update_dict, jira_fields_dict)
-            new_jira_req = self.jira_instance.create_issue(fields=jira_fields_dict, prefetch=False)
+            jira_fields_dict = self._get_fields_for_creation(req)
+            new_jira_req = self._call_jira(self.jira_instance.create_issue,
+                                           fields=jira_fields_dict, prefetch=False,
+                                           retry_server_errors=False)
             req.jira_id = new_jira_req.key
             # fill link map with all requirements, since each req can be linked to each req
-            self.link_map[req.req_id] = req.jira_id
-            self.reqs_processed += 1
-            _reporter.progress(self.reqs_processed)
+            with self._lock:
+                self.link_map[req.req_id] = req.jira_id
+            self._increment_processed()
         except JIRAError as ex:
             raise UserError(
-                'JIRAError during asyncronus creation of {}: {}'.format(req.req_id, ex.text))
+                'JIRAError during concurrent creation of {}: {}'.format(req.req_id, ex.text))
+
+    def _get_fields_for_creation(self, req: Union[JiraRequirement, Requirement]) -> dict:
+        """ Converts a Requirement to the fields dict as needed to create a jira issue and
+        creates the components that don't exist in jira yet
+
+        :param req: Requirement that should be created in jira
+        :returns: fields dict for the creation of the jira issue
+        """
+        # Convert the Requirement object to a dict as needed by the Jira API
+        raw_update_req = self._req_to_raw(req)
+        jira_fields_dict = raw_update_req["fields"]
+        jira_update_dict = raw_update_req["update"]
+        jira_fields_dict[jconst.PROJECT] = self.project
+
+        # Append tranceiver specific components to the list of components for the issue
+        if self.components:
+            existing_components = jira_fields_dict.get(jconst.COMPONENTS, [])
+            existing_components.extend([
+                {"name": component}
+                for component in self.components
+            ])
+            jira_fields_dict[jconst.COMPONENTS] = existing_components
+
+        # Create components in jira that don't exist yet
+        self._create_missing_components(jira_fields_dict)
+
+        # Set tranceiver specific labels for the issue
+        if self.labels:
+            jira_fields_dict[jconst.LABELS] = self.labels
+
+        # Add update fields (format with set) to fields dict
+        # because the create expects another format then update
+        add_update_values_to_fields_dict(jira_update_dict, jira_fields_dict)
+        return jira_fields_dict
 
     def _recursive_move(self, reqs: List[JiraRequirement]):
         """ Traverses the given list of requirements and is recursively called for the children
@@ -477,26 +973,34 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
                                                             jira_req.jira_id)
 
     def _update_reqs(self, all_reqs: List[JiraRequirement]):
-        """ Asynchronously updates jira requirement issues by the given list of JiraRequirements
+        """ Concurrently updates jira requirement issues by the given list of JiraRequirements
 
         :param all_reqs: List of Requirements, where to look for updated ones
         """
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
         error_list = UserErrorList()
-        # Only create tasks for requirements that have the Internal Status UPDATED
-        tasks = [self._update_req(_req) for _req in all_reqs if
-                 InternalStatus.UPDATED in _req.internal_status and _req.updated_fields - {
-                     RequirementAttributes.LINKS, RequirementAttributes.STATUS}]
-
-        if tasks:
-            _reporter.start("Updating existing reqs", len(tasks))
-            result = loop.run_until_complete(asyncio.wait(tasks))
+        # Only update requirements that have the Internal Status UPDATED
+        reqs_to_update = [_req for _req in all_reqs if
+                          InternalStatus.UPDATED in _req.internal_status and _req.updated_fields - {
+                              RequirementAttributes.LINKS, RequirementAttributes.STATUS}]
+
+        # Skip requirements whose fields equal the issue as read from jira
+        updates = []
+        for jira_req in reqs_to_update:
+            jira_fields_dict, jira_update_dict = self._get_changed_fields(
+                jira_req, *self._get_update_dicts(jira_req))
+            if jira_fields_dict or jira_update_dict:
+                updates.append((jira_req, jira_fields_dict, jira_update_dict))
+            else:
+                self._set_updated_fields(jira_req, jira_fields_dict, jira_update_dict)
+        if len(updates) < len(reqs_to_update):
+            _logger.info("Skipped %s requirements without changes", len(reqs_to_update) - len(updates))
+
+        if updates:
+            _reporter.start("Updating existing reqs", len(updates))
+            exceptions = self._run_concurrently(lambda update: self._update_req(*update), updates)
             self.reqs_processed = 0
-            for res in result:
-                for task in res:
-                    if task._exception:
-                        error_list.add_message(task._exception.args[0])
+            for exception in exceptions:
+                error_list.add_message(exception.args[0])
             if error_list.get_messages():
                 raise error_list
             _reporter.finish()
@@ -555,26 +1059,21 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         if update_components:
             attributes.append("components")
 
-    def _check_attributes_to_update(self, jira_fields_dict: dict,
-                                    jira_req: JiraRequirement) -> dict:
-        """ only the attributes that where changed should be updated
-            these attributes are in the list self._updated_attributes
-
-            :param jira_fields_dict: all fields of one requirement
-                                    {jira_attribute: value}
+    @staticmethod
+    def _get_updated_field_names(updated_attributes: list) -> list:
+        """ maps the attributes that are supposed to get updated to the names of the jira fields
 
-            :return: fields of one requirement that should be updated
-                                    {jira_attribute: value}
+        :param updated_attributes: RequirementAttributes or attribute names, None to update all
+        :returns: list of attribute and jira field names or None
         """
-        checked_jira_fields_dict = dict()
-        attributes = list()
+        if not updated_attributes:
+            return None
 
-        # because this function is called after _req_to_raw
+        # because the names are compared with the result of _req_to_raw
         # the attribute names have to comply with the jira naming
         # especially the custom fields
-        # the attributes that are supposed to update get
-        # matched here:
-        for attr in self._updated_attributes:
+        attributes = list()
+        for attr in updated_attributes:
             # string if from fix_value, dict if from updated_attributes
             if isinstance(attr, RequirementAttributes):
                 attr = attr.value.name
@@ -590,14 +1089,30 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
                 attributes.append("summary")
             attributes.append("description")
 
-        self._check_component_values(attributes, jira_req)
-
         if "release" in attributes:
             attributes.append("fixVersions")
 
         if "category" in attributes:
             attributes.append("issuetype")
 
+        return attributes
+
+    def _check_attributes_to_update(self, jira_fields_dict: dict,
+                                    jira_req: JiraRequirement) -> dict:
+        """ only the attributes that where changed should be updated
+            these attributes are in the list self._updated_attributes
+
+            :param jira_fields_dict: all fields of one requirement
+                                    {jira_attribute: value}
+
+            :return: fields of one requirement that should be updated
+                                    {jira_attribute: value}
+        """
+        checked_jira_fields_dict = dict()
+        attributes = list(self._updated_field_names)
+
+        self._check_component_values(attributes, jira_req)
+
         # just take the attributes that are supposed to be updated
         # from the jira_fields_dict
         for key, value in jira_fields_dict.items():
@@ -612,50 +1127,103 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
 
         return checked_jira_fields_dict
 
-    async def _update_req(self, jira_req: JiraRequirement):
-        """ Updates a single jira requirement issue by a JiraRequirement
+    def _get_update_dicts(self, jira_req: JiraRequirement) -> tuple:
+        """ Builds the fields and update dicts to update the issue of a requirement
 
         :param jira_req: JiraRequirement whose representing jira issue should be updated
+        :returns: tuple of fields dict and update dict as needed for the jira rest api
         """
-        try:
-            # Get update dict as needed for the jira rest api
-            raw_update_req = self._req_to_raw(jira_req)
+        # Get update dict as needed for the jira rest api
+        raw_update_req = self._req_to_raw(jira_req)
 
-            if self._updated_attributes:
-                jira_fields_dict = self._check_attributes_to_update(raw_update_req["fields"],
-                                                                    jira_req)
-            else:
-                jira_fields_dict = raw_update_req["fields"]
-            jira_update_dict = raw_update_req["update"]
-
-            # Append tranceiver specific components to the list of components for the issue
-            if self.components:
-                existing_components = jira_fields_dict.get(jconst.COMPONENTS, [])
-                existing_components.extend([
-                    {"name": component}
-                    for component in self.components
-                ])
-                jira_fields_dict[jconst.COMPONENTS] = existing_components
+        if self._updated_field_names is not None:
+            jira_fields_dict = self._check_attributes_to_update(raw_update_req["fields"],
+                                                                jira_req)
+        else:
+            jira_fields_dict = raw_update_req["fields"]
+        jira_update_dict = raw_update_req["update"]
+
+        # Append tranceiver specific components to the list of components for the issue
+        if self.components:
+            existing_components = jira_fields_dict.get(jconst.COMPONENTS, [])
+            existing_components.extend([
+                {"name": component}
+                for component in self.components
+            ])
+            jira_fields_dict[jconst.COMPONENTS] = existing_components
+
+        # Set tranceiver specific labels for the issue
+        if self.labels:
+            jira_fields_dict[jconst.LABELS] = self.labels
 
+        return jira_fields_dict, jira_update_dict
+
+    def _get_changed_fields(self, jira_req: JiraRequirement, jira_fields_dict: dict,
+                            jira_update_dict: dict) -> tuple:
+        """ Compares the fields to write with the issue as last read from or written to jira by
+        their digests and keeps the fields that changed
+
+        :param jira_req: JiraRequirement whose representing jira issue should be updated
+        :param jira_fields_dict: fields dict as needed for the jira rest api
+        :param jira_update_dict: update dict as needed for the jira rest api
+        :returns: tuple of the fields dict and the update dict with the changed fields only
+        """
+        issue = self._raw_issues.get(jira_req.jira_id)
+        if issue is None:
+            # without the issue of the last read every field is written
+            return jira_fields_dict, jira_update_dict
+        issue_fields = issue["fields"]
+
+        changed_fields_dict = {
+            _field: _value for _field, _value in jira_fields_dict.items()
+            if _field_digest(_value) != _field_digest(issue_fields.get(_field))
+        }
+        changed_update_dict = {
+            _field: _operations for _field, _operations in jira_update_dict.items()
+            if _field_digest(_get_set_values(_operations)) != _field_digest(issue_fields.get(_field))
+        }
+        return changed_fields_dict, changed_update_dict
+
+    @staticmethod
+    def _set_updated_fields(jira_req: JiraRequirement, jira_fields_dict: dict, jira_update_dict: dict):
+        """ sets the updated_fields of the requirement to the attributes whose fields changed; only
+        called once the changes are in jira, so that a failed update keeps them
+
+        :param jira_req: JiraRequirement whose representing jira issue was compared
+        :param jira_fields_dict: fields dict with the changed fields only
+        :param jira_update_dict: update dict with the changed fields only
+        """
+        detected_attributes = {_FIELD_ATTRIBUTES[_field] for _field in chain(jira_fields_dict, jira_update_dict)
+                               if _field in _FIELD_ATTRIBUTES}
+        updated_fields = jira_req.updated_fields
+        updated_fields.difference_update(set(_FIELD_ATTRIBUTES.values()) - detected_attributes)
+        updated_fields.update(detected_attributes)
+
+    def _update_req(self, jira_req: JiraRequirement, jira_fields_dict: dict, jira_update_dict: dict):
+        """ Updates a single jira requirement issue by a JiraRequirement
+
+        :param jira_req: JiraRequirement whose representing jira issue should be updated
+        :param jira_fields_dict: fields dict as needed for the jira rest api
+        :param jira_update_dict: update dict as needed for the jira rest api
+        """
+        try:
             # Create components in jira that don't exist yet
-            for _cmp in jira_fields_dict[jconst.COMPONENTS]:
-                if _cmp["name"] not in self.existing_jira_components:
-                    self.jira_instance.create_component(_cmp["name"], self.project)
-                    self.existing_jira_components.append(_cmp["name"])
-
-            # Set tranceiver specific labels for the issue
-            if self.labels:
-                jira_fields_dict[jconst.LABELS] = self.labels
-
-            # Get the existing jira issue (only field summary as to performance reasons,
-            # we can't get issues without any fields)
-            jira_req_issue = self.jira_instance.issue(jira_req.jira_id, fields=[jconst.SUMMARY])
-            jira_req_issue.update(fields=jira_fields_dict, update=jira_update_dict)
-            self.reqs_processed += 1
-            _reporter.progress(self.reqs_processed)
+            self._create_missing_components(jira_fields_dict)
+
+            # Write directly to the issue key, Issue.update would fetch the issue before
+            # and reload it after the update
+            self._call_jira(self._put_issue, jira_req.jira_id, jira_fields_dict, jira_update_dict)
+            self._increment_processed()
+            # keep the issue in line with jira for the comparison of the next write
+            issue = self._raw_issues.get(jira_req.jira_id)
+            if issue is not None:
+                issue["fields"].update(jira_fields_dict)
+                issue["fields"].update((_field, _get_set_values(_operations))
+                                       for _field, _operations in jira_update_dict.items())
+                self._set_updated_fields(jira_req, jira_fields_dict, jira_update_dict)
         except JIRAError as ex:
             raise UserError(
-                'JIRAError during asyncronus creation of {}: {}'.format(jira_req.req_id, ex.text))
+                'JIRAError during concurrent update of {}: {}'.format(jira_req.req_id, ex.text))
 
     def _req_to_raw(self, jira_req: JiraRequirement) -> dict:  # pylint: disable=too-many-branches
         """ Converts a JiraRequirement to a dict as needed by the jira rest api
@@ -665,28 +1233,29 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         """
         fields = {}
         update = {}
-        self._convert_xhtml_to_jira_markup(jira_req)
+        summary = self._get_jira_markup(jira_req, 'summary')
+        content = self._get_jira_markup(jira_req, 'content')
         # No need for checking if the req has those attributes, as those are mandatory in Jira
         fields[jconst.ISSUETYPE] = {"name": jira_req.category.value}
 
-        if jira_req.summary is not None and jira_req.summary != "":
-            fields[jconst.SUMMARY] = get_summary_from_description(jira_req.summary, MAX_LENGTH_SUMMARY)
-        elif jira_req.content is not None and jira_req.content != "":
-            fields[jconst.SUMMARY] = get_summary_from_description(jira_req.content, MAX_LENGTH_SUMMARY)
+        if summary is not None and summary != "":
+            fields[jconst.SUMMARY] = get_summary_from_description(summary, MAX_LENGTH_SUMMARY)
+        elif content is not None and content != "":
+            fields[jconst.SUMMARY] = get_summary_from_description(content, MAX_LENGTH_SUMMARY)
         else:
             fields[jconst.SUMMARY] = "No Summary"
 
-        if jira_req.content is not None:
-            fields[jconst.DESCRIPTION] = str(jira_req.content)
+        if content is not None:
+            fields[jconst.DESCRIPTION] = str(content)
         if jira_req.status_customer is not None:
             fields[jconst.STATUS_CUSTOMER] = {"value": str(jira_req.status_customer.value)}
 
-        fields[jconst.REVIEW_COMMENTS] = str(
-            jira_req.raw_review_comments) if jira_req.review_comments is not None else None
-        fields[jconst.CUSTOMER_COMMENTS] = str(
-            jira_req.raw_customer_comments) if jira_req.customer_comments is not None else None
-        fields[jconst.INTERNAL_COMMENTS] = str(
-            jira_req.raw_internal_comments) if jira_req.internal_comments is not None else None
+        fields[jconst.REVIEW_COMMENTS] = str(xhtml_to_raw(
+            self._get_jira_markup(jira_req, 'review_comments'))) if jira_req.review_comments is not None else None
+        fields[jconst.CUSTOMER_COMMENTS] = str(xhtml_to_raw(
+            self._get_jira_markup(jira_req, 'customer_comments'))) if jira_req.customer_comments is not None else None
+        fields[jconst.INTERNAL_COMMENTS] = str(xhtml_to_raw(
+            self._get_jira_markup(jira_req, 'internal_comments'))) if jira_req.internal_comments is not None else None
         fields[jconst.SATISFIES] = str(
             jira_req.satisfies) if jira_req.satisfies is not None else None
 
@@ -729,17 +1298,32 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
 
         return {"fields": fields, "update": update}
 
-    def _convert_xhtml_to_jira_markup(self, jira_req: JiraRequirement):
-        if jira_req.summary:
-            jira_req.summary = self._prepare_content(jira_req.summary, jira_req)
-        if jira_req.content:
-            jira_req.content = self._prepare_content(jira_req.content, jira_req)
-        if jira_req.customer_comments:
-            jira_req.customer_comments = self._prepare_content(jira_req.customer_comments, jira_req)
-        if jira_req.internal_comments:
-            jira_req.internal_comments = self._prepare_content(jira_req.internal_comments, jira_req)
-        if jira_req.review_comments:
-            jira_req.review_comments = self._prepare_content(jira_req.review_comments, jira_req)
+    def _get_jira_markup(self, jira_req: JiraRequirement, field: str) -> str:
+        """ Returns the Jira markup of a xhtml field of the requirement. The markup is cached per
+        issue and field until the next read or write and only converted again if the field changed,
+        the field itself stays xhtml. The fields of issues that are not created yet are not
+        cached.
+
+        :param jira_req: JiraRequirement holding the field
+        :param field: name of the xhtml field, e.g. 'content'
+        :returns: content of the field in Jira markup
+        """
+        xhtml = getattr(jira_req, field)
+        if not xhtml:
+            return xhtml
+        # the markup only depends on the attachments if there are images to resolve
+        config = frozenset(jira_req.attachment_hashes) if DEFAULT_IMAGE in xhtml else None
+        jira_id = getattr(jira_req, 'jira_id', None)
+        if jira_id is None:
+            return self._prepare_content(xhtml, jira_req)
+        key = (jira_id, field)
+        cached = self._jira_markup.get(key)
+        if cached is not None and cached[0] == xhtml and cached[1] == config:
+            return cached[2]
+
+        markup = self._prepare_content(xhtml, jira_req)
+        self._jira_markup[key] = (xhtml, config, markup)
+        return markup
 
     def _prepare_content(self, content, jira_req):
         if DEFAULT_BOLD in content:
@@ -861,31 +1445,28 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
 
     @staticmethod
     def resolve_table(text: str):
-        """ resolves xhtml table to Jira-Format
+        """ resolves xhtml table to Jira-Format; the first row of a table becomes the header row
 
         :param text: string to check for xhtml table
 
         :returns: string with resolved table tags
         """
-        table_content = ''
-        text = text.replace(DEFAULT_TABLE_HEAD, '')
-        text = text.replace(DEFAULT_TABLE_HEAD.replace('<', '</'), '')
-        table_rows = re.findall('<xhtml:tr>.*?</xhtml:tr>', text, re.MULTILINE | re.DOTALL)
-        for row in table_rows:
-            if not table_rows.index(row):
-                row = row.replace(DEFAULT_TABLE_ROW, '')
-                row = row.replace(DEFAULT_TABLE_ROW.replace('<', '</'), '||')
-                row = row.replace(DEFAULT_TABLE_CELL, '||')
-                row = row.replace(DEFAULT_TABLE_CELL.replace('<', '</'), '')
-                row = re.sub(r"\s+", " ", row)
-            else:
-                row = row.replace(DEFAULT_TABLE_ROW, '')
-                row = row.replace(DEFAULT_TABLE_ROW.replace('<', '</'), '|')
-                row = row.replace(DEFAULT_TABLE_CELL, '|')
-                row = row.replace(DEFAULT_TABLE_CELL.replace('<', '</'), '')
-                row = re.sub(r"\s+", " ", row)
-            table_content = table_content + row.strip() + '\n'
-        return table_content
+        return XHTML_TABLE.sub(JiraTranceiver._xhtml_table_to_jira, text)
+
+    @staticmethod
+    def _xhtml_table_to_jira(table_match) -> str:
+        """ serializes a matched xhtml table as Jira table
+
+        :param table_match: match of XHTML_TABLE
+        :returns: Jira table with one row per line
+        """
+        table_content = []
+        for row_match in XHTML_TABLE_ROW.finditer(table_match.group(1)):
+            separator = '|' if table_content else '||'
+            cells = (_WHITESPACE.sub(' ', cell.replace(DEFAULT_BREAK, ' ')).strip()
+                     for cell in XHTML_TABLE_CELL.findall(row_match.group(1)))
+            table_content.append(separator + separator.join(cells) + separator + '\n')
+        return ''.join(table_content)
 
     def raw_to_req(self, req_issue: dict, link_map: dict) -> JiraRequirement:
         """ Creates an instance of JiraRequirement by parsing the
@@ -932,57 +1513,136 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         return jira_req
 
     def _get_jira_str_as_xhtml(self,
-                               jira_str: str):  # pylint: disable=too-many-locals,too-many-branches
+                               jira_str: str):
         """ replaces all Jira formating directives with xhtml tags
 
         :param jira_str: string from Jira Textbox
         :returns: string with xhtml notation
         """
         if isinstance(jira_str, str):
-            if '\n' in jira_str:
-                jira_str = jira_str.replace('\n', DEFAULT_BREAK)
-
-            jira_str = self._resolve_jira_markup(jira_str, '*', DEFAULT_BOLD)
-            jira_str = self._resolve_jira_markup(jira_str, '~', DEFAULT_SUB)
-            jira_str = self._resolve_jira_markup(jira_str, '^', DEFAULT_SUP)
-            jira_str = self._resolve_jira_markup(jira_str, '_', DEFAULT_ITALIC)
-            jira_str = self._resolve_jira_markup(jira_str, '-', DEFAULT_STRIKE_TROUGH)
-
-            for list_string in re.findall(LIST, jira_str):
-                xhtml_list = list_string.replace('* ', DEFAULT_LIST, 1)
-                xhtml_list = xhtml_list + DEFAULT_LIST.replace('<', '</')
-                jira_str = jira_str.replace(list_string,
-                                            DEFAULT_LIST_TYPE + xhtml_list + DEFAULT_LIST_TYPE.replace(
-                                                '<', '</'))
-
-            for image_string in re.findall(IMAGE, jira_str):
-                xhtml_image = image_string.replace('!', DEFAULT_IMAGE, 1)
-                xhtml_image = xhtml_image.replace('!', DEFAULT_IMAGE.replace('<', '</'), 1)
-                jira_str = jira_str.replace(image_string, xhtml_image)
-
-            for table_content in re.findall(TABLE, jira_str):
-                table_rows = jira_str.strip().split(DEFAULT_BREAK)
-                xhtml_table = DEFAULT_TABLE_HEAD
-                for row in table_rows:
-                    xhtml_table = xhtml_table + DEFAULT_TABLE_ROW
-                    if table_rows.index(row) == 0:
-                        header_cells = row.split('||')[1:-1]
-                        for header in header_cells:
-                            xhtml_table = xhtml_table + DEFAULT_TABLE_CELL + header + DEFAULT_BREAK + \
-                                          DEFAULT_TABLE_CELL.replace('<', '</')
-                        xhtml_table = xhtml_table + DEFAULT_TABLE_ROW.replace('<', '</')
-                    else:
-                        body_cells = row.split('|')[1:-1]
-                        for header in body_cells:
-                            xhtml_table = xhtml_table + DEFAULT_TABLE_CELL + header + DEFAULT_BREAK + \
-                                          DEFAULT_TABLE_CELL.replace('<', '</')
-                        xhtml_table = xhtml_table + DEFAULT_TABLE_ROW.replace('<', '</')
-                        jira_str = jira_str.replace(row, "")
-                xhtml_table = xhtml_table + DEFAULT_TABLE_HEAD.replace('<', '</')
-                jira_str = jira_str.replace(table_content, xhtml_table)
+            jira_str = CONVERSION_CACHE.convert('jira_to_xhtml', jira_str, self._convert_jira_str)
+
+        return jira_str
+
+    @staticmethod
+    def _convert_jira_str(jira_str: str) -> str:
+        """ converts line breaks, markup and tables of a string from Jira to xhtml
+
+        :param jira_str: string from Jira Textbox
+        :returns: string with xhtml notation
+        """
+        if '\n' in jira_str:
+            jira_str = jira_str.replace('\n', DEFAULT_BREAK)
+
+        jira_str = JiraTranceiver._jira_markup_to_xhtml(jira_str)
+
+        if '|' in jira_str:
+            jira_str = JiraTranceiver._resolve_jira_tables(jira_str)
 
         return jira_str
 
+    @staticmethod
+    def _jira_markup_to_xhtml(jira_str: str) -> str:
+        """ replaces text effects, lists and images in a string with xhtml nodes in a single scan
+
+        :param jira_str: string received from Jira with line breaks already replaced
+        :returns: string with xhtml markup
+        """
+        xhtml_parts = []
+        list_opened = JiraTranceiver._convert_jira_markup(jira_str, 0, len(jira_str), xhtml_parts, False)
+        if list_opened:
+            xhtml_parts.append(DEFAULT_LIST.replace('<', '</') + DEFAULT_LIST_TYPE.replace('<', '</'))
+        return ''.join(xhtml_parts)
+
+    @staticmethod
+    def _resolve_jira_tables(jira_str: str) -> str:
+        """ replaces Jira tables in a string with xhtml tables; a table starts with a header row,
+        all following lines enclosed by '|' are rows of the same table
+
+        :param jira_str: string received from Jira with line breaks already replaced
+        :returns: string with xhtml tables
+        """
+        segments = []
+        table_rows = []
+        for line in jira_str.split(DEFAULT_BREAK):
+            row = line.strip()
+            is_header = JIRA_TABLE_HEADER_ROW.fullmatch(row) is not None
+            if is_header or (table_rows and len(row) > 1 and row[0] == '|' and row[-1] == '|'):
+                table_rows.append(row.split('||' if is_header else '|')[1:-1])
+                continue
+            if table_rows:
+                segments.append(JiraTranceiver._table_rows_to_xhtml(table_rows))
+                table_rows = []
+            segments.append(line)
+        if table_rows:
+            segments.append(JiraTranceiver._table_rows_to_xhtml(table_rows))
+        return DEFAULT_BREAK.join(segments)
+
+    @staticmethod
+    def _table_rows_to_xhtml(table_rows: List[List[str]]) -> str:
+        """ serializes the rows of a table as xhtml table
+
+        :param table_rows: list of rows, each a list of cell contents
+        :returns: xhtml table as string
+        """
+        cell_end = DEFAULT_BREAK + DEFAULT_TABLE_CELL.replace('<', '</')
+        row_end = DEFAULT_TABLE_ROW.replace('<', '</')
+        xhtml_table = [DEFAULT_TABLE_HEAD]
+        for cells in table_rows:
+            xhtml_table.append(DEFAULT_TABLE_ROW)
+            xhtml_table.extend(DEFAULT_TABLE_CELL + cell + cell_end for cell in cells)
+            xhtml_table.append(row_end)
+        xhtml_table.append(DEFAULT_TABLE_HEAD.replace('<', '</'))
+        return ''.join(xhtml_table)
+
+    @staticmethod
+    def _convert_jira_markup(jira_str: str, start: int, end: int, xhtml_parts: list,
+                             list_opened: bool) -> bool:
+        """ appends the xhtml notation of jira_str[start:end] to xhtml_parts; the whole string is
+        searched so that the lookbehinds still see the text in front of a nested span
+
+        :param jira_str: complete string received from Jira
+        :param start: start index of the part to convert
+        :param end: end index of the part to convert
+        :param xhtml_parts: list the converted parts are appended to
+        :param list_opened: True if a list was already opened
+        :returns: True if a list was opened
+        """
+        pos = start
+        while pos < end:
+            match = JIRA_MARKUP.search(jira_str, pos)
+            if match is None or match.start() >= end:
+                break
+            if match.end() > end:
+                # span leaves the enclosing span, keep the markup char as text
+                xhtml_parts.append(jira_str[pos:match.start() + 1])
+                pos = match.start() + 1
+                continue
+            xhtml_parts.append(jira_str[pos:match.start()])
+            kind = match.lastgroup
+            if kind == 'image':
+                xhtml_parts.append(DEFAULT_IMAGE + match.group('image') + DEFAULT_IMAGE.replace('<', '</'))
+            elif kind == 'list':
+                # a list reaches from the first list item to the end of the string
+                if list_opened:
+                    xhtml_parts.append(match.group())
+                else:
+                    xhtml_parts.append(DEFAULT_LIST_TYPE + DEFAULT_LIST)
+                    list_opened = True
+            else:
+                default_node = _MARKUP_TAGS[jira_str[match.start()]]
+                content_start, content_end = match.span(kind)
+                xhtml_parts.append(default_node)
+                if _MARKUP_CHARS.search(jira_str, content_start, content_end):
+                    list_opened = JiraTranceiver._convert_jira_markup(jira_str, content_start, content_end,
+                                                                      xhtml_parts, list_opened)
+                else:
+                    xhtml_parts.append(jira_str[content_start:content_end])
+                xhtml_parts.append(default_node.replace('<', '</'))
+            pos = match.end()
+        xhtml_parts.append(jira_str[pos:end])
+        return list_opened
+
     def _build_req_path_tree(self, all_reqs_dict: dict, r4j_tree: list) -> list:
         """ Creates the tree structure for a ReqTree by recursing over the r4j tree structure and
         building the tree with references to the JiraRequirement objects from the list of all dicts.
@@ -1025,68 +1685,52 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
             self._build_subtree(all_reqs_dict, _r4j_child_req, parent=_jira_req)
 
     def _update_attachments(self, all_reqs: List[JiraRequirement]):
-        """ Updates Attachments for Jira-Issues (Attachments are never deleted)
+        """ Concurrently updates Attachments for Jira-Issues (Attachments are never deleted)
 
         :param all_reqs: List of Requirements, where to look for updated ones
         """
-        for req in all_reqs:
-            if RequirementAttributes.ATTACHMENT_HASHES in req.updated_fields:
-                for image_hash, image in req.attachment_hashes.items():
-                    if image_hash != image:
-                        # check if attachment already exists
-                        if image_hash not in [attachment.filename for attachment in
-                                              self.jira_instance.issue(req.jira_id).fields.attachment]:
-                            self.jira_instance.add_attachment(req.jira_id, image, image_hash)
-            elif InternalStatus.CREATED in req.internal_status:
-                for image_hash, image in req.attachment_hashes.items():
-                    self.jira_instance.add_attachment(req.jira_id, image, image_hash)
+        reqs_with_attachments = [
+            _req for _req in all_reqs if _req.attachment_hashes and (
+                RequirementAttributes.ATTACHMENT_HASHES in _req.updated_fields
+                or InternalStatus.CREATED in _req.internal_status)]
+
+        if reqs_with_attachments:
+            error_list = UserErrorList()
+            exceptions = self._run_concurrently(self._update_req_attachments,
+                                                reqs_with_attachments)
+            for exception in exceptions:
+                error_list.add_message(exception.args[0])
+            if error_list.get_messages():
+                raise error_list
 
-    @staticmethod
-    def _resolve_jira_markup(jira_str: str, jira_markup_char: str, default_node: str):
-        """ Breplaces jira markup in a string with xhtml nodes
+    def _update_req_attachments(self, req: JiraRequirement):
+        """ Uploads the missing attachments of a single requirement
 
-        :param jira_str: string received from Jira
-        :param jira_markup_char: jira markup character as string
-        :param default_node: default xhtml_node as string to replace jira markup
-        :returns: string with xhtml markup
+        :param req: Requirement whose attachments should be uploaded
         """
-
-        start_pattern = r'^\{jira_char}.*?\{jira_char}[\s.!?:]'.format(jira_char=jira_markup_char)
-        start_to_end_pattern = r'^\{jira_char}.*\{jira_char}$'.format(jira_char=jira_markup_char)
-        inbetween_pattern = r'(?=(\s\{jira_char}.*?\{jira_char}[\s.!?:]))'.format(
-            jira_char=jira_markup_char)
-
-        # find formated string from start to middle
-        for formated_string in re.findall(start_pattern, jira_str):
-            xhtml_formated_string = formated_string.replace(jira_markup_char, default_node, 1)
-            xhtml_formated_string = xhtml_formated_string.replace(jira_markup_char,
-                                                                  default_node.replace('<', '</'),
-                                                                  1)
-            jira_str = jira_str.replace(formated_string, xhtml_formated_string)
-        # find formated string from middle to end; uses inverted original string for better usage of regex
-        for formated_string in re.findall(start_pattern, jira_str[::-1]):
-            formated_string = formated_string[::-1]
-            xhtml_formated_string = formated_string.replace(jira_markup_char, default_node, 1)
-            xhtml_formated_string = xhtml_formated_string.replace(jira_markup_char,
-                                                                  default_node.replace('<', '</'),
-                                                                  1)
-            jira_str = jira_str.replace(formated_string, xhtml_formated_string)
-        # find formated string from start to end
-        for formated_string in re.findall(start_to_end_pattern, jira_str):
-            xhtml_formated_string = formated_string.replace(jira_markup_char, default_node, 1)
-            xhtml_formated_string = xhtml_formated_string[0:xhtml_formated_string.rfind(
-                jira_markup_char)] + default_node.replace(
-                '<', '</')
-            jira_str = jira_str.replace(formated_string, xhtml_formated_string)
-        # find formated string inbetween the string
-        for formated_string in re.findall(inbetween_pattern, jira_str):
-            xhtml_formated_string = formated_string.replace(jira_markup_char, default_node, 1)
-            xhtml_formated_string = xhtml_formated_string.replace(jira_markup_char,
-                                                                  default_node.replace('<', '</'),
-                                                                  1)
-            jira_str = jira_str.replace(formated_string, xhtml_formated_string)
-
-        return jira_str
+        try:
+            if RequirementAttributes.ATTACHMENT_HASHES in req.updated_fields:
+                # get the attachment names of the issue only once, from the last read if possible
+                existing_attachments = {
+                    attachment.filename for attachment in
+                    self._get_issue(req.jira_id, fields=["attachment"]).fields.attachment}
+                for image_hash, image in req.attachment_hashes.items():
+                    # check if attachment already exists
+                    if image_hash != image and image_hash not in existing_attachments:
+                        self._call_jira(self.jira_instance.add_attachment, req.jira_id, image,
+                                        image_hash, retry_server_errors=False)
+                        existing_attachments.add(image_hash)
+                        # The attachments of the read issue are outdated now
+                        raw_issue = self._raw_issues.get(req.jira_id)
+                        if raw_issue:
+                            raw_issue["fields"].pop("attachment", None)
+            else:
+                for image_hash, image in req.attachment_hashes.items():
+                    self._call_jira(self.jira_instance.add_attachment, req.jira_id, image, image_hash,
+                                    retry_server_errors=False)
+        except JIRAError as ex:
+            raise UserError(
+                'JIRAError during concurrent upload of the attachments of {}: {}'.format(req.req_id, ex.text))
 
     def _add_reqs_from_folder(self, issues_from_filter: list):
         """ Addes missing Jira issues from a r4j folder to a given list of issues
@@ -1094,9 +1738,7 @@ class JiraTranceiver:  # pylint: disable=too-many-instance-attributes
         :param issues_from_filter: Jira Issues received from a filter function
         """
 
-        query_string = 'issue in requirementsPath("{}/{}")'.format(self.jira_instance.project(self.project).name,
-                                                                   self.req_path)
-        issues_from_folder = self.jira_instance.get_all_issues_from_query(query_string,
+        issues_from_folder = self.jira_instance.get_all_issues_from_query(self._get_folder_jql(),
                                                                           json_result=True,
                                                                           fields=[JiraCFMapping.REQUIREMENT_ID])
         ids_from_filter = [issiu['key'] for issiu in issues_from_filter]
@@ -1,23 +1,31 @@
+import copy
+import json
+import multiprocessing
 import os
 import random
 import re
 import string
+import zipfile
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
 from enum import Enum
+from itertools import islice
 
-#from em_utils.exceptions import UserError
-#from em_utils.io_utils.path_utils import parse_path
-#from em_utils.progress import progress
+from em_utils.exceptions import UserError
+from em_utils.io_utils.path_utils import parse_path
+from em_utils.progress import progress
 from lxml import etree
-#from testutils.class_testing import TestLevel
-
-#from helpers import parse_enum_entry, create_md5hash_of_file
-#from summary_helpers import get_summary_from_description
-from req_tree import ReqTree
-from reqif.reqif_requirement import ReqifRequirement
-from requirement import RequirementCategory, RequirementStatus, ASIL, InternalStatus, \
-    RequirementStatusCustomer
-from xhtml_config import BOLD_TAGS, LIST_TAGS, LIST_TYPE_TAGS, SUB_TAGS, SUP_TAGS, \
+from testutils.class_testing import TestLevel
+
+from requirements.conversion_cache import CONVERSION_CACHE
+from requirements.helpers import parse_enum_entry, create_md5hash_of_file
+from requirements.summary_helpers import get_summary_from_description
+from requirements.req_tree import ReqTree
+from requirements.reqif.reqif_requirement import ReqifRequirement
+from requirements.requirement import RequirementCategory, RequirementStatus, ASIL, InternalStatus, \
+    RequirementStatusCustomer, DirtySet
+from requirements.xhtml_config import BOLD_TAGS, LIST_TAGS, LIST_TYPE_TAGS, SUB_TAGS, SUP_TAGS, \
     ITALIC_TAGS, \
     IMAGE_TAGS, STRIKE_TROUGH_TAGS, DEFAULT_BOLD, DEFAULT_LIST, DEFAULT_LIST_TYPE, DEFAULT_SUB, \
     DEFAULT_SUP, \
@@ -27,32 +35,22 @@ from xhtml_config import BOLD_TAGS, LIST_TAGS, LIST_TYPE_TAGS, SUB_TAGS, SUP_TAG
 
 _reporter = progress.get_reporter(__name__)
 
+REQIF_NAMESPACE = 'http://www.omg.org/spec/ReqIF/20110401/reqif.xsd'
+XHTML_NAMESPACE = 'http://www.w3.org/1999/xhtml'
 
-def _create_spcobject_without_values(req: ReqifRequirement, object_type_id: str):
+
+def _create_spcobject_without_values(req: ReqifRequirement, object_type_id: str,
+                                     node_factory: 'ReqifNodeFactory', id_generator: 'ReqifIdGenerator'):
     date = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
-    reqif_id = create_reqif_id()
+    reqif_id = id_generator.create_id()
     req.reqif_id = reqif_id
-    spec_object = etree.fromstring('<SPEC-OBJECT LAST-CHANGE="{}" IDENTIFIER="{}" LONG-NAME="{}">'
-                                   '<TYPE><SPEC-OBJECT-TYPE-REF>{}</SPEC-OBJECT-TYPE-REF></TYPE>'
-                                   '<VALUES></VALUES>'
-                                   '</SPEC-OBJECT>'.format(date, reqif_id, req.req_id, object_type_id))
-
-    return spec_object
-
+    return node_factory.spec_object(date, reqif_id, req.req_id, object_type_id)
 
-def _add_xhtml_value_to_spec_object(spec_object, attribute_value: str, type_ref: str):
-    attribute_value = _resolve_xhtml_chars_in_str(attribute_value)
-    attribute_value = attribute_value.replace('\n', '<xhtml:br/>')
-    xhtml_value = etree.fromstring('<ATTRIBUTE-VALUE-XHTML>'
-                                   '<DEFINITION>'
-                                   '<ATTRIBUTE-DEFINITION-XHTML-REF>{}</ATTRIBUTE-DEFINITION-XHTML-REF>'
-                                   '</DEFINITION>'
-                                   '<THE-VALUE>'
-                                   '<xhtml:div xmlns:xhtml="http://www.w3.org/1999/xhtml">{}</xhtml:div>'
-                                   '</THE-VALUE>'
-                                   '</ATTRIBUTE-VALUE-XHTML>'.format(type_ref, attribute_value))
 
-    spec_object.find('./VALUES').append(xhtml_value)
+def _add_xhtml_value_to_spec_object(spec_object, attribute_value: str, type_ref: str,
+                                    node_factory: 'ReqifNodeFactory'):
+    xhtml_value = node_factory.xhtml_value(type_ref, attribute_value)
+    node_factory.get_values_node(spec_object).append(xhtml_value)
 
 
 def _resolve_xhtml_chars_in_str(value: str):
@@ -65,17 +63,66 @@ def _resolve_xhtml_chars_in_str(value: str):
     return value
 
 
+_REQIF_ID_CHARS = (string.ascii_lowercase + string.digits).encode('ascii')
+# bytes above the largest multiple of the number of chars are dropped, so every char is equally likely
+_REQIF_ID_CHARS_TABLE = bytes(_REQIF_ID_CHARS[_byte % len(_REQIF_ID_CHARS)] for _byte in range(256))
+_REQIF_ID_DROPPED_BYTES = bytes(range(256 - 256 % len(_REQIF_ID_CHARS), 256))
+_REQIF_ID_LENGTH = 32
+
+
+class ReqifIdGenerator:
+    """ Generates alphanumeric reqif-ids by the format _{8}-{4}-{4}-{4}-{12}. The random chars of
+    a whole batch of ids are drawn at once, ids already used in the document or issued before are
+    skipped. """
+
+    def __init__(self, seed: int = None, existing_ids=None, batch_size: int = 1024):
+        """
+        :param seed: (opt.) seed for reproducible ids, otherwise the ids are drawn from os.urandom
+        :param existing_ids: (opt.) container of the identifiers already used in the document
+        :param batch_size: number of ids the random chars are drawn for at once
+        """
+        self._random = random.Random(seed) if seed is not None else None
+        self.existing_ids = existing_ids if existing_ids is not None else {}
+        self._issued = set()
+        self._batch_size = batch_size
+        self._chars = ''
+        self._position = 0
+
+    def _draw_chars(self):
+        """ draws the random chars of the next batch of ids """
+        size = self._batch_size * _REQIF_ID_LENGTH
+        if self._random:
+            random_bytes = self._random.getrandbits(size * 8).to_bytes(size, 'little')
+        else:
+            random_bytes = os.urandom(size)
+        self._chars = random_bytes.translate(_REQIF_ID_CHARS_TABLE, _REQIF_ID_DROPPED_BYTES).decode('ascii')
+        self._position = 0
+
+    def create_id(self) -> str:
+        """ creates a reqif-id which is not used in the document yet
+
+        :returns: random reqif-id
+        """
+        while True:
+            if self._position + _REQIF_ID_LENGTH > len(self._chars):
+                self._draw_chars()
+            chars = self._chars[self._position:self._position + _REQIF_ID_LENGTH]
+            self._position += _REQIF_ID_LENGTH
+            reqif_id = '_{}-{}-{}-{}-{}'.format(chars[:8], chars[8:12], chars[12:16], chars[16:20], chars[20:])
+            if reqif_id not in self._issued and reqif_id not in self.existing_ids:
+                self._issued.add(reqif_id)
+                return reqif_id
+
+
+_REQIF_ID_GENERATOR = ReqifIdGenerator()
+
+
 def create_reqif_id():
     """ creates random alphanumeric reqif-id by the format _{8}-{4}-{4}-{4}-{12}
 
     :returns: random reqif-id
     """
-    first = ''.join(random.choice(string.ascii_lowercase + string.digits) for i in range(8))
-    second = ''.join(random.choice(string.ascii_lowercase + string.digits) for i in range(4))
-    third = ''.join(random.choice(string.ascii_lowercase + string.digits) for i in range(4))
-    fourth = ''.join(random.choice(string.ascii_lowercase + string.digits) for i in range(4))
-    fifth = ''.join(random.choice(string.ascii_lowercase + string.digits) for i in range(12))
-    return '_{}-{}-{}-{}-{}'.format(first, second, third, fourth, fifth)
+    return _REQIF_ID_GENERATOR.create_id()
 
 
 def resolve_bold(text: str):
@@ -185,11 +232,84 @@ def resolve_break(text: str):
     return re.sub(' +', ' ', text)
 
 
-def resolve_image(text: str, reqif_path: str):
+class ImageHashCache:
+    """ Persistent cache of md5-hashes of image files, stored as json file next to the reqif.
+    An entry is only valid as long as size and modification time of the image are unchanged,
+    stale entries are dropped when the cache is saved. """
+
+    def __init__(self, reqif_path: str):
+        self._cache_file = reqif_path + '.imagehashes.json'
+        self._entries = {}
+        self._new_entries = {}
+        try:
+            with open(self._cache_file, 'r', encoding='utf-8') as cache_file:
+                self._entries = json.load(cache_file)
+        except (OSError, ValueError):
+            # no or unreadable cache, all hashes are computed again
+            self._entries = {}
+
+    def get_hash(self, image_path: str) -> str:
+        """ returns the md5-hash of an image file, only reads the file if it is not cached or
+        has changed since it was cached
+
+        :param image_path: path to the image file
+        :returns: md5-hash of the file
+        """
+        key = os.path.abspath(image_path)
+        stat = os.stat(image_path)
+        entry = self._entries.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            return entry['hash']
+        entry = {'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                 'hash': create_md5hash_of_file(image_path)}
+        self._entries[key] = entry
+        self._new_entries[key] = entry
+        return entry['hash']
+
+    def pop_new_entries(self) -> dict:
+        """ returns and resets the entries added since the last call,
+        used to pass the hashes computed in worker processes back
+
+        :returns: dictonary with the new cache entries
+        """
+        new_entries, self._new_entries = self._new_entries, {}
+        return new_entries
+
+    def update(self, entries: dict):
+        """ adds cache entries, e.g. computed in a worker process
+
+        :param entries: dictonary with cache entries
+        """
+        self._entries.update(entries)
+        self._new_entries.update(entries)
+
+    def save(self):
+        """ drops stale entries and writes the cache next to the reqif """
+        valid_entries = {}
+        for key, entry in self._entries.items():
+            try:
+                stat = os.stat(key)
+            except OSError:
+                continue
+            if entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                valid_entries[key] = entry
+        self._entries = valid_entries
+        try:
+            tmp_file = self._cache_file + '.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as cache_file:
+                json.dump(valid_entries, cache_file)
+            os.replace(tmp_file, self._cache_file)
+        except OSError:
+            # the cache is only an optimization, a not writable directory is no error
+            pass
+
+
+def resolve_image(text: str, reqif_path: str, hash_cache: ImageHashCache = None):
     """ resolves xhtml image tags to stadart-xhtml
 
     :param text: string to check for xhtml image
     :param reqif_path: path to reqif file
+    :param hash_cache: (opt.) cache for the md5-hashes of the images
 
     :returns: string with resolved image tags
     """
@@ -208,7 +328,10 @@ def resolve_image(text: str, reqif_path: str):
                 full_image_path = image_name
             else:
                 full_image_path = parse_path(os.path.join(os.path.dirname(reqif_path), image_name))
-            image_hash = create_md5hash_of_file(full_image_path)
+            if hash_cache:
+                image_hash = hash_cache.get_hash(full_image_path)
+            else:
+                image_hash = create_md5hash_of_file(full_image_path)
             image_name = image_hash + '.' + image_name.split('.')[-1]
             images[image_name] = full_image_path
             text = text.replace(image,
@@ -216,6 +339,101 @@ def resolve_image(text: str, reqif_path: str):
     return re.sub(' +', ' ', text), images
 
 
+class XhtmlNormalizer:
+    """ Resolves the xhtml tags of a reqif attribute value to standard-xhtml and removes all
+    remaining xhtml tags in a single scan. The patterns are compiled once from the tag tables
+    of the xhtml config. """
+
+    _REMAINING_XHTML = r'</?(?:reqif-)?xhtml.*?/?>'
+
+    def __init__(self):
+        self._tag_mapping = {}
+        for tags, default_tag in ((BOLD_TAGS, DEFAULT_BOLD),
+                                  (LIST_TAGS, DEFAULT_LIST),
+                                  (LIST_TYPE_TAGS, DEFAULT_LIST_TYPE),
+                                  (SUB_TAGS, DEFAULT_SUB),
+                                  (SUP_TAGS, DEFAULT_SUP),
+                                  (ITALIC_TAGS, DEFAULT_ITALIC),
+                                  (STRIKE_TROUGH_TAGS, DEFAULT_STRIKE_TROUGH)):
+            for tag in tags:
+                self._tag_mapping.setdefault(
+                    tag, default_tag.replace('<', '</') if '</' in tag else default_tag)
+        for tag in BREAK_TAGS:
+            self._tag_mapping.setdefault(tag, DEFAULT_BREAK)
+        # list type tags are only resolved, if the content contains a list
+        self._list_type_tags = set(LIST_TYPE_TAGS) - set(LIST_TAGS)
+
+        # tags causing multiple spaces to be merged
+        trigger_tags = [tag for tag in self._tag_mapping if tag not in self._list_type_tags]
+        trigger_tags.extend(IMAGE_TAGS)
+
+        tags_pattern = self._alternation(self._tag_mapping)
+        self._trigger_pattern = re.compile(self._alternation(trigger_tags))
+        self._pattern = re.compile('(?P<tag>{})|(?P<spaces>  +)'.format(tags_pattern))
+        self._pattern_with_cleanup = re.compile(
+            '(?P<tag>{})|(?P<remaining>{})|(?P<spaces>  +)'.format(tags_pattern,
+                                                                 self._REMAINING_XHTML))
+        self._remaining_pattern = re.compile(self._REMAINING_XHTML)
+
+    @staticmethod
+    def _alternation(tags) -> str:
+        """ creates a regex alternation of the given tags, longer tags are preferred
+
+        :param tags: iterable of tags
+        :returns: regex pattern matching any of the tags
+        """
+        if not tags:
+            return '(?!)'
+        return '|'.join(re.escape(tag) for tag in sorted(tags, key=len, reverse=True))
+
+    def normalize(self, content: str, remove_remaining: bool = True) -> str:
+        """ resolves all xhtml tags to standard-xhtml
+
+        :param content: xhtml string of an attribute value
+        :param remove_remaining: remove all xhtml tags that are not standard-xhtml
+
+        :returns: string with resolved tags
+        """
+        merge_spaces = self._trigger_pattern.search(content) is not None
+        has_list = None
+
+        def _replace(match):
+            nonlocal has_list
+            tag = match.group('tag')
+            if tag is not None:
+                if tag in self._list_type_tags:
+                    if has_list is None:
+                        has_list = any(list_tag in content for list_tag in LIST_TAGS)
+                    if not has_list:
+                        return self._remove_remaining(tag) if remove_remaining else tag
+                return self._tag_mapping[tag]
+            spaces = match.group('spaces')
+            if spaces is not None:
+                return ' ' if merge_spaces else spaces
+            return self._remove_remaining(match.group('remaining'))
+
+        if remove_remaining:
+            return self._pattern_with_cleanup.sub(_replace, content)
+        return self._pattern.sub(_replace, content)
+
+    def remove_remaining_tags(self, content: str) -> str:
+        """ removes all xhtml tags that are not standard-xhtml
+
+        :param content: xhtml string of an attribute value
+        :returns: string containing only standard-xhtml tags
+        """
+        return self._remaining_pattern.sub(lambda match: self._remove_remaining(match.group()),
+                                           content)
+
+    def _remove_remaining(self, tag: str) -> str:
+        if tag in ALL_XHTML_DEFAULT_TAGS or not self._remaining_pattern.fullmatch(tag):
+            return tag
+        return ''
+
+
+_XHTML_NORMALIZER = XhtmlNormalizer()
+
+
 def value_in_enum(value: str, enum: Enum, mapping: dict = None):
     """ mapps a value und checks if the result exists in an enum,
         returns the corresponding enum value
@@ -238,32 +456,609 @@ def value_in_enum(value: str, enum: Enum, mapping: dict = None):
         return value
 
 
+@contextmanager
+def _open_reqif_input(reqif_file: str):
+    """ opens the file the reqif document is read from, for a .reqifz file the first reqif
+    document of the archive is read
+
+    :param reqif_file: filepath to the reqif or reqifz file
+
+    :returns: readable binary file object
+    """
+    if not os.path.isfile(reqif_file):
+        raise FileNotFoundError(
+            'The specified reqif-File {} could not be found.'.format(reqif_file))
+    if reqif_file.lower().endswith('.reqifz'):
+        with zipfile.ZipFile(reqif_file) as archive:
+            document_names = [_name for _name in archive.namelist() if _name.lower().endswith('.reqif')]
+            if not document_names:
+                raise UserError('The reqifz-File {} does not contain a reqif document.'.format(reqif_file))
+            with archive.open(document_names[0]) as source:
+                yield source
+    else:
+        with open(reqif_file, 'rb') as source:
+            yield source
+
+
 def _get_reqif_dom(reqif_file: str) -> etree.ElementTree:
     """ gets the complete reqif file as ElementTree
 
-    :param reqif_file: filepath to reqif file
+    :param reqif_file: filepath to reqif or reqifz file
 
     :returns: Element tree and corresponding namespace
     """
     parser = etree.XMLParser(remove_blank_text=True)
-    try:
-        reqif_dom = etree.parse(reqif_file, parser)
-    except OSError:
-        raise FileNotFoundError(
-            'The specified reqif-File {} could not be found.'.format(reqif_file))
+    with _open_reqif_input(reqif_file) as source:
+        reqif_dom = etree.parse(source, parser)
     root = reqif_dom.getroot()
     namespace = {k if k is not None else 'def': v for k, v in root.nsmap.items()}
 
     return reqif_dom, namespace
 
 
+def _iterparse_reqif(reqif_file: str, tags: tuple):
+    """ incrementally parses a reqif file and yields the elements with the given tags
+    as soon as they are complete
+
+    :param reqif_file: filepath to reqif or reqifz file
+    :param tags: local names (without namespace) of the elements to yield
+
+    :returns: generator of completely parsed lxml elements
+    """
+    with _open_reqif_input(reqif_file) as source:
+        context = etree.iterparse(source, events=('end',), remove_blank_text=True,
+                                  tag=['{{*}}{}'.format(tag) for tag in tags])
+        for _, element in context:
+            yield element
+        del context
+
+
+def _clear_element(element: etree._Element):  # pylint: disable=protected-access
+    """ frees the memory of an already processed element and its preceding siblings
+
+    :param element: lxml element which is not needed anymore
+    """
+    element.clear()
+    while element.getprevious() is not None:
+        del element.getparent()[0]
+
+
+@contextmanager
+def _open_reqif_output(reqif_file: str):
+    """ opens the file the reqif document is written to, for a .reqifz file the document is
+    written compressed into an archive. The document is written to a temporary file first,
+    which replaces the file when it is complete, so the file can be read while it is written.
+
+    :param reqif_file: filepath to the reqif or reqifz file
+
+    :returns: writable binary file object
+    """
+    temp_file = reqif_file + '.part'
+    try:
+        if reqif_file.lower().endswith('.reqifz'):
+            document_name = os.path.splitext(os.path.basename(reqif_file))[0] + '.reqif'
+            with zipfile.ZipFile(temp_file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                with archive.open(document_name, 'w') as output:
+                    yield output
+        else:
+            with open(temp_file, 'wb') as output:
+                yield output
+        os.replace(temp_file, reqif_file)
+    finally:
+        if os.path.isfile(temp_file):
+            os.remove(temp_file)
+
+
+class ReqifStreamWriter:
+    """ Writes a reqif document element by element, byte for byte as lxml pretty prints the whole
+    document. Only the open elements and the element that is currently written are held in memory:
+    the element is serialized inside shallow copies of the open elements, whose start and end tags
+    are cut from the output.
+
+    Namespace declarations repeating a declaration of an ancestor are left out, the written document
+    only differs from the pretty printed dom for documents containing such declarations.
+    """
+
+    def __init__(self, output):
+        """
+        :param output: writable binary file object
+        """
+        self._output = output
+        # [shallow copy of an open element, its end tag or None if its start tag is not written yet]
+        self._open = []
+
+    def start(self, element: etree._Element):  # pylint: disable=protected-access
+        """ opens an element, its children are written until end is called
+
+        :param element: lxml element to open, only its tag, attributes and namespaces are used
+        """
+        parent = self._open[-1][0] if self._open else None
+        nsmap = {k: v for k, v in element.nsmap.items() if parent is None or parent.nsmap.get(k) != v}
+        if parent is None:
+            open_element = etree.Element(element.tag, dict(element.attrib), nsmap=nsmap)
+        else:
+            open_element = etree.SubElement(parent, element.tag, dict(element.attrib), nsmap=nsmap)
+        self._open.append([open_element, None])
+
+    def write(self, element: etree._Element):  # pylint: disable=protected-access
+        """ writes an element as child of the innermost open element, the element is removed from
+        the tree it belongs to
+
+        :param element: complete lxml element
+        """
+        parent = self._open[-1][0]
+        parent.append(element)
+        try:
+            data = etree.tostring(self._open[0][0], pretty_print=True)
+        finally:
+            parent.remove(element)
+        # every open element has exactly one child, so each of their tags is a line of its own
+        depth = len(self._open)
+        start = 0
+        start_tags = []
+        for _ in range(depth):
+            end = data.index(b'\n', start) + 1
+            start_tags.append(data[start:end])
+            start = end
+        stop = len(data)
+        end_tags = []
+        for _ in range(depth):
+            begin = data.rindex(b'\n', 0, stop - 1) + 1
+            end_tags.append(data[begin:stop])
+            stop = begin
+        for idx, open_entry in enumerate(self._open):
+            if open_entry[1] is None:
+                self._output.write(start_tags[idx])
+                open_entry[1] = end_tags[idx]
+        self._output.write(data[start:stop])
+
+    def end(self, element: etree._Element = None):  # pylint: disable=protected-access
+        """ closes the innermost open element
+
+        :param element: (opt.) the opened element without its children; it is written instead if no
+                        children were written, so that the text of an empty element is kept
+        """
+        open_element, end_tag = self._open.pop()
+        if self._open:
+            self._open[-1][0].remove(open_element)
+        if end_tag is not None:
+            self._output.write(end_tag)
+            return
+        if element is not None:
+            open_element = copy.deepcopy(element)
+        if self._open:
+            self.write(open_element)
+        else:
+            self._output.write(etree.tostring(open_element, pretty_print=True))
+
+
+# elements of a reqif document whose children are parsed and written one at a time, the spec hierarchy
+# is split up as well, moving a deep hierarchy at once is slow
+_CONTAINER_TAGS = {'REQ-IF', 'CORE-CONTENT', 'REQ-IF-CONTENT', 'SPEC-OBJECTS', 'SPEC-RELATIONS', 'SPECIFICATIONS',
+                   'SPECIFICATION', 'SPEC-HIERARCHY', 'CHILDREN'}
+
+
+def _rewrite_reqif_streaming(reqif_file: str, writer: ReqifStreamWriter, update):
+    """ parses a reqif file incrementally and writes it to a stream writer; the children of the
+    container elements are passed to update as soon as they are complete and are freed after writing
+
+    :param reqif_file: filepath to reqif or reqifz file
+    :param writer: ReqifStreamWriter the document is written to
+    :param update: function called with each child of a container element before it is written
+    """
+    open_elements = []
+    with _open_reqif_input(reqif_file) as source:
+        context = etree.iterparse(source, events=('start', 'end', 'comment', 'pi'), remove_blank_text=True)
+        for event, element in context:
+            if event == 'start':
+                if not open_elements or (element.getparent() is open_elements[-1] and
+                                         etree.QName(element).localname in _CONTAINER_TAGS):
+                    open_elements.append(element)
+                    writer.start(element)
+            elif open_elements and element is open_elements[-1]:
+                open_elements.pop()
+                writer.end(element)
+                if open_elements:
+                    open_elements[-1].remove(element)
+            elif open_elements and element.getparent() is open_elements[-1]:
+                if event == 'end':
+                    update(element)
+                writer.write(element)
+        del context
+
+
+def _strip_blank_text(element: etree._Element):  # pylint: disable=protected-access
+    """ removes the blank text an empty element of a template keeps after parsing, otherwise the
+    children added to the element are not indented when the document is written
+
+    :param element: lxml element children are added to
+    :returns: the element
+    """
+    if element.text is not None and not element.text.strip():
+        element.text = None
+    return element
+
+
+def _write_element_streaming(writer: ReqifStreamWriter, element: etree._Element, generators: dict,  # pylint: disable=protected-access
+                             generator_ancestors: set):
+    """ writes an element of the reqif dom to a stream writer; elements with a generator get the
+    generated children written after their existing children, all other subtrees are written as
+    they are
+
+    :param writer: ReqifStreamWriter the document is written to
+    :param element: lxml element to write
+    :param generators: dictonary (element <-> function writing additional children to the writer)
+    :param generator_ancestors: elements with a generator and all their ancestors
+    """
+    if element not in generator_ancestors:
+        # the writer takes the element out of its tree, the dom is kept as it is
+        writer.write(copy.deepcopy(element))
+        return
+
+    # the blank text of an empty element is dropped, like for the elements filled by
+    # _create_reqif_from_template
+
+    writer.start(element)
+    for child in element:
+        _write_element_streaming(writer, child, generators, generator_ancestors)
+    if element in generators:
+        generators[element](writer)
+    writer.end()
+
+
+def _iter_reqs_of_tree(reqs):
+    """ iterates a requirement tree depth first
+
+    :param reqs: requirements of the top level
+    :returns: generator of all requirements of the tree
+    """
+    for req in reqs:
+        yield req
+        yield from _iter_reqs_of_tree(req.children)
+
+
+_worker_transceiver = None
+
+
+def _init_conversion_worker(transceiver: 'ReqIfTransceiver'):
+    """ stores the transceiver once per worker process of the conversion pool
+
+    :param transceiver: (unpickled) transceiver holding the conversion configuration
+    """
+    global _worker_transceiver  # pylint: disable=global-statement
+    _worker_transceiver = transceiver
+
+
+def _convert_specobjects_in_worker(specobjects: list) -> tuple:
+    """ converts a chunk of resolved spec-objects in a worker process
+
+    :param specobjects: list of resolved spec-objects
+    :returns: list of ReqIf-Requirement-Objects in the same order, the image hashes computed for
+              them and the hits and misses of the conversion cache of the worker for the chunk
+    """
+    hits, misses = CONVERSION_CACHE.hits, CONVERSION_CACHE.misses
+    reqs = [_worker_transceiver.raw_to_req(specobject) for specobject in specobjects]
+    image_hashes = {}
+    if _worker_transceiver._image_hash_cache:  # pylint: disable=protected-access
+        image_hashes = _worker_transceiver._image_hash_cache.pop_new_entries()  # pylint: disable=protected-access
+    cache_stats = (CONVERSION_CACHE.hits - hits, CONVERSION_CACHE.misses - misses)
+    return reqs, image_hashes, cache_stats
+
+
+def _chunks(iterable, size: int):
+    """ splits an iterable into lists of the given size
+
+    :param iterable: iterable to split
+    :param size: maximum size of each chunk
+    :returns: generator of lists
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class ReqifIndex:
+    """ Dictionary based index over the identifiers of a loaded reqif dom, so that references
+    can be resolved without searching the whole document """
+
+    def __init__(self, reqif_dom: etree.ElementTree, namespace: dict):
+        # IDENTIFIER -> element
+        self.identifiers = {}
+        # datatype IDENTIFIER -> {LONG-NAME -> ENUM-VALUE}
+        self.enum_values_by_datatype = {}
+        # LONG-NAME -> first ENUM-VALUE of the document
+        self.enum_values = {}
+        # req_id (LONG-NAME) -> SPEC-OBJECT
+        self.spec_objects = {}
+        self._all_spec_objects = []
+        # req_id (text of a value node) -> SPEC-OBJECT, only built if needed
+        self._spec_objects_by_value = None
+        self._namespace = namespace
+
+        for element in reqif_dom.getroot().iter(tag=etree.Element):
+            self.add(element)
+
+    def add(self, element: etree._Element):  # pylint: disable=protected-access
+        """ adds an element of the reqif dom to the index, has to be called for each element
+        with an identifier that is added to the dom
+
+        :param element: lxml element to index
+        """
+        identifier = element.get('IDENTIFIER')
+        if identifier is None:
+            return
+        self.identifiers.setdefault(identifier, element)
+        tag = element.tag.rpartition('}')[2]
+        if tag == 'ENUM-VALUE':
+            long_name = element.get('LONG-NAME')
+            self.enum_values.setdefault(long_name, element)
+            # ENUM-VALUE -> SPECIFIED-VALUES -> DATATYPE-DEFINITION-ENUMERATION
+            specified_values = element.getparent()
+            if specified_values is not None and specified_values.getparent() is not None:
+                self.enum_values_by_datatype.setdefault(
+                    specified_values.getparent().get('IDENTIFIER'), {}).setdefault(long_name,
+                                                                                   element)
+        elif tag == 'SPEC-OBJECT':
+            long_name = element.get('LONG-NAME')
+            if long_name is not None:
+                self.spec_objects.setdefault(long_name, element)
+            self._all_spec_objects.append(element)
+            if self._spec_objects_by_value is not None:
+                self._add_spec_object_values(element)
+
+    def _add_spec_object_values(self, spec_object: etree._Element):  # pylint: disable=protected-access
+        """ indexes a specobject by the texts of its value nodes
+
+        :param spec_object: lxml element of the specobject
+        """
+        for value_node in spec_object.iterfind('def:VALUES/*/*/*/*', self._namespace):
+            if value_node.text:
+                self._spec_objects_by_value.setdefault(value_node.text, spec_object)
+
+    def get_spec_object(self, req_id: str):
+        """ finds the specobject for a specific id, first by its LONG-NAME and then by the
+        text of its values
+
+        :param req_id: Requirement id to look for
+
+        :returns spec_object: lxml elemnt of the specobject or None if it does not exist
+        """
+        spec_object = self.spec_objects.get(req_id)
+        if spec_object is None:
+            if self._spec_objects_by_value is None:
+                self._spec_objects_by_value = {}
+                for spec_object_node in self._all_spec_objects:
+                    self._add_spec_object_values(spec_object_node)
+            spec_object = self._spec_objects_by_value.get(req_id)
+        return spec_object
+
+
+class SpecObjectLocator:
+    """ Finds the identifiers of the specobjects of given requirements while a reqif document is
+    parsed incrementally, in the same order of precedence as ReqifIndex.get_spec_object """
+
+    def __init__(self, req_ids, reqif_ids=()):
+        """
+        :param req_ids: requirement ids to look for by the LONG-NAME and the values of the specobjects
+        :param reqif_ids: reqif ids to look for by the IDENTIFIER of the specobjects
+        """
+        self._req_ids = set(req_ids)
+        self._reqif_ids = set(reqif_ids)
+        self._identifiers = set()
+        # req_id -> IDENTIFIER of the first specobject with the req_id as LONG-NAME or as value
+        self._by_long_name = {}
+        self._by_value = {}
+
+    def add(self, spec_object: etree._Element, namespace: dict):  # pylint: disable=protected-access
+        """ checks a specobject for the requirements, has to be called for each specobject in
+        document order
+
+        :param spec_object: lxml element of the specobject
+        :param namespace: namespace of the reqif document
+        """
+        identifier = spec_object.get('IDENTIFIER')
+        if identifier in self._reqif_ids:
+            self._identifiers.add(identifier)
+        long_name = spec_object.get('LONG-NAME')
+        if long_name in self._req_ids:
+            self._by_long_name.setdefault(long_name, identifier)
+        for value_node in spec_object.iterfind('def:VALUES/*/*/*/*', namespace):
+            if value_node.text in self._req_ids:
+                self._by_value.setdefault(value_node.text, identifier)
+
+    def get_identifier(self, req_id: str, reqif_id: str = None):
+        """ returns the identifier of the specobject of a requirement
+
+        :param req_id: Requirement id to look for
+        :param reqif_id: (opt.) reqif id to look for first
+
+        :returns: IDENTIFIER of the specobject or None if it does not exist
+        """
+        if reqif_id in self._identifiers:
+            return reqif_id
+        return self._by_long_name.get(req_id, self._by_value.get(req_id))
+
+
+class ReqifNodeFactory:
+    """ Builds the elements of a reqif document from prototypes, which are created once in the
+    namespace of the document and copied for each new element, instead of parsing a formatted
+    string per element """
+
+    def __init__(self, namespace: str = REQIF_NAMESPACE):
+        self._namespace = namespace
+        # the prototypes are children of a holder declaring the namespaces, so that the copies
+        # reuse the declarations of the document they are added to
+        holder = etree.Element(self.tag('REQ-IF'), nsmap={None: namespace, 'xhtml': XHTML_NAMESPACE})
+
+        self._spec_object = etree.SubElement(holder, self.tag('SPEC-OBJECT'))
+        etree.SubElement(etree.SubElement(self._spec_object, self.tag('TYPE')),
+                         self.tag('SPEC-OBJECT-TYPE-REF'))
+        etree.SubElement(self._spec_object, self.tag('VALUES'))
+
+        self._xhtml_value = etree.SubElement(holder, self.tag('ATTRIBUTE-VALUE-XHTML'))
+        etree.SubElement(etree.SubElement(self._xhtml_value, self.tag('DEFINITION')),
+                         self.tag('ATTRIBUTE-DEFINITION-XHTML-REF'))
+        etree.SubElement(self._xhtml_value, self.tag('THE-VALUE'))
+
+        self._enum_value = etree.SubElement(holder, self.tag('ATTRIBUTE-VALUE-ENUMERATION'))
+        etree.SubElement(etree.SubElement(self._enum_value, self.tag('DEFINITION')),
+                         self.tag('ATTRIBUTE-DEFINITION-ENUMERATION-REF'))
+        etree.SubElement(etree.SubElement(self._enum_value, self.tag('VALUES')),
+                         self.tag('ENUM-VALUE-REF'))
+
+        self._hierarchy = etree.SubElement(holder, self.tag('SPEC-HIERARCHY'), {'IS-TABLE-INTERNAL': 'false'})
+        etree.SubElement(etree.SubElement(self._hierarchy, self.tag('OBJECT')), self.tag('SPEC-OBJECT-REF'))
+        etree.SubElement(self._hierarchy, self.tag('CHILDREN'))
+
+        self._div_tag = '{{{}}}div'.format(XHTML_NAMESPACE)
+        self._break_tag = '{{{}}}br'.format(XHTML_NAMESPACE)
+        self._values_tags = (self.tag('VALUES'), 'VALUES')
+
+    def tag(self, name: str) -> str:
+        """ returns the qualified tag of a reqif element
+
+        :param name: local name of the element
+        :returns: tag in the namespace of the document
+        """
+        if self._namespace:
+            return '{{{}}}{}'.format(self._namespace, name)
+        return name
+
+    def spec_object(self, last_change: str, identifier: str, long_name: str, object_type_id: str):
+        """ creates a spec-object without values
+
+        :returns: lxml element of the spec-object
+        """
+        spec_object = copy.deepcopy(self._spec_object)
+        spec_object.attrib.update({'LAST-CHANGE': last_change, 'IDENTIFIER': identifier, 'LONG-NAME': long_name})
+        spec_object[0][0].text = object_type_id
+        return spec_object
+
+    def get_values_node(self, spec_object):
+        """ finds the VALUES node of a spec-object, spec-objects created before the factory
+        existed have no namespace
+
+        :param spec_object: lxml element of the spec-object
+        :returns: lxml element of the VALUES node or None
+        """
+        for child in spec_object:
+            if child.tag in self._values_tags:
+                return child
+        return None
+
+    def xhtml_value(self, definition_ref: str, text: str):
+        """ creates an xhtml attribute value from plain text, line breaks become xhtml breaks
+
+        :param definition_ref: reqif id of the attribute definition
+        :param text: plain text of the value
+        :returns: lxml element of the attribute value
+        """
+        if '&' in text or '\r' in text:
+            # entities have to be resolved by the parser
+            text = _resolve_xhtml_chars_in_str(text).replace('\n', '<xhtml:br/>')
+            return self.xhtml_value_from_markup(
+                definition_ref, '<xhtml:div xmlns:xhtml="{}">{}</xhtml:div>'.format(XHTML_NAMESPACE, text))
+
+        xhtml_value = copy.deepcopy(self._xhtml_value)
+        xhtml_value[0][0].text = definition_ref
+        div = etree.SubElement(xhtml_value[1], self._div_tag, nsmap={'xhtml': XHTML_NAMESPACE})
+        lines = text.split('\n')
+        div.text = lines[0] or None
+        for line in lines[1:]:
+            etree.SubElement(div, self._break_tag).tail = line or None
+        return xhtml_value
+
+    def xhtml_value_from_markup(self, definition_ref: str, div_markup: str):
+        """ creates an xhtml attribute value, only the markup of the value is parsed
+
+        :param definition_ref: reqif id of the attribute definition
+        :param div_markup: xhtml div containing the value
+        :returns: lxml element of the attribute value
+        """
+        xhtml_value = copy.deepcopy(self._xhtml_value)
+        xhtml_value[0][0].text = definition_ref
+        xhtml_value[1].append(etree.fromstring(div_markup))
+        return xhtml_value
+
+    def enum_value(self, definition_ref: str, enum_ref: str = None):
+        """ creates an enumeration attribute value
+
+        :param definition_ref: reqif id of the attribute definition
+        :param enum_ref: reqif id of the enum value
+        :returns: lxml element of the attribute value
+        """
+        enum_value = copy.deepcopy(self._enum_value)
+        enum_value[0][0].text = definition_ref
+        enum_value[1][0].text = enum_ref
+        return enum_value
+
+    def hierarchy(self, last_change: str, identifier: str, object_ref: str):
+        """ creates a hierarchy node with an empty CHILDREN node
+
+        :param last_change: timestamp of the node
+        :param identifier: reqif id of the node
+        :param object_ref: reqif id of the referenced spec-object
+        :returns: lxml element of the hierarchy node
+        """
+        hierarchy = copy.deepcopy(self._hierarchy)
+        hierarchy.attrib.update({'LAST-CHANGE': last_change, 'IDENTIFIER': identifier})
+        hierarchy[0][0].text = object_ref
+        return hierarchy
+
+
+class SpectypeIndex:
+    """ Lookup tables between the names, the reqif ids and the datatypes of the attribute
+    definitions of a reqif document """
+
+    def __init__(self, spectypes_dict: dict):
+        """
+        :param spectypes_dict: dictonary (reqif id <-> [name, tag, datatype ref]) of all attribute definitions
+        """
+        self.spectypes = spectypes_dict
+        # LONG-NAME -> reqif ids of the attribute definitions in document order
+        self.ids_by_name = {}
+        # datatype ref -> reqif ids of the attribute definitions using the datatype
+        self.ids_by_datatype = {}
+        for spectype_id, (name, _, datatype) in spectypes_dict.items():
+            self.ids_by_name.setdefault(name, []).append(spectype_id)
+            self.ids_by_datatype.setdefault(datatype, []).append(spectype_id)
+
+    def get_ids(self, name: str) -> list:
+        """ returns the reqif ids of all attribute definitions with the given name
+
+        :param name: LONG-NAME of the attribute definition
+        :returns: list of reqif ids, empty if there is no such definition
+        """
+        return self.ids_by_name.get(name, [])
+
+    def get_name(self, spectype_id: str) -> str:
+        """ returns the name of an attribute definition
+
+        :param spectype_id: reqif id of the attribute definition
+        :returns: LONG-NAME of the attribute definition
+        """
+        return self.spectypes[spectype_id][0]
+
+    def get_datatype(self, spectype_id: str) -> str:
+        """ returns the datatype of an attribute definition
+
+        :param spectype_id: reqif id of the attribute definition
+        :returns: reqif id of the datatype definition
+        """
+        return self.spectypes[spectype_id][2]
+
+
 class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
     """ class for ReqIf-Requirements import and export """
 
     def __init__(self, reqif_file_path: str, attribute_config: dict, value_mapping: dict,
                  custom_raw_to_req_callback=None,
                  value_mapping_inverse=None, template: str = None, document_type: str = None,
-                 default_values: dict = {}):
+                 default_values: dict = {}, streaming: bool = False, processes: int = None,
+                 chunk_size: int = 500, image_hash_cache: bool = False, id_seed: int = None,
+                 changed_reqs_only: bool = False):
         self._reqTree = None
         if template:
             if not os.path.isfile(template):
@@ -277,11 +1072,20 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
                     raise UserError('For the desired Documenttype {}, no Tempalte is defined!')
         if template:
             _reqif_dom, _namespace = _get_reqif_dom(template)
+        elif streaming:
+            # the dom is only loaded on demand by write, read parses the file incrementally
+            _reqif_dom, _namespace = None, {}
         else:
             _reqif_dom, _namespace = _get_reqif_dom(reqif_file_path)
         self._reqif_file_path = reqif_file_path
         self._reqif_dom = _reqif_dom
         self._namespace = _namespace
+        self._reqif_index = ReqifIndex(_reqif_dom, _namespace) if _reqif_dom is not None else None
+        self._node_factory = ReqifNodeFactory(_namespace.get('def')) if _reqif_dom is not None else None
+        # a seed makes the ids of new elements reproducible, e.g. for test exports
+        self._id_seed = id_seed
+        self._id_generator = ReqifIdGenerator(
+            id_seed, self._reqif_index.identifiers if self._reqif_index is not None else None)
         self._attribute_config = attribute_config
         self._value_mapping = value_mapping
         self._value_mapping_inverse = value_mapping_inverse if value_mapping_inverse else \
@@ -289,11 +1093,50 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         self._custom_raw_to_req_callback = custom_raw_to_req_callback
         self._template = template
         self._default_values = default_values
+        self._streaming = streaming
+        self._enum_names = {}
+        # datatype IDENTIFIER -> {LONG-NAME -> IDENTIFIER of the ENUM-VALUE}, if the dom is not loaded
+        self._enum_refs_by_datatype = {}
+        self._processes = processes
+        self._chunk_size = chunk_size
+        self._use_image_hash_cache = image_hash_cache
+        self._image_hash_cache = None
+        self._definition_refs_xpath = None
+        # opt-in, write only visits the requirements changed by assignments, by changes of their
+        # children or collections or marked by mark_changed
+        self._changed_reqs_only = changed_reqs_only
+        self._dirty_set = None
+        self._tracked_tree = None
+        # id <-> requirement written before, it is skipped while it is not changed again
+        self._written_reqs = {}
 
     def read(self):
         """ reads all Requirements from a reqif-file"""
         _reporter.status("Reading requirements from reqif file")
 
+        if self._use_image_hash_cache:
+            self._image_hash_cache = ImageHashCache(self._reqif_file_path)
+        if self._streaming:
+            req_list, req_tree = self._read_streaming()
+        else:
+            req_list, req_tree = self._read_dom()
+        if self._image_hash_cache:
+            self._image_hash_cache.save()
+        self._reqTree = ReqTree(req_tree[0], req_list)
+        self._resolve_reqif_tables()
+        # the changes after reading are collected, so that write can visit the changed requirements only
+        self._dirty_set = DirtySet(req_list)
+        self._tracked_tree = self._reqTree
+        self._written_reqs = {}
+
+        return self._reqTree
+
+    def _read_dom(self):
+        """ reads all Requirements from the completely loaded reqif dom
+
+        :returns: list of all Requirements and the list of requirement trees per specification
+        """
+        self._load_reqif_dom()
         # Get all Spectypes from ReqIf
         spectypes_dict = self._get_spectypes()
         # Get all Specobjects (Requirements) from ReqIf
@@ -304,17 +1147,9 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         resolved_specobjects_dict = self._resolve_reqif_references(specobjects_dict,
                                                                    spectypes_dict,
                                                                    specrelations_dict)
-        req_dict = {}
-        req_list = []
-
-        _reporter.start("Converting raw spec objects to internal Requirement Objects",
-                        len(resolved_specobjects_dict.keys()))
-        for idx, specobject in enumerate(resolved_specobjects_dict.values()):
-            new_req = self.raw_to_req(specobject)
-            req_dict[specobject['reqif_id']] = new_req
-            req_list.append(new_req)
-            _reporter.progress(idx + 1)
-        _reporter.finish()
+        req_list = self._convert_specobjects(resolved_specobjects_dict.values(),
+                                             len(resolved_specobjects_dict.keys()))
+        req_dict = dict(zip(resolved_specobjects_dict.keys(), req_list))
 
         req_tree = []
         reqif_reqs = self._reqif_dom.findall('//def:SPECIFICATIONS/def:SPECIFICATION',
@@ -324,21 +1159,286 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
             self._get_spec_hierarchy(req, reqif_requirement,
                                      req_dict)
             req_tree.append(reqif_requirement)
-        self._reqTree = ReqTree(req_tree[0], req_list)
-        self._resolve_reqif_tables()
 
-        return self._reqTree
+        return req_list, req_tree
+
+    def _read_streaming(self):
+        """ reads all Requirements by parsing the reqif-file incrementally. The first pass only
+        collects the type tables and relations, the second pass converts every spec-object as
+        soon as it is parsed and frees it afterwards, so the complete dom is never held in memory.
+
+        :returns: list of all Requirements and the list of requirement trees per specification
+        """
+        spectypes_dict, specrelations_dict = self._read_type_tables_streaming()
+
+        specobject_keys = []
+        specifications = []
+
+        def _iter_specobjects():
+            for element in _iterparse_reqif(self._reqif_file_path,
+                                            ('SPEC-OBJECT', 'SPEC-RELATION', 'SPECIFICATION')):
+                tag = etree.QName(element).localname
+                if tag == 'SPECIFICATION':
+                    # specifications only contain the hierarchy and are resolved after
+                    # all spec-objects are converted
+                    specifications.append(element)
+                    continue
+                if tag == 'SPEC-OBJECT':
+                    specobject_key = element.attrib['IDENTIFIER']
+                    specobject = self._resolve_specobject(
+                        specobject_key, element.findall('./def:VALUES/*', self._namespace),
+                        spectypes_dict, specrelations_dict)
+                    _clear_element(element)
+                    specobject_keys.append(specobject_key)
+                    yield specobject
+                else:
+                    _clear_element(element)
+
+        req_list = self._convert_specobjects(_iter_specobjects())
+        req_dict = dict(zip(specobject_keys, req_list))
+
+        req_tree = []
+        for specification in specifications:
+            reqif_requirement = []
+            self._get_spec_hierarchy(specification, reqif_requirement, req_dict)
+            req_tree.append(reqif_requirement)
+
+        return req_list, req_tree
+
+    def _convert_specobjects(self, specobjects, count: int = None) -> list:
+        """ converts resolved spec-objects to Requirement Objects, in parallel worker processes
+        if the transceiver was created with more than one process
+
+        :param specobjects: iterable of resolved spec-objects in document order
+        :param count: number of spec-objects if known, used for progress reporting
+
+        :returns: list of ReqIf-Requirement-Objects in document order
+        """
+        req_list = []
+        _reporter.start("Converting raw spec objects to internal Requirement Objects", count)
+        if self._processes and self._processes > 1:
+            with multiprocessing.Pool(self._processes, _init_conversion_worker, (self,)) as pool:
+                # the chunks are collected in the order they were submitted, so the result is
+                # identical to a serial run; only a few chunks per process are pending at once,
+                # so a streamed document is not read ahead completely
+                pending = deque()
+                for chunk in _chunks(specobjects, self._chunk_size):
+                    pending.append(pool.apply_async(_convert_specobjects_in_worker, (chunk,)))
+                    if len(pending) >= 2 * self._processes:
+                        self._add_converted_chunk(req_list, *pending.popleft().get())
+                while pending:
+                    self._add_converted_chunk(req_list, *pending.popleft().get())
+        else:
+            for specobject in specobjects:
+                req_list.append(self.raw_to_req(specobject))
+                _reporter.progress(len(req_list))
+        _reporter.finish()
+
+        return req_list
+
+    def _add_converted_chunk(self, req_list: list, reqs: list, image_hashes: dict, cache_stats: tuple):
+        """ adds the requirements converted by a worker process to the list of requirements
+
+        :param req_list: list of all converted requirements
+        :param reqs: requirements of the chunk
+        :param image_hashes: image hashes computed for the chunk
+        :param cache_stats: hits and misses of the conversion cache of the worker for the chunk
+        """
+        req_list.extend(reqs)
+        if self._image_hash_cache:
+            self._image_hash_cache.update(image_hashes)
+        # every worker process has a cache of its own, only its counters are merged
+        CONVERSION_CACHE.add_stats(*cache_stats)
+        _reporter.progress(len(req_list))
+
+    def __getstate__(self):
+        # only the configuration is needed to convert spec-objects in worker processes,
+        # the dom and everything holding its elements can not be pickled, write loads them again
+        state = self.__dict__.copy()
+        state.update(_reqif_dom=None, _reqif_index=None, _reqTree=None, _node_factory=None,
+                     _id_generator=None, _definition_refs_xpath=None, _dirty_set=None,
+                     _tracked_tree=None, _written_reqs={})
+        return state
+
+    def _read_type_tables_streaming(self, spec_object_locator: 'SpecObjectLocator' = None):
+        """ collects spec-types, enum values and spec-relations by parsing the reqif-file
+        incrementally, all other elements are freed right after parsing
+
+        :param spec_object_locator: (opt.) SpecObjectLocator every spec-object is passed to
+
+        :returns: dictonary containing all spec-types and dictonary containing all relations
+        """
+        spectypes_dict = {}
+        specrelations_dict = {}
+        self._enum_names = {}
+        self._enum_refs_by_datatype = {}
+
+        _reporter.start("Parsing spec-types and relations from Reqif document", None)
+        for element in _iterparse_reqif(self._reqif_file_path,
+                                        ('ENUM-VALUE', 'SPEC-ATTRIBUTES', 'SPEC-OBJECT',
+                                         'SPEC-RELATION', 'SPEC-HIERARCHY')):
+            if not self._namespace:
+                self._namespace = {k if k is not None else 'def': v
+                                   for k, v in element.nsmap.items()}
+            tag = etree.QName(element).localname
+            if tag == 'ENUM-VALUE':
+                self._enum_names[element.attrib['IDENTIFIER']] = element.attrib['LONG-NAME']
+                # ENUM-VALUE -> SPECIFIED-VALUES -> DATATYPE-DEFINITION-ENUMERATION
+                self._enum_refs_by_datatype.setdefault(
+                    element.getparent().getparent().get('IDENTIFIER'), {}).setdefault(
+                        element.attrib['LONG-NAME'], element.attrib['IDENTIFIER'])
+            elif tag == 'SPEC-ATTRIBUTES':
+                for spec_type in element:
+                    spectypes_dict[spec_type.attrib['IDENTIFIER']] = [
+                        spec_type.attrib['LONG-NAME'], spec_type.tag,
+                        spec_type.find('./def:TYPE/*', self._namespace).text]
+            elif tag == 'SPEC-RELATION':
+                self._add_spec_relation(element, specrelations_dict)
+            elif tag == 'SPEC-OBJECT' and spec_object_locator is not None:
+                spec_object_locator.add(element, self._namespace)
+            _clear_element(element)
+        _reporter.finish()
+
+        return spectypes_dict, specrelations_dict
 
     def write(self):
-        """ updates a given reqif-file"""
-        spectypes_dict = self._get_spectypes()
-        if self._template:
-            self._create_reqif_from_template(spectypes_dict)
+        """ updates a given reqif-file; a streaming transceiver without template updates the file
+        incrementally and never loads the complete dom
+
+        :returns: the reqif dom or None if the file was updated incrementally
+        """
+        if self._streaming and not self._template:
+            self._update_reqif_streaming()
+            reqif_dom = None
+        else:
+            self._load_reqif_dom()
+            spectype_index = SpectypeIndex(self._get_spectypes())
+            self._definition_refs_xpath = etree.XPath('def:VALUES/*/def:DEFINITION/*', namespaces=self._namespace)
+            if not self._template:
+                self._update_reqif_reqs(spectype_index, self._get_changed_reqs())
+            if self._streaming:
+                self._write_streaming(spectype_index)
+            else:
+                if self._template:
+                    self._create_reqif_from_template(spectype_index.spectypes)
+                with _open_reqif_output(self._reqif_file_path) as output:
+                    self._reqif_dom.write(output, pretty_print=True)
+            reqif_dom = self._reqif_dom
+        if self._dirty_set is not None:
+            self._dirty_set.clear()
+        return reqif_dom
+
+    def _load_reqif_dom(self):
+        """ loads the dom and everything depending on it, if it was not loaded by the constructor,
+        i.e. after a streaming read or after unpickling
+        """
+        if self._reqif_dom is None:
+            self._reqif_dom, self._namespace = _get_reqif_dom(
+                self._template if self._template else self._reqif_file_path)
+            self._reqif_index = None
+        if self._reqif_index is None:
+            self._reqif_index = ReqifIndex(self._reqif_dom, self._namespace)
+            self._node_factory = None
+            self._id_generator = None
+        if self._node_factory is None:
+            self._node_factory = ReqifNodeFactory(self._namespace.get('def'))
+        if self._id_generator is None:
+            self._id_generator = ReqifIdGenerator(self._id_seed, self._reqif_index.identifiers)
         else:
+            self._id_generator.existing_ids = self._reqif_index.identifiers
+
+    def _get_changed_reqs(self):
+        """ returns the updated requirements changed since reading or the last write, if only those
+        should be written
+
+        :returns: list of requirements or None if the whole tree has to be visited
+        """
+        if not self._changed_reqs_only or self._dirty_set is None or \
+                self._reqTree is not self._tracked_tree:
+            return None
+        return [_req for _req in self._dirty_set if InternalStatus.UPDATED in _req.internal_status]
+
+    def _update_reqif_reqs(self, spectype_index: 'SpectypeIndex', changed_reqs: list = None):
+        """ updates the specobjects of the updated requirements
+
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
+        :param changed_reqs: (opt.) requirements to update, otherwise the whole tree is visited
+        """
+        if changed_reqs is None:
             for req in self._reqTree.get_tree():
-                self._update_reqif_req(req, spectypes_dict)
-        self._reqif_dom.write(self._reqif_file_path, pretty_print=True)
-        return self._reqif_dom
+                self._update_reqif_req(req, spectype_index)
+            return
+
+        for req in changed_reqs:
+            spec_object = self._reqif_index.identifiers.get(req.reqif_id)
+            if spec_object is None:
+                spec_object = self._get_spec_object(req.req_id)
+            self._update_spec_object(req, spec_object, spectype_index)
+
+    def _update_reqif_streaming(self):
+        """ updates the specobjects of the updated requirements while the reqif-file is parsed and
+        written incrementally, so only the specobject that is currently written is held in memory.
+        The first pass collects the type tables and finds the specobjects of the requirements.
+        """
+        changed_reqs = self._get_changed_reqs()
+        if changed_reqs is None:
+            # like _update_reqif_reqs, every requirement of the tree needs a specobject
+            reqs = list(_iter_reqs_of_tree(self._reqTree.get_tree()))
+            spec_object_locator = SpecObjectLocator(_req.req_id for _req in reqs)
+        else:
+            reqs = changed_reqs
+            spec_object_locator = SpecObjectLocator((_req.req_id for _req in reqs),
+                                                    (_req.reqif_id for _req in reqs))
+        spectypes_dict, _ = self._read_type_tables_streaming(spec_object_locator)
+
+        updated_reqs = {}
+        for req in reqs:
+            identifier = spec_object_locator.get_identifier(
+                req.req_id, req.reqif_id if changed_reqs is not None else None)
+            if identifier is None:
+                raise UserError('The Specobject with the ReqID "{}" could not be found!'.format(req.req_id))
+            if self._needs_update(req):
+                updated_reqs.setdefault(identifier, []).append(req)
+
+        spectype_index = SpectypeIndex(spectypes_dict)
+        self._definition_refs_xpath = etree.XPath('def:VALUES/*/def:DEFINITION/*', namespaces=self._namespace)
+        if self._node_factory is None:
+            self._node_factory = ReqifNodeFactory(self._namespace.get('def'))
+        spec_object_tag = self._node_factory.tag('SPEC-OBJECT')
+
+        def _update_element(element):
+            if element.tag == spec_object_tag:
+                for req in updated_reqs.get(element.get('IDENTIFIER'), ()):
+                    self._update_spec_object(req, element, spectype_index)
+
+        with _open_reqif_output(self._reqif_file_path) as output:
+            _rewrite_reqif_streaming(self._reqif_file_path, ReqifStreamWriter(output), _update_element)
+
+    def _write_streaming(self, spectype_index: 'SpectypeIndex'):
+        """ writes a new reqif document from the template incrementally to the file; the spec-objects
+        and the spec hierarchy are generated from the requirement tree while writing, so they are
+        never added to the dom
+
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
+        """
+        spec_types_by_name_dict = {v[0]: v[1:3] + [k] for k, v in spectype_index.spectypes.items()}
+        object_type_id = self._reqif_dom.find('//def:SPEC-TYPES/def:SPEC-OBJECT-TYPE',
+                                              self._namespace).attrib['IDENTIFIER']
+        generators = {}
+        # the spec-objects are written first, they set the reqif ids the hierarchy refers to
+        generators[self._reqif_dom.find('//def:SPEC-OBJECTS', self._namespace)] = \
+            lambda writer: self._write_new_specobjects(writer, spec_types_by_name_dict, object_type_id)
+        generators[self._reqif_dom.find('//def:SPECIFICATIONS/def:SPECIFICATION/def:CHILDREN',
+                                        self._namespace)] = self._write_spec_hirarchy
+
+        generator_ancestors = set()
+        for element in generators:
+            generator_ancestors.update(element.iterancestors())
+            generator_ancestors.add(element)
+
+        with _open_reqif_output(self._reqif_file_path) as output:
+            _write_element_streaming(ReqifStreamWriter(output), self._reqif_dom.getroot(), generators,
+                                     generator_ancestors)
 
     # pylint: disable=too-many-branches
     def raw_to_req(self, specobject: dict) -> ReqifRequirement:
@@ -414,30 +1514,16 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         return new_req
 
     def _prepare_content(self, content, new_req):
-        if any([tag in content for tag in BOLD_TAGS]):
-            content = resolve_bold(content)
-        if any([tag in content for tag in LIST_TAGS]):
-            content = resolve_list(content)
-        if any([tag in content for tag in SUB_TAGS]):
-            content = resolve_sub(content)
-        if any([tag in content for tag in SUP_TAGS]):
-            content = resolve_sup(content)
-        if any([tag in content for tag in ITALIC_TAGS]):
-            content = resolve_italic(content)
-        if any([tag in content for tag in STRIKE_TROUGH_TAGS]):
-            content = resolve_strikethrough(content)
-        if any([tag in content for tag in BREAK_TAGS]):
-            content = resolve_break(content)
-        if any([tag in content for tag in IMAGE_TAGS]):
-            content, images = resolve_image(content, self._reqif_file_path)
-            new_req.attachment_hashes.update(images)
-
+        has_images = any([tag in content for tag in IMAGE_TAGS])
+        if not has_images:
+            # Resolve the formatting tags and remove all remaining xhtml tags in the same scan
+            return CONVERSION_CACHE.convert('reqif_to_xhtml', content, _XHTML_NORMALIZER.normalize)
+        # images depend on the files next to the document and add attachments, so they are not cached
+        content = _XHTML_NORMALIZER.normalize(content, remove_remaining=False)
+        content, images = resolve_image(content, self._reqif_file_path, self._image_hash_cache)
+        new_req.attachment_hashes.update(images)
         # Remove all remaining xhtml tags
-        remaining_xhtml = re.findall(r'(</?(reqif-)?xhtml.*?/?>)', content)
-        for remaining_tag in remaining_xhtml:
-            if remaining_tag[0] not in ALL_XHTML_DEFAULT_TAGS:
-                content = content.replace(remaining_tag[0], '')
-        return content
+        return _XHTML_NORMALIZER.remove_remaining_tags(content)
 
     def req_to_raw(self):
         """ has to be implemented if reqif-documents should be generated"""
@@ -453,16 +1539,24 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         spec_relations_dict = {}
 
         for spec_relation in spec_relations:
-            source_node = spec_relation.find('./def:SOURCE/def:SPEC-OBJECT-REF', self._namespace)
-            source = source_node.text if source_node else ''
-            target_node = spec_relation.find('./def:TARGET/def:SPEC-OBJECT-REF', self._namespace)
-            target = target_node.text if target_node else ''
-            if not spec_relations_dict.get(source):
-                spec_relations_dict[source] = []
-            spec_relations_dict[source].append(target)
+            self._add_spec_relation(spec_relation, spec_relations_dict)
 
         return spec_relations_dict
 
+    def _add_spec_relation(self, spec_relation: etree._Element, spec_relations_dict: dict):
+        """ adds the source and target of a spec-relation to the dictonary of relations
+
+        :param spec_relation: lxml element of a SPEC-RELATION
+        :param spec_relations_dict: dictonary containing relations (reqif_id <-> reqif_id)
+        """
+        source_node = spec_relation.find('./def:SOURCE/def:SPEC-OBJECT-REF', self._namespace)
+        source = source_node.text if source_node else ''
+        target_node = spec_relation.find('./def:TARGET/def:SPEC-OBJECT-REF', self._namespace)
+        target = target_node.text if target_node else ''
+        if not spec_relations_dict.get(source):
+            spec_relations_dict[source] = []
+        spec_relations_dict[source].append(target)
+
     def _get_spectypes(self) -> dict:
         """ Extracts the spec-types (representing data-types) from the ReqIf-Document
 
@@ -513,42 +1607,58 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         # Iterate all Requirements
         _reporter.start("Resolving references for spec-objects", len(specobject_dict.keys()))
         for idx, specobject_key in enumerate(specobject_dict.keys()):
-            new_specobject = {}
-            spec_object = specobject_dict[specobject_key]
-            # Iterate all attributes of a Requirement,
-            # call function for specific attribute-type
-            for attrib in spec_object:
-                attrib_definition = \
-                    spectypes_dict[attrib.find('./def:DEFINITION/*', self._namespace).text][0]
-                attrib_type = re.sub('{.*}', '', attrib.tag)
-                if attrib_type == 'ATTRIBUTE-VALUE-INTEGER':
-                    new_specobject[attrib_definition] = self._get_integer(attrib)
-                elif attrib_type == 'ATTRIBUTE-VALUE-BOOLEAN':
-                    new_specobject[attrib_definition] = self._get_boolen(attrib)
-                elif attrib_type == 'ATTRIBUTE-VALUE-XHTML':
-                    new_specobject[attrib_definition] = self._get_xhtml(attrib)
-                elif attrib_type == 'ATTRIBUTE-VALUE-ENUMERATION':
-                    new_specobject[attrib_definition] = self._get_enumeration(attrib,
-                                                                              self._reqif_dom)
-                elif attrib_type == 'ATTRIBUTE-VALUE-STRING':
-                    new_specobject[attrib_definition] = self._get_string(attrib)
-                elif attrib_type == 'ATTRIBUTE-VALUE-DATE':
-                    new_specobject[attrib_definition] = self._get_date(attrib)
-                elif attrib_type == 'ATTRIBUTE-VALUE-REAL':
-                    new_specobject[attrib_definition] = self._get_real(attrib)
-                else:  # pragma: no branch
-                    raise ValueError(
-                        'Could not parse Requirement with specobject key '
-                        '{}. Unknown Attributetype {}'.format(specobject_key, attrib_type))
-            new_specobject['reqif_id'] = specobject_key
-            # get relations
-            new_specobject['_links'] = specrelations_dict.get(specobject_key)
-            result_dict[specobject_key] = new_specobject
+            result_dict[specobject_key] = self._resolve_specobject(specobject_key,
+                                                                   specobject_dict[specobject_key],
+                                                                   spectypes_dict,
+                                                                   specrelations_dict)
             _reporter.progress(idx + 1)
         _reporter.finish()
 
         return result_dict
 
+    def _resolve_specobject(self, specobject_key: str, spec_object: list, spectypes_dict: dict,
+                            specrelations_dict: dict) -> dict:
+        """ Resolves the References of a single ReqIf-Requirement
+
+        :param specobject_key: ReqIf-Id of the Requirement
+        :param spec_object: list of the attribute value nodes of the Requirement
+        :param spectypes_dict: Dictonary containing the ReqIf-spectypes
+        :param specrelations_dict: Dictonary containing the SpecRelations
+
+        :returns: dictonary containing the Requirement with resolved References
+        """
+        new_specobject = {}
+        # Iterate all attributes of a Requirement,
+        # call function for specific attribute-type
+        for attrib in spec_object:
+            attrib_definition = \
+                spectypes_dict[attrib.find('./def:DEFINITION/*', self._namespace).text][0]
+            attrib_type = re.sub('{.*}', '', attrib.tag)
+            if attrib_type == 'ATTRIBUTE-VALUE-INTEGER':
+                new_specobject[attrib_definition] = self._get_integer(attrib)
+            elif attrib_type == 'ATTRIBUTE-VALUE-BOOLEAN':
+                new_specobject[attrib_definition] = self._get_boolen(attrib)
+            elif attrib_type == 'ATTRIBUTE-VALUE-XHTML':
+                new_specobject[attrib_definition] = self._get_xhtml(attrib)
+            elif attrib_type == 'ATTRIBUTE-VALUE-ENUMERATION':
+                new_specobject[attrib_definition] = self._get_enumeration(attrib,
+                                                                          self._reqif_dom)
+            elif attrib_type == 'ATTRIBUTE-VALUE-STRING':
+                new_specobject[attrib_definition] = self._get_string(attrib)
+            elif attrib_type == 'ATTRIBUTE-VALUE-DATE':
+                new_specobject[attrib_definition] = self._get_date(attrib)
+            elif attrib_type == 'ATTRIBUTE-VALUE-REAL':
+                new_specobject[attrib_definition] = self._get_real(attrib)
+            else:  # pragma: no branch
+                raise ValueError(
+                    'Could not parse Requirement with specobject key '
+                    '{}. Unknown Attributetype {}'.format(specobject_key, attrib_type))
+        new_specobject['reqif_id'] = specobject_key
+        # get relations
+        new_specobject['_links'] = specrelations_dict.get(specobject_key)
+
+        return new_specobject
+
     def _get_req_with_mapping(self, specobject: dict) -> dict:
         """ mappes attributes of ReqIf Requirements to
         given attributes of th config
@@ -622,8 +1732,7 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
             enum_values = []
             for enum_ref in enums:
                 enum_values.append(
-                    self._reqif_dom.find("//*[@IDENTIFIER='{}']".format(
-                        enum_ref.text), self._namespace).attrib['LONG-NAME'])
+                    self._reqif_index.identifiers[enum_ref.text].attrib['LONG-NAME'])
             return ', '.join(enum_values)
         elif re.sub('{.*}', '', node.tag) == 'ATTRIBUTE-VALUE-XHTML':  # pragma: no cover
             return self._get_xhtml(node)
@@ -646,211 +1755,186 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
             node.attrib['THE-VALUE'] = value
         elif re.sub('{.*}', '', node.tag) == 'ATTRIBUTE-VALUE-ENUMERATION':
             try:
-                enum_definitions = self._reqif_dom.find(
-                    '//def:DATATYPE-DEFINITION-ENUMERATION/'
-                    'def:SPECIFIED-VALUES/def:ENUM-VALUE[@LONG-NAME="{}"]'.format(
-                        value), self._namespace)
-                enum_list = enum_definitions.getparent().findall('./def:ENUM-VALUE',
-                                                                 self._namespace)
-                idx = [enum.attrib['LONG-NAME'] for enum in enum_list].index(value)
                 node.find('./def:VALUES/def:ENUM-VALUE-REF', self._namespace).text = \
-                    [enum.attrib['IDENTIFIER'] for enum in enum_list][idx]
+                    self._reqif_index.enum_values[value].attrib['IDENTIFIER']
             # falscher Wert für ein Enum
-            except AttributeError:
+            except KeyError:
                 raise ValueError(
                     'Der Enum Wert {} ist im Reqif-Dokument nicht definiert'.format(
                         value))
         elif re.sub('{.*}', '', node.tag) == 'ATTRIBUTE-VALUE-XHTML':  # pragma: no cover
             print('Änderungen an XHTML-Knoten noch nicht implementiert')
 
-    # pylint: disable=too-many-locals
-    # pylint: disable=too-many-nested-blocks
-    # pylint: disable=too-many-branches
-    def _update_reqif_req(self, req: 'Requirement', spectypes_dict: dict):
+    def _update_reqif_req(self, req: 'Requirement', spectype_index: 'SpectypeIndex'):
         """ updates ReqIf Requirements
 
         :param req: Requirement-Object with values to update Reqif; Source-Requirement
-        :param spectypes_dict: Dict with all Spec-Types in the ReqIf-File
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
         """
         spec_object = self._get_spec_object(req.req_id)
 
-        if InternalStatus.UPDATED in req._internal_status:
-            if hasattr(req, 'status') and req.status:
-                status_ref = self._get_spectyps_ref(spectypes_dict, 'status')
-                status_node = self._get_status_node(spectypes_dict, spec_object)
-                if req.status == RequirementStatus.IN_WORK:
-                    value = self._value_mapping_inverse.get(RequirementStatus.IN_WORK)
-                elif req.status == RequirementStatus.IN_REVIEW:
-                    value = self._value_mapping_inverse.get(RequirementStatus.IN_REVIEW)
-                elif req.status == RequirementStatus.NEW:
-                    value = self._value_mapping_inverse.get(RequirementStatus.NEW)
-                elif req.status == RequirementStatus.ACCEPTED:
-                    value = self._value_mapping_inverse.get(RequirementStatus.ACCEPTED)
-                elif req.status == RequirementStatus.REJECTED:
-                    value = self._value_mapping_inverse.get(RequirementStatus.REJECTED)
-                elif req.status == RequirementStatus.UNCLEAR_EXTERNAL:
-                    value = self._value_mapping_inverse.get(RequirementStatus.UNCLEAR_EXTERNAL)
-                elif req.status == RequirementStatus.UNCLEAR_INTERNAL:
-                    value = self._value_mapping_inverse.get(RequirementStatus.UNCLEAR_INTERNAL)
-                else:
-                    raise ValueError(
-                        'Requirement {} got an unknown Requirement-Status: {}'.format(
-                            req.req_id, req.status))
-
-                enum_ref_nodes = \
-                    self._reqif_dom.findall(
-                        "//def:DATATYPE-DEFINITION-ENUMERATION[@IDENTIFIER='{}']/"
-                        "def:SPECIFIED-VALUES/*".format(spectypes_dict[status_ref][2]),
-                        self._namespace)
-                for enum_ref in enum_ref_nodes:
-                    if enum_ref.attrib['LONG-NAME'] == value:
-                        value = enum_ref.attrib['IDENTIFIER']
-                        status_node.find('def:VALUES/def:ENUM-VALUE-REF',
-                                         self._namespace).text = value
-                        values_node = spec_object.findall("def:VALUES", self._namespace)[0]
-                        values_node.append(status_node)
-                        break
-
-            if hasattr(req, 'internal_comments') and req.internal_comments:
-                internal_comment_node = self._get_internal_comments_node(spectypes_dict,
-                                                                         spec_object, req)
-                values_node = spec_object.findall("def:VALUES", self._namespace)[0]
-                values_node.append(internal_comment_node)
-
-            if hasattr(req, 'customer_comments') and req.customer_comments:
-                customer_comment_node = self._get_customer_comments_node(spectypes_dict,
-                                                                         spec_object, req)
-                values_node = spec_object.findall("def:VALUES", self._namespace)[0]
-                values_node.append(customer_comment_node)
-
-            if hasattr(req, 'review_comments') and req.review_comments:
-                review_comments_node = self._get_review_comments_node(spectypes_dict,
-                                                                      spec_object, req)
-                values_node = spec_object.findall("def:VALUES", self._namespace)[0]
-                values_node.append(review_comments_node)
+        if self._needs_update(req):
+            self._update_spec_object(req, spec_object, spectype_index)
 
         # recursive call for Child-Elements
         for child in req.children:
-            self._update_reqif_req(child, spectypes_dict)
-
-    def _get_spectyps_ref(self, spectypes_dict, req_attribute_name):
-        spectyps_ref = None
-        for key, values in spectypes_dict.items():
-            if values[0] == self._attribute_config[req_attribute_name]:
-                spectyps_ref = key
-                break
-        return spectyps_ref
-
-    def _get_status_node(self, spectypes_dict, spec_object):
-        for spectype_id, spectypes_value in spectypes_dict.items():
-            if self._attribute_config['status'] == spectypes_value[0]:
-                attribute_reqif_id = spectype_id
-
-        spec_object_values = spec_object.findall('def:VALUES/*', self._namespace)
-        status_node = None
-        for value in spec_object_values:
-            node_as_string = etree.tostring(value, encoding="unicode")
-            if attribute_reqif_id in node_as_string:
-                status_node = value
-                break
-
-        if not status_node:
-            status_node = etree.fromstring(
-                '<def:ATTRIBUTE-VALUE-ENUMERATION xmlns:def="http://www.omg.org/spec/ReqIF/20110401/reqif.xsd">'
-                '<def:DEFINITION>'
-                '<def:ATTRIBUTE-DEFINITION-ENUMERATION-REF >{}</def:ATTRIBUTE-DEFINITION-ENUMERATION-REF>'
-                '</def:DEFINITION>'
-                '<def:VALUES>'
-                '<def:ENUM-VALUE-REF>'
-                '</def:ENUM-VALUE-REF>'
-                '</def:VALUES>'
-                '</def:ATTRIBUTE-VALUE-ENUMERATION>'.format(attribute_reqif_id))
-
-        return status_node
-
-    def _get_internal_comments_node(self, spectypes_dict, spec_object, req):
-        for spectype_id, spectypes_value in spectypes_dict.items():
-            if self._attribute_config['internal_comments'] == spectypes_value[0]:
-                attribute_reqif_id = spectype_id
-
-        internal_comments_node = None
-        def_nodes = spec_object.findall(
-            'def:VALUES/def:ATTRIBUTE-VALUE-XHTML/def:DEFINITION/def:ATTRIBUTE-DEFINITION-XHTML-REF',
-            self._namespace)
-        for node in def_nodes:
-            if node.text is attribute_reqif_id:
-                internal_comments_node = node
-                break
-        if not internal_comments_node:
-            internal_comments_node = etree.fromstring(
-                '<def:ATTRIBUTE-VALUE-XHTML xmlns:def="http://www.omg.org/spec/ReqIF/20110401/reqif.xsd">'
-                '<def:DEFINITION>'
-                '<def:ATTRIBUTE-DEFINITION-XHTML-REF >{}</def:ATTRIBUTE-DEFINITION-XHTML-REF>'
-                '</def:DEFINITION><def:THE-VALUE>'
-                '<reqif-xhtml:div xmlns:reqif-xhtml="http://www.w3.org/1999/xhtml">'
-                '{}</reqif-xhtml:div>'
-                '</def:THE-VALUE>'
-                '</def:ATTRIBUTE-VALUE-XHTML>'.format(attribute_reqif_id,
-                                                      self._convert_xhtml_to_reqif(
-                                                          req.internal_comments)))
-
-        return internal_comments_node
-
-    def _get_customer_comments_node(self, spectypes_dict, spec_object, req):
-        for spectype_id, spectypes_value in spectypes_dict.items():
-            if self._attribute_config['customer_comments'] == spectypes_value[0]:
-                attribute_reqif_id = spectype_id
-
-        customer_comments_node = None
-        def_nodes = spec_object.findall(
-            'def:VALUES/def:ATTRIBUTE-VALUE-XHTML/def:DEFINITION/def:ATTRIBUTE-DEFINITION-XHTML-REF',
-            self._namespace)
-        for node in def_nodes:
-            if node.text is attribute_reqif_id:
-                customer_comments_node = node
-                break
-        if not customer_comments_node:
-            customer_comments_node = etree.fromstring(
-                '<def:ATTRIBUTE-VALUE-XHTML xmlns:def="http://www.omg.org/spec/ReqIF/20110401/reqif.xsd">'
-                '<def:DEFINITION>'
-                '<def:ATTRIBUTE-DEFINITION-XHTML-REF >{}</def:ATTRIBUTE-DEFINITION-XHTML-REF>'
-                '</def:DEFINITION><def:THE-VALUE>'
-                '<reqif-xhtml:div xmlns:reqif-xhtml="http://www.w3.org/1999/xhtml">'
-                '{}</reqif-xhtml:div>'
-                '</def:THE-VALUE>'
-                '</def:ATTRIBUTE-VALUE-XHTML>'.format(attribute_reqif_id,
-                                                      self._convert_xhtml_to_reqif(
-                                                          req.customer_comments)))
-
-        return customer_comments_node
-
-    def _get_review_comments_node(self, spectypes_dict, spec_object, req):
-        for spectype_id, spectypes_value in spectypes_dict.items():
-            if self._attribute_config['review_comments'] == spectypes_value[0]:
-                attribute_reqif_id = spectype_id
-
-        review_comments_node = None
-        def_nodes = spec_object.findall(
-            'def:VALUES/def:ATTRIBUTE-VALUE-XHTML/def:DEFINITION/def:ATTRIBUTE-DEFINITION-XHTML-REF',
-            self._namespace)
-        for node in def_nodes:
-            if node.text is attribute_reqif_id:
-                review_comments_node = node
-                break
-        if not review_comments_node:
-            review_comments_node = etree.fromstring(
-                '<def:ATTRIBUTE-VALUE-XHTML xmlns:def="http://www.omg.org/spec/ReqIF/20110401/reqif.xsd">'
-                '<def:DEFINITION>'
-                '<def:ATTRIBUTE-DEFINITION-XHTML-REF >{}</def:ATTRIBUTE-DEFINITION-XHTML-REF>'
-                '</def:DEFINITION><def:THE-VALUE>'
-                '<reqif-xhtml:div xmlns:reqif-xhtml="http://www.w3.org/1999/xhtml">'
-                '{}</reqif-xhtml:div>'
-                '</def:THE-VALUE>'
-                '</def:ATTRIBUTE-VALUE-XHTML>'.format(attribute_reqif_id,
-                                                      self._convert_xhtml_to_reqif(
-                                                          req.review_comments)))
-
-        return review_comments_node
+            self._update_reqif_req(child, spectype_index)
+
+    def _needs_update(self, req: 'Requirement') -> bool:
+        """ checks if the specobject of an updated requirement has to be written, a requirement which
+        was written before is skipped unless it was changed since
+
+        :param req: Requirement to check
+        :returns: True if the requirement has to be written
+        """
+        if InternalStatus.UPDATED not in req._internal_status:
+            return False
+        if self._dirty_set is None or self._reqTree is not self._tracked_tree:
+            return True
+        return id(req) not in self._written_reqs or req in self._dirty_set
+
+    # pylint: disable=too-many-branches
+    def _update_spec_object(self, req: 'Requirement', spec_object, spectype_index: 'SpectypeIndex'):
+        """ writes the status and the comments of an updated requirement to its specobject
+
+        :param req: Requirement-Object with values to update Reqif; Source-Requirement
+        :param spec_object: lxml element of the specobject of the requirement
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
+        """
+        values_node = spec_object.findall("def:VALUES", self._namespace)[0]
+        value_nodes = self._get_value_nodes(spec_object)
+        if hasattr(req, 'status') and req.status:
+            status_ref, status_node = self._get_status_node(spectype_index, value_nodes)
+            if req.status == RequirementStatus.IN_WORK:
+                value = self._value_mapping_inverse.get(RequirementStatus.IN_WORK)
+            elif req.status == RequirementStatus.IN_REVIEW:
+                value = self._value_mapping_inverse.get(RequirementStatus.IN_REVIEW)
+            elif req.status == RequirementStatus.NEW:
+                value = self._value_mapping_inverse.get(RequirementStatus.NEW)
+            elif req.status == RequirementStatus.ACCEPTED:
+                value = self._value_mapping_inverse.get(RequirementStatus.ACCEPTED)
+            elif req.status == RequirementStatus.REJECTED:
+                value = self._value_mapping_inverse.get(RequirementStatus.REJECTED)
+            elif req.status == RequirementStatus.UNCLEAR_EXTERNAL:
+                value = self._value_mapping_inverse.get(RequirementStatus.UNCLEAR_EXTERNAL)
+            elif req.status == RequirementStatus.UNCLEAR_INTERNAL:
+                value = self._value_mapping_inverse.get(RequirementStatus.UNCLEAR_INTERNAL)
+            else:
+                raise ValueError(
+                    'Requirement {} got an unknown Requirement-Status: {}'.format(
+                        req.req_id, req.status))
+
+            enum_ref = self._get_enum_ref(spectype_index.get_datatype(status_ref), value)
+            enum_ref_node = status_node.find('def:VALUES/def:ENUM-VALUE-REF', self._namespace)
+            # an unchanged status is left as it is
+            if enum_ref is not None and (status_node.getparent() is None or enum_ref_node.text != enum_ref):
+                enum_ref_node.text = enum_ref
+                values_node.append(status_node)
+
+        if hasattr(req, 'internal_comments') and req.internal_comments:
+            internal_comment_node = self._get_comments_node(spectype_index, value_nodes,
+                                                            'internal_comments', req.internal_comments)
+            values_node.append(internal_comment_node)
+
+        if hasattr(req, 'customer_comments') and req.customer_comments:
+            customer_comment_node = self._get_comments_node(spectype_index, value_nodes,
+                                                            'customer_comments', req.customer_comments)
+            values_node.append(customer_comment_node)
+
+        if hasattr(req, 'review_comments') and req.review_comments:
+            review_comments_node = self._get_comments_node(spectype_index, value_nodes,
+                                                           'review_comments', req.review_comments)
+            values_node.append(review_comments_node)
+
+        self._written_reqs[id(req)] = req
+
+    def _get_enum_ref(self, datatype_ref: str, long_name: str):
+        """ finds the enum value of an enumeration datatype by its name
+
+        :param datatype_ref: reqif id of the enumeration datatype
+        :param long_name: LONG-NAME of the enum value
+
+        :returns: reqif id of the enum value or None if the datatype has no such value
+        """
+        if self._reqif_index is None:
+            return self._enum_refs_by_datatype.get(datatype_ref, {}).get(long_name)
+        enum_value = self._reqif_index.enum_values_by_datatype.get(datatype_ref, {}).get(long_name)
+        return enum_value.attrib['IDENTIFIER'] if enum_value is not None else None
+
+    def _get_value_nodes(self, spec_object) -> dict:
+        """ maps the value nodes of a specobject by the reqif id of their attribute definition
+
+        :param spec_object: lxml element of the specobject
+
+        :returns: dictonary (definition ref <-> value node)
+        """
+        value_nodes = {}
+        for definition_ref in self._definition_refs_xpath(spec_object):
+            value_nodes.setdefault(definition_ref.text, definition_ref.getparent().getparent())
+        return value_nodes
+
+    def _get_attribute_value_node(self, spectype_index: 'SpectypeIndex', value_nodes: dict,
+                                  req_attribute_name: str) -> tuple:
+        """ finds the value node of a requirement attribute among the value nodes of a specobject
+
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
+        :param value_nodes: value nodes of the specobject by their definition ref
+        :param req_attribute_name: name of the requirement attribute
+
+        :returns: reqif id of the attribute definition and the value node or None if the specobject
+                  has no value for the attribute
+        """
+        definition_ids = spectype_index.get_ids(self._attribute_config[req_attribute_name])
+        if not definition_ids:
+            raise UserError('The attribute {} is not defined in the reqif document!'.format(
+                self._attribute_config[req_attribute_name]))
+        for definition_id in definition_ids:
+            if definition_id in value_nodes:
+                return definition_id, value_nodes[definition_id]
+        return definition_ids[0], None
+
+    def _get_status_node(self, spectype_index: 'SpectypeIndex', value_nodes: dict) -> tuple:
+        """ finds the status value node of a specobject or creates a new one
+
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
+        :param value_nodes: value nodes of the specobject by their definition ref
+
+        :returns: reqif id of the status definition and the status node
+        """
+        attribute_reqif_id, status_node = self._get_attribute_value_node(spectype_index, value_nodes,
+                                                                         'status')
+        if status_node is None:
+            status_node = self._node_factory.enum_value(attribute_reqif_id)
+
+        return attribute_reqif_id, status_node
+
+    def _get_comments_node(self, spectype_index: 'SpectypeIndex', value_nodes: dict, req_attribute_name: str,
+                           comments: str):
+        """ creates a new value node of a comments attribute, an existing value of the specobject
+        is kept
+
+        :param spectype_index: SpectypeIndex of all Spec-Types in the ReqIf-File
+        :param value_nodes: value nodes of the specobject by their definition ref
+        :param req_attribute_name: name of the comments attribute of the requirement
+        :param comments: xhtml string of the comments
+
+        :returns: lxml element of the new value node
+        """
+        attribute_reqif_id, _ = self._get_attribute_value_node(spectype_index, value_nodes, req_attribute_name)
+        return self._get_comments_value_node(attribute_reqif_id, comments)
+
+    def _get_comments_value_node(self, attribute_reqif_id: str, comments: str):
+        """ creates the xhtml value node of a comments attribute
+
+        :param attribute_reqif_id: reqif id of the attribute definition
+        :param comments: xhtml string of the comments
+
+        :returns: lxml element of the attribute value
+        """
+        return self._node_factory.xhtml_value_from_markup(
+            attribute_reqif_id,
+            '<reqif-xhtml:div xmlns:reqif-xhtml="{}">{}</reqif-xhtml:div>'.format(
+                XHTML_NAMESPACE, self._convert_xhtml_to_reqif(comments)))
 
     def _convert_xhtml_to_reqif(self, xhtml_string: str):
         if DEFAULT_STRIKE_TROUGH in xhtml_string:
@@ -920,13 +2004,17 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         if more than one enum values are given, they are joined by ','
 
         :param node: etree.ElementTree-Object containing enum attribute of a SPEC-OBJECT
+        :param reqif_dom: complete reqif dom, None if the file is read incrementally
         :returns: string: enum value as a string
         """
         enums = node.findall('./def:VALUES/*', self._namespace)
         enum_values = []
         for enum_ref in enums:
-            enum_values.append(
-                reqif_dom.find("//*[@IDENTIFIER='{}']".format(enum_ref.text)).attrib['LONG-NAME'])
+            if reqif_dom is None:
+                enum_values.append(self._enum_names[enum_ref.text])
+            else:
+                enum_values.append(
+                    self._reqif_index.identifiers[enum_ref.text].attrib['LONG-NAME'])
         return ', '.join(enum_values)
 
     def _get_xhtml(self, node: etree.ElementTree) -> etree.ElementTree:
@@ -978,18 +2066,46 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         spec_types_by_name_dict = {v[0]: v[1:3] + [k] for k, v in spectypes_dict.items()}
         object_type_id = \
             self._reqif_dom.find('//def:SPEC-TYPES/def:SPEC-OBJECT-TYPE', self._namespace).attrib['IDENTIFIER']
+        # searching the dom gets slower with every added specobject, so the node is only searched once
+        spec_objects_node = _strip_blank_text(self._reqif_dom.find('//def:SPEC-OBJECTS', self._namespace))
         for req in self._reqTree.get_all_requirements_list():
-            self._create_new_specobject(req, spec_types_by_name_dict, object_type_id)
+            self._create_new_specobject(req, spec_types_by_name_dict, object_type_id, spec_objects_node)
         self._create_spec_hirarchy()
 
-    def _create_new_specobject(self, req: ReqifRequirement, spec_types_by_name_dict: dict, object_type_id: str):
+    def _create_new_specobject(self, req: ReqifRequirement, spec_types_by_name_dict: dict, object_type_id: str,
+                               spec_objects_node):
         """ creates a new reqif specobject (issue) from a req-object
 
         :param req: python requierement
         :param spec_types_by_name_dict: dictonary of spectypes with key= name and vale = [type, definitionref, reqif-id]
         :param object_type_id: id of the objecttype (fixed for most reqifs)
+        :param spec_objects_node: lxml element of the SPEC-OBJECTS node the specobject is added to
         """
-        spec_object = _create_spcobject_without_values(req, object_type_id)
+        spec_object = self._get_new_specobject(req, spec_types_by_name_dict, object_type_id)
+        spec_objects_node.append(spec_object)
+        self._reqif_index.add(spec_object)
+
+    def _write_new_specobjects(self, writer: ReqifStreamWriter, spec_types_by_name_dict: dict, object_type_id: str):
+        """ writes a new reqif specobject for each requirement to a stream writer
+
+        :param writer: ReqifStreamWriter the document is written to
+        :param spec_types_by_name_dict: dictonary of spectypes with key= name and vale = [type, definitionref, reqif-id]
+        :param object_type_id: id of the objecttype (fixed for most reqifs)
+        """
+        for req in self._reqTree.get_all_requirements_list():
+            writer.write(self._get_new_specobject(req, spec_types_by_name_dict, object_type_id))
+
+    def _get_new_specobject(self, req: ReqifRequirement, spec_types_by_name_dict: dict, object_type_id: str):
+        """ builds a new reqif specobject (issue) from a req-object
+
+        :param req: python requierement
+        :param spec_types_by_name_dict: dictonary of spectypes with key= name and vale = [type, definitionref, reqif-id]
+        :param object_type_id: id of the objecttype (fixed for most reqifs)
+
+        :returns spec_object: lxml element of the specobject
+        """
+        spec_object = _create_spcobject_without_values(req, object_type_id, self._node_factory,
+                                                       self._id_generator)
         for req_attribute, reqif_attribute in self._attribute_config.items():
             if req_attribute == 'content':
                 if req.category == RequirementCategory.HEADING:
@@ -1004,10 +2120,11 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
                         attribute_value = req.__getattribute__(req_attribute)
                         spectype = spec_types_by_name_dict.get(attribute)
                         if 'ATTRIBUTE-DEFINITION-XHTML' in spectype[0]:
-                            _add_xhtml_value_to_spec_object(spec_object, attribute_value, spectype[2])
+                            _add_xhtml_value_to_spec_object(spec_object, attribute_value, spectype[2],
+                                                            self._node_factory)
                         elif 'ATTRIBUTE-DEFINITION-ENUMERATION' in spectype[0]:
                             self._add_enum_value_to_spec_object(spec_object, attribute_value, spectype[2])
-        self._reqif_dom.find('//def:SPEC-OBJECTS', self._namespace).append(spec_object)
+        return spec_object
 
     def _add_enum_value_to_spec_object(self, spec_object, attribute_value: str, type_ref: str):
         """ adds value to spec object element
@@ -1017,15 +2134,8 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         :param type_ref: reqif ref of the enum type
         """
         enum_ref = self._get_enum_ref_by_value(attribute_value)
-        enum_value = etree.fromstring('<ATTRIBUTE-VALUE-ENUMERATION>'
-                                      '<DEFINITION>'
-                                      '<ATTRIBUTE-DEFINITION-ENUMERATION-REF>{}</ATTRIBUTE-DEFINITION-ENUMERATION-REF>'
-                                      '</DEFINITION>'
-                                      '<VALUES>'
-                                      '<ENUM-VALUE-REF>{}</ENUM-VALUE-REF>'
-                                      '</VALUES>'
-                                      '</ATTRIBUTE-VALUE-ENUMERATION>'.format(type_ref, enum_ref))
-        spec_object.find('./VALUES').append(enum_value)
+        enum_value = self._node_factory.enum_value(type_ref, enum_ref)
+        self._node_factory.get_values_node(spec_object).append(enum_value)
 
     def _get_enum_ref_by_value(self, attribute_values):
         """ gets the enum ref of an attribute value
@@ -1040,14 +2150,14 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
             if self._value_mapping_inverse.get(attribute_value):
                 attribute_value = self._value_mapping_inverse[attribute_value]
 
-            enum_ref = self._reqif_dom.find('//def:ENUM-VALUE[@LONG-NAME="{}"]'.format(attribute_value),
-                                            self._namespace).attrib['IDENTIFIER']
+            enum_ref = self._reqif_index.enum_values[attribute_value].attrib['IDENTIFIER']
         return enum_ref
 
     def _create_spec_hirarchy(self):
         """ creates the spec hirarchy of the reqif representing the parent-child relations of the Requirements
         """
-        start_node = self._reqif_dom.find('//def:SPECIFICATIONS/def:SPECIFICATION/def:CHILDREN', self._namespace)
+        start_node = _strip_blank_text(
+            self._reqif_dom.find('//def:SPECIFICATIONS/def:SPECIFICATION/def:CHILDREN', self._namespace))
         for req in self._reqTree.get_tree():
             self._create_hirarchy_node(req, start_node)
 
@@ -1057,19 +2167,49 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
         :param req: Requirement to create hirarchy for
         :param start_node: etree element to start with
         """
-        date = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
-        reqif_id = create_reqif_id()
-        hirarchy = etree.fromstring('<SPEC-HIERARCHY IS-TABLE-INTERNAL="false" LAST-CHANGE="{}" IDENTIFIER="{}">'
-                                    '<OBJECT>'
-                                    '<SPEC-OBJECT-REF>{}</SPEC-OBJECT-REF>'
-                                    '</OBJECT>'
-                                    '<CHILDREN></CHILDREN>'
-                                    '</SPEC-HIERARCHY>'.format(date, reqif_id, req.reqif_id))
+        hirarchy = self._get_hirarchy_node(req)
         start_node.append(hirarchy)
-        new_start_node = hirarchy.find('./CHILDREN', self._namespace)
+        self._reqif_index.add(hirarchy)
+        new_start_node = hirarchy[1]
         for child in req.children:
             self._create_hirarchy_node(child, new_start_node)
 
+    def _get_hirarchy_node(self, req: ReqifRequirement):
+        """ builds a hirarchy node without children
+
+        :param req: Requirement the node refers to
+
+        :returns hirarchy: lxml element of the hirarchy node, its second child is the CHILDREN node
+        """
+        date = datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%f")
+        reqif_id = self._id_generator.create_id()
+        return self._node_factory.hierarchy(date, reqif_id, req.reqif_id)
+
+    def _write_spec_hirarchy(self, writer: ReqifStreamWriter):
+        """ writes the spec hirarchy of all requirements to a stream writer
+
+        :param writer: ReqifStreamWriter the document is written to
+        """
+        for req in self._reqTree.get_tree():
+            self._write_hirarchy_node(writer, req)
+
+    def _write_hirarchy_node(self, writer: ReqifStreamWriter, req: ReqifRequirement):
+        """ writes hirarchy nodes with recursive calls, the children are written into the open
+        node, so only the nodes of the current path are kept in memory
+
+        :param writer: ReqifStreamWriter the document is written to
+        :param req: Requirement to write the hirarchy for
+        """
+        hirarchy = self._get_hirarchy_node(req)
+        object_node, children_node = hirarchy
+        writer.start(hirarchy)
+        writer.write(object_node)
+        writer.start(children_node)
+        for child in req.children:
+            self._write_hirarchy_node(writer, child)
+        writer.end()
+        writer.end()
+
     def _get_spec_object(self, req_id):
         """ finds the specobject for a specific id
 
@@ -1077,15 +2217,8 @@ class ReqIfTransceiver:  # pylint: disable=too-many-instance-attributes
 
         :returns spec_object: lxml elemnt of the specobject
         """
-        spec_object = self._reqif_dom.find(
-            "//def:SPEC-OBJECTS/def:SPEC-OBJECT[@LONG-NAME='{}']".format(req_id), self._namespace)
-        if not spec_object:
-            xpath_results = self._reqif_dom.xpath(
-                '//def:SPEC-OBJECTS/def:SPEC-OBJECT/def:VALUES/*/*/*/*[text()="{}"]'.format(req_id),
-                namespaces=self._namespace)
-            if xpath_results:
-                spec_object = xpath_results[0].getparent().getparent().getparent().getparent().getparent()
-            else:
-                raise UserError('The Specobject with the ReqID "{}" could not be found!'.format(req_id))
+        spec_object = self._reqif_index.get_spec_object(req_id)
+        if spec_object is None:
+            raise UserError('The Specobject with the ReqID "{}" could not be found!'.format(req_id))
 
         return spec_object
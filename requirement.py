@@ -90,6 +90,9 @@ class ASIL(Enum):
 AttributeConfig = namedtuple("AttributeConfig", ["name", "type", "is_enum"])
 MAX_LENGTH_SUMMARY = 50
 MAX_LENGTH_SATISFIES = 250
+_XHTML_TAG_PATTERN = re.compile('<[^>]*>')
+# splits a req_id into text and numbers for the natural sort key
+_NATURAL_SORT_PATTERN = re.compile('([0-9]+)')
 
 
 def xhtml_to_raw(
@@ -99,51 +102,303 @@ def xhtml_to_raw(
     :param attribute_value: attribute value to be checked and converted
     :return: converted string or None, if the given attribute value is not of type etree._Element
     """
-    pattern = b'<[^>]*>'
+    if attribute_value is None:
+        return None
 
     if isinstance(attribute_value, etree._Element):  # pylint: disable=protected-access
-        attribute_value = etree.tostring(attribute_value, encoding='utf-8', method='xml')
-
-    if attribute_value is not None:
-        if not isinstance(attribute_value, bytes):
-            for break_tag in BREAK_TAGS:
+        attribute_value = etree.tostring(attribute_value, encoding='unicode', method='xml')
+        return _XHTML_TAG_PATTERN.sub(' ', attribute_value).strip()
+
+    if isinstance(attribute_value, bytes):
+        attribute_value = attribute_value.decode('utf-8')
+    elif '<' not in attribute_value:
+        return attribute_value.strip()
+    else:
+        for break_tag in BREAK_TAGS:
+            if break_tag in attribute_value:
                 attribute_value = attribute_value.replace(break_tag, '\n')
-            attribute_value = str.encode(attribute_value)
 
-        attribute_value = re.sub(pattern, b' ', attribute_value).decode('utf-8').strip()
+    return _XHTML_TAG_PATTERN.sub(' ', attribute_value).strip()
+
+
+# shared placeholder for collections of a requirement that were not accessed yet
+_EMPTY_SET = frozenset()
+
+
+class _ChildList(list):
+    """ List of the children of a requirement, changing it marks the requirement as changed """
+    __slots__ = ('_owner',)
+
+    def __init__(self, owner, children=()):
+        super().__init__(children)
+        self._owner = owner
+
+    def _changed(self):
+        # unpickling appends the children before the owner is restored
+        owner = getattr(self, '_owner', None)
+        if owner is not None:
+            owner.mark_changed()
+
+    def append(self, child):
+        super().append(child)
+        self._changed()
+
+    def extend(self, children):
+        super().extend(children)
+        self._changed()
+
+    def insert(self, index, child):
+        super().insert(index, child)
+        self._changed()
+
+    def remove(self, child):
+        super().remove(child)
+        self._changed()
+
+    def pop(self, index=-1):
+        child = super().pop(index)
+        self._changed()
+        return child
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, children):
+        result = super().__iadd__(children)
+        self._changed()
+        return result
+
+    def __imul__(self, count):
+        result = super().__imul__(count)
+        self._changed()
+        return result
+
+
+class _TrackedSet(set):
+    """ Set of a requirement, changing it marks the requirement as changed """
+    __slots__ = ('_owner',)
+
+    def __init__(self, items=(), owner=None):
+        # pickle creates the set from its items and restores the owner afterwards
+        super().__init__(items)
+        self._owner = owner
+
+    def _changed(self):
+        owner = getattr(self, '_owner', None)
+        if owner is not None:
+            owner.mark_changed()
+
+    def add(self, item):
+        super().add(item)
+        self._changed()
 
-    return attribute_value
+    def discard(self, item):
+        super().discard(item)
+        self._changed()
+
+    def remove(self, item):
+        super().remove(item)
+        self._changed()
+
+    def pop(self):
+        item = super().pop()
+        self._changed()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def update(self, *others):
+        super().update(*others)
+        self._changed()
+
+    def difference_update(self, *others):
+        super().difference_update(*others)
+        self._changed()
+
+    def intersection_update(self, *others):
+        super().intersection_update(*others)
+        self._changed()
+
+    def symmetric_difference_update(self, other):
+        super().symmetric_difference_update(other)
+        self._changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+
+    def __iand__(self, other):
+        result = super().__iand__(other)
+        self._changed()
+        return result
+
+    def __isub__(self, other):
+        result = super().__isub__(other)
+        self._changed()
+        return result
+
+    def __ixor__(self, other):
+        result = super().__ixor__(other)
+        self._changed()
+        return result
+
+
+class _TrackedDict(dict):
+    """ Dictonary of a requirement, changing it marks the requirement as changed """
+    __slots__ = ('_owner',)
+
+    def __init__(self, items=(), owner=None):
+        super().__init__(items)
+        self._owner = owner
+
+    def _changed(self):
+        # unpickling sets the items before the owner is restored
+        owner = getattr(self, '_owner', None)
+        if owner is not None:
+            owner.mark_changed()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+
+
+class DirtySet:
+    """ Requirements whose attributes or children changed after their tracking started """
+
+    def __init__(self, reqs: list = ()):
+        """
+        :param reqs: (opt.) requirements to track
+        """
+        # id <-> requirement, the hash of a requirement changes with its req_id
+        self._reqs = {}
+        self.track(reqs)
+
+    def track(self, reqs: list):
+        """ reports the future changes of the requirements to this set
+
+        :param reqs: requirements to track
+        """
+        for req in reqs:
+            req._dirty_set = self  # pylint: disable=protected-access
+
+    def add(self, req: 'Requirement'):
+        self._reqs[id(req)] = req
+
+    def discard(self, req: 'Requirement'):
+        self._reqs.pop(id(req), None)
+
+    def clear(self):
+        self._reqs.clear()
+
+    def __contains__(self, req):
+        return id(req) in self._reqs
+
+    def __iter__(self):
+        return iter(list(self._reqs.values()))
+
+    def __len__(self):
+        return len(self._reqs)
 
 
 # pylint: disable=too-many-instance-attributes
 class Requirement:
     """ Contains all common attributes of requirements independent of any tools. """
 
+    # the collections hold _EMPTY_SET (or None for the attachment hashes) until they are accessed
+    __slots__ = ('_children', 'parent', '_req_id', '_sort_key', '_tree_hash', '_hash_parent', '_dirty_set', '_category',
+                 '_status', '_content',
+                 '_summary', '_asil', '_links', '_satisfies', '_components', '_units', '_test_levels',
+                 '_status_customer', '_internal_status', '_updated_fields', '_customer_comments',
+                 '_review_comments', '_internal_comments', '_raw_values', '_release', '_variants',
+                 '_attachment_hashes', '_optional_flags')
+
     def __init__(self, **kwargs):
 
-        self._children = []
+        # hash of the attributes and the subtree, see requirement_comparison.tree_hash;
+        # None until computed and after the requirement or one of its descendants changed
+        self._tree_hash = None
+        # requirement whose tree hash contains the tree hash of this one, set when it is computed
+        self._hash_parent = None
+        # DirtySet the requirement reports its changes to, None if the changes are not tracked
+        self._dirty_set = None
+        self._children = _ChildList(self)
         self.parent = None
+        self._sort_key = None
+        # raw strings of the xhtml fields, allocated on the first access (field name <-> raw string)
+        self._raw_values = None
         self.req_id = None
         self.category = None
         self.status = None
         self.content = None
         self.summary = None
         self.asil = None
-        self._links = set()
+        self._links = _EMPTY_SET
         self.satisfies = None
-        self._components = set()
-        self._units = set()
-        self._test_levels = set()
+        self._components = _EMPTY_SET
+        self._units = _EMPTY_SET
+        self._test_levels = _EMPTY_SET
         self.status_customer = None
-        self._internal_status = set()
-        self._updated_fields = set()
+        self._internal_status = _EMPTY_SET
+        self._updated_fields = _EMPTY_SET
         self.customer_comments = None
         self.review_comments = None
         self.internal_comments = None
         self.release = None
-        self._variants = set()
-        self.attachment_hashes = {}
-        self._optional_flags = set()
+        self._variants = _EMPTY_SET
+        self._attachment_hashes = None
+        self._optional_flags = _EMPTY_SET
 
         self._set_attributes(**kwargs)
 
@@ -167,66 +422,199 @@ class Requirement:
                 if config.type == set:
                     # if the attributes type is list extend the
                     # instance attribute with the given value
-                    getattr(self, key).clear()
-                    getattr(self, key).update(value)
+                    collection = getattr(self, key)
+                    if isinstance(collection, frozenset):
+                        if value:
+                            setattr(self, key, _TrackedSet(value, self))
+                    else:
+                        collection.clear()
+                        collection.update(value)
                 else:
                     setattr(self, key, value)
+        self.mark_changed()
         # throw a user error with all collected invalid arguments if any
         if invalid_arguments:
             raise UserError("Tried to initialize requirement object with "
                             "invalid arguments: {}".format(invalid_arguments))
 
+    def _get_collection(self, name: str) -> set:
+        """ returns a collection of the requirement, it is allocated on the first access, so that
+        every access returns the same set; changing the set marks the requirement as changed
+
+        :param name: name of the slot holding the collection
+        :returns: the set of the requirement
+        """
+        collection = getattr(self, name)
+        if type(collection) is not _TrackedSet:  # pylint: disable=unidiomatic-typecheck
+            # the placeholder or a set that was assigned to the slot directly
+            collection = _TrackedSet(collection, self)
+            setattr(self, name, collection)
+        return collection
+
+    def mark_changed(self):
+        """ adds the requirement to its dirty set and drops the tree hashes; assignments, the
+        children and the collections of the requirement call it automatically, it only needs to be
+        called after changing an element of the requirement in place
+        """
+        if self._dirty_set is not None:
+            self._dirty_set.add(self)
+        if self._tree_hash is not None:
+            self.invalidate_tree_hash()
+
+    def invalidate_tree_hash(self):
+        """ drops the tree hash of the requirement and of all requirements whose tree hash
+        contains it, which are its ancestors at the time the hashes were computed
+        """
+        node = self
+        # the ancestors of a requirement without tree hash have none either
+        while node is not None and node._tree_hash is not None:  # pylint: disable=protected-access
+            node._tree_hash = None  # pylint: disable=protected-access
+            node = node._hash_parent  # pylint: disable=protected-access
+
     @property
     def children(self):
         return self._children
 
     @property
     def links(self):
-        return self._links
+        return self._get_collection('_links')
 
     @property
     def components(self):
-        return self._components
+        return self._get_collection('_components')
 
     @property
     def units(self):
-        return self._units
+        return self._get_collection('_units')
 
     @property
     def test_levels(self):
-        return self._test_levels
+        return self._get_collection('_test_levels')
 
     @property
     def internal_status(self):
-        return self._internal_status
+        return self._get_collection('_internal_status')
 
     @property
     def updated_fields(self):
-        return self._updated_fields
+        return self._get_collection('_updated_fields')
 
     @property
     def variants(self):
-        return self._variants
+        return self._get_collection('_variants')
 
     @property
     def optional_flags(self):
-        return self._optional_flags
+        return self._get_collection('_optional_flags')
+
+    @property
+    def attachment_hashes(self):
+        if type(self._attachment_hashes) is not _TrackedDict:  # pylint: disable=unidiomatic-typecheck
+            self._attachment_hashes = _TrackedDict(self._attachment_hashes or (), self)
+        return self._attachment_hashes
+
+    @attachment_hashes.setter
+    def attachment_hashes(self, value):
+        self._attachment_hashes = value
+        self.mark_changed()
+
+    def _get_raw_value(self, name: str) -> str:
+        """ returns the raw string of a xhtml field, converted on the first access after the field
+        was set
+
+        :param name: name of the xhtml field
+        :returns: raw string of the field
+        """
+        if self._raw_values is None:
+            self._raw_values = {}
+        elif name in self._raw_values:
+            return self._raw_values[name]
+        raw_value = self._raw_values[name] = xhtml_to_raw(getattr(self, name))
+        return raw_value
+
+    def _set_xhtml_value(self, name: str, value):
+        """ sets a xhtml field and drops its cached raw string
+
+        :param name: name of the xhtml field
+        :param value: new xhtml value
+        """
+        setattr(self, '_' + name, value)
+        if self._raw_values:
+            self._raw_values.pop(name, None)
+        self.mark_changed()
+
+    @property
+    def content(self):
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._set_xhtml_value('content', value)
+
+    @property
+    def customer_comments(self):
+        return self._customer_comments
+
+    @customer_comments.setter
+    def customer_comments(self, value):
+        self._set_xhtml_value('customer_comments', value)
+
+    @property
+    def review_comments(self):
+        return self._review_comments
+
+    @review_comments.setter
+    def review_comments(self, value):
+        self._set_xhtml_value('review_comments', value)
+
+    @property
+    def internal_comments(self):
+        return self._internal_comments
+
+    @internal_comments.setter
+    def internal_comments(self, value):
+        self._set_xhtml_value('internal_comments', value)
 
     @property
     def raw_content(self):
-        return xhtml_to_raw(self.content)
+        return self._get_raw_value('content')
 
     @property
     def raw_customer_comments(self):
-        return xhtml_to_raw(self.customer_comments)
+        return self._get_raw_value('customer_comments')
 
     @property
     def raw_review_comments(self):
-        return xhtml_to_raw(self.review_comments)
+        return self._get_raw_value('review_comments')
 
     @property
     def raw_internal_comments(self):
-        return xhtml_to_raw(self.internal_comments)
+        return self._get_raw_value('internal_comments')
+
+    @property
+    def req_id(self):
+        return self._req_id
+
+    @req_id.setter
+    def req_id(self, value):
+        self._req_id = value
+        self._sort_key = None
+        self.mark_changed()
+
+    @property
+    def sort_key(self) -> tuple:
+        """ natural sort key of the req_id, numbers are compared by their value (REQ-9 < REQ-10);
+        it is computed once and renewed when the req_id changes
+
+        :returns: tuple alternating between lower case text and numbers
+        """
+        if self._sort_key is None:
+            if self._req_id is None:
+                self._sort_key = ()
+            else:
+                self._sort_key = tuple(int(part) if part.isdigit() else part.lower()
+                                       for part in _NATURAL_SORT_PATTERN.split(self._req_id))
+        return self._sort_key
 
     @property
     def summary(self):
@@ -238,6 +626,7 @@ class Requirement:
             self._summary = get_summary_from_description(value, MAX_LENGTH_SUMMARY)
         else:
             self._summary = value
+        self.mark_changed()
 
     @property
     def satisfies(self):
@@ -249,6 +638,52 @@ class Requirement:
             self._satisfies = get_summary_from_description(value, MAX_LENGTH_SATISFIES)
         else:
             self._satisfies = value
+        self.mark_changed()
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, value):
+        self._category = value
+        self.mark_changed()
+
+    @property
+    def status(self):
+        return self._status
+
+    @status.setter
+    def status(self, value):
+        self._status = value
+        self.mark_changed()
+
+    @property
+    def asil(self):
+        return self._asil
+
+    @asil.setter
+    def asil(self, value):
+        self._asil = value
+        self.mark_changed()
+
+    @property
+    def status_customer(self):
+        return self._status_customer
+
+    @status_customer.setter
+    def status_customer(self, value):
+        self._status_customer = value
+        self.mark_changed()
+
+    @property
+    def release(self):
+        return self._release
+
+    @release.setter
+    def release(self, value):
+        self._release = value
+        self.mark_changed()
 
     def __eq__(self, other):
         if isinstance(other, Requirement):
@@ -256,13 +691,26 @@ class Requirement:
         else:
             return False
 
+    # Natural Sorting for Req IDs
+    def __lt__(self, other):
+        if isinstance(other, Requirement):
+            return self.sort_key < other.sort_key
+        return NotImplemented
+
+    def __le__(self, other):
+        if isinstance(other, Requirement):
+            return self.sort_key <= other.sort_key
+        return NotImplemented
+
     def __gt__(self, other):
-        # Natural Sorting for Req IDs
-        convert = lambda text: int(text) if text.isdigit() else text.lower()
-        alphanum_key = lambda key: [convert(c) for c in re.split('([0-9]+)', key)]
+        if isinstance(other, Requirement):
+            return self.sort_key > other.sort_key
+        return NotImplemented
 
-        # See https://docs.python.org/3.0/whatsnew/3.0.html#ordering-comparisons
-        return alphanum_key(self.req_id) > alphanum_key(other.req_id)
+    def __ge__(self, other):
+        if isinstance(other, Requirement):
+            return self.sort_key >= other.sort_key
+        return NotImplemented
 
     def __hash__(self):  # pragma: no cover
         return hash(self.req_id)
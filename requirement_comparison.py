@@ -0,0 +1,318 @@
+""" Fingerprint based comparison of the requirements read from a source and a target """
+
+import hashlib
+import re
+from enum import Enum
+from typing import Iterable, List
+
+from lxml import etree
+
+from requirements.requirement import Requirement, RequirementAttributes
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _normalize_text(value):
+    if value.__class__ is str:
+        return _WHITESPACE_PATTERN.sub(' ', value).strip()
+    return value
+
+
+def _normalize_enum(value):
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _normalize_collection(value) -> tuple:
+    return tuple(sorted([_normalize_enum(_item) for _item in value], key=str))
+
+
+def _normalize_enum_or_collection(value):
+    # test levels are configured by their enum but hold a set
+    if isinstance(value, (set, frozenset)):
+        return _normalize_collection(value)
+    return _normalize_enum(value)
+
+
+def _normalize_keys(value) -> tuple:
+    return tuple(sorted(value))
+
+
+def _get_normalizer(config) -> tuple:
+    """ returns the attribute to read and the function to normalize its value, so that equal values
+    of different tools are equal; xhtml is compared by its raw text, sets and dicts independent of
+    their order
+
+    :param config: AttributeConfig of the attribute
+    :returns: tuple of attribute name and normalize function
+    """
+    if config.type is etree.Element:
+        # raw strings are memoized by the requirement
+        return 'raw_' + config.name, _normalize_text
+    if config.type is set:
+        return config.name, _normalize_collection
+    if config.type is dict:
+        return config.name, _normalize_keys
+    if config.is_enum:
+        return config.name, _normalize_enum_or_collection
+    return config.name, _normalize_text
+
+
+_COMPARED_ATTRIBUTES = [_attr.value.name for _attr in RequirementAttributes]
+_NORMALIZERS = [_get_normalizer(_attr.value) for _attr in RequirementAttributes]
+
+
+def normalized_attributes(req: Requirement) -> tuple:
+    """ returns the normalized values of all compared attributes of a requirement
+
+    :param req: requirement to normalize
+    :returns: tuple of the normalized values in the order of RequirementAttributes
+    """
+    values = []
+    for name, normalize in _NORMALIZERS:
+        value = getattr(req, name)
+        if value:
+            value = normalize(value)
+        elif value is not None and not isinstance(value, str):
+            # empty collections, no matter if they were allocated
+            value = ()
+        values.append(value)
+    return tuple(values)
+
+
+def requirement_fingerprint(req: Requirement) -> bytes:
+    """ hashes the normalized attributes of a requirement
+
+    :param req: requirement to hash
+    :returns: digest of the normalized attributes
+    """
+    return hashlib.blake2b(repr(normalized_attributes(req)).encode('utf-8'), digest_size=16).digest()
+
+
+class ComparisonResult:
+    """ Differences between the requirements of a source and a target """
+
+    def __init__(self):
+        self.missing_in_target = []
+        self.missing_in_source = []
+        self.duplicates = []
+        # req_id <-> {attribute name: (source value, target value)}
+        self.attribute_differences = {}
+        # req_id <-> (source child ids, target child ids), req_id None for the root level
+        self.ordering_differences = {}
+        # req_id <-> (source parent id, target parent id)
+        self.parent_differences = {}
+
+    @property
+    def is_equal(self) -> bool:
+        return not (self.missing_in_target or self.missing_in_source or self.duplicates or
+                    self.attribute_differences or self.ordering_differences or
+                    self.parent_differences)
+
+
+def _index_by_req_id(reqs: Iterable[Requirement], duplicates: list) -> dict:
+    """ maps the requirements by their req_id and collects the req_ids that occur more than once
+
+    :param reqs: requirements to index
+    :param duplicates: list the duplicated req_ids are appended to
+    :returns: dictonary (req_id <-> requirement)
+    """
+    reqs_by_id = {}
+    for req in reqs:
+        if req.req_id in reqs_by_id:
+            duplicates.append(req.req_id)
+        reqs_by_id[req.req_id] = req
+    return reqs_by_id
+
+
+def _child_ids(req: Requirement) -> list:
+    return [_child.req_id for _child in req.children]
+
+
+def compare_requirements(source_reqs: Iterable[Requirement], target_reqs: Iterable[Requirement],
+                         source_roots: List[Requirement] = None,
+                         target_roots: List[Requirement] = None) -> ComparisonResult:
+    """ Compares the requirements of a source and a target, matched by their req_id. The
+    attributes are only compared in detail for requirements whose fingerprints differ.
+
+    :param source_reqs: all requirements of the source
+    :param target_reqs: all requirements of the target
+    :param source_roots: top level requirements of the source tree, to compare their order
+    :param target_roots: top level requirements of the target tree, to compare their order
+    :returns: ComparisonResult with all differences
+    """
+    result = ComparisonResult()
+    source_by_id = _index_by_req_id(source_reqs, result.duplicates)
+    target_by_id = _index_by_req_id(target_reqs, result.duplicates)
+
+    result.missing_in_target = sorted((_id for _id in source_by_id if _id not in target_by_id), key=str)
+    result.missing_in_source = sorted((_id for _id in target_by_id if _id not in source_by_id), key=str)
+
+    for req_id, source_req in source_by_id.items():
+        target_req = target_by_id.get(req_id)
+        if target_req is None:
+            continue
+
+        if requirement_fingerprint(source_req) != requirement_fingerprint(target_req):
+            differences = {
+                _name: (_source_value, _target_value)
+                for _name, _source_value, _target_value in zip(_COMPARED_ATTRIBUTES,
+                                                               normalized_attributes(source_req),
+                                                               normalized_attributes(target_req))
+                if _source_value != _target_value
+            }
+            if differences:
+                result.attribute_differences[req_id] = differences
+
+        source_children = _child_ids(source_req)
+        target_children = _child_ids(target_req)
+        if source_children != target_children:
+            result.ordering_differences[req_id] = (source_children, target_children)
+
+        source_parent = source_req.parent.req_id if source_req.parent else None
+        target_parent = target_req.parent.req_id if target_req.parent else None
+        if source_parent != target_parent:
+            result.parent_differences[req_id] = (source_parent, target_parent)
+
+    if source_roots is not None and target_roots is not None:
+        source_root_ids = [_req.req_id for _req in source_roots]
+        target_root_ids = [_req.req_id for _req in target_roots]
+        if source_root_ids != target_root_ids:
+            result.ordering_differences[None] = (source_root_ids, target_root_ids)
+
+    return result
+
+
+def tree_hash(req: Requirement) -> bytes:
+    """ hashes the attributes of a requirement together with the ordered hashes of its children.
+    The hash is kept by the requirement until it or one of its descendants changes, so only the
+    changed paths of a tree are hashed again.
+
+    :param req: root of the subtree to hash
+    :returns: digest of the subtree
+    """
+    # pylint: disable=protected-access
+    if req._tree_hash is None:
+        digest = hashlib.blake2b(requirement_fingerprint(req), digest_size=16)
+        for child in req.children:
+            digest.update(tree_hash(child))
+            # a change of the child drops this hash as well, even if its parent is not set
+            child._hash_parent = req
+        req._tree_hash = digest.digest()
+    return req._tree_hash
+
+
+def _diff_children(source_children: list, target_children: list, parent_id, result: ComparisonResult,
+                   unmatched_source: dict, unmatched_target: dict):
+    """ compares the children of two matching requirements and descends into the children whose
+    subtrees differ; children without counterpart are collected to detect moved requirements
+
+    :param source_children: children in the source tree
+    :param target_children: children in the target tree
+    :param parent_id: req_id of the parent, None for the root level
+    :param result: ComparisonResult the differences are added to
+    :param unmatched_source: dictonary of source requirements not found at the same place (req_id <-> req)
+    :param unmatched_target: dictonary of target requirements not found at the same place (req_id <-> req)
+    """
+    source_ids = [_child.req_id for _child in source_children]
+    target_ids = [_child.req_id for _child in target_children]
+    if source_ids != target_ids:
+        result.ordering_differences[parent_id] = (source_ids, target_ids)
+
+    target_by_id = {_child.req_id: _child for _child in target_children}
+    for source_child in source_children:
+        target_child = target_by_id.pop(source_child.req_id, None)
+        if target_child is None:
+            unmatched_source[source_child.req_id] = source_child
+        else:
+            _diff_subtrees(source_child, target_child, result, unmatched_source, unmatched_target)
+    unmatched_target.update(target_by_id)
+
+
+def _diff_subtrees(source_req: Requirement, target_req: Requirement, result: ComparisonResult,
+                   unmatched_source: dict, unmatched_target: dict, descend: bool = True):
+    """ compares two matching requirements and their subtrees, identical subtrees are skipped
+
+    :param source_req: requirement of the source tree
+    :param target_req: requirement of the target tree with the same req_id
+    :param result: ComparisonResult the differences are added to
+    :param unmatched_source: dictonary of source requirements not found at the same place
+    :param unmatched_target: dictonary of target requirements not found at the same place
+    :param descend: False if the children of both requirements were already collected as unmatched
+                    requirements
+    """
+    if tree_hash(source_req) == tree_hash(target_req):
+        return
+
+    if requirement_fingerprint(source_req) != requirement_fingerprint(target_req):
+        differences = {
+            _name: (_source_value, _target_value)
+            for _name, _source_value, _target_value in zip(_COMPARED_ATTRIBUTES,
+                                                           normalized_attributes(source_req),
+                                                           normalized_attributes(target_req))
+            if _source_value != _target_value
+        }
+        if differences:
+            result.attribute_differences[source_req.req_id] = differences
+
+    if descend:
+        _diff_children(source_req.children, target_req.children, source_req.req_id, result,
+                       unmatched_source, unmatched_target)
+    else:
+        source_ids = _child_ids(source_req)
+        target_ids = _child_ids(target_req)
+        if source_ids != target_ids:
+            result.ordering_differences[source_req.req_id] = (source_ids, target_ids)
+
+
+def diff_trees(source_roots: List[Requirement], target_roots: List[Requirement]) -> ComparisonResult:
+    """ Compares two requirement trees by their tree hashes. Only subtrees whose hashes differ are
+    visited, so the effort depends on the number of changes instead of the size of the trees.
+    Requirements found under another parent are reported as parent differences, requirements
+    without counterpart as missing.
+
+    :param source_roots: top level requirements of the source tree
+    :param target_roots: top level requirements of the target tree
+    :returns: ComparisonResult with all differences
+    """
+    result = ComparisonResult()
+    unmatched_source = {}
+    unmatched_target = {}
+    _diff_children(source_roots, target_roots, None, result, unmatched_source, unmatched_target)
+
+    # requirements that are not at the same place in both trees were moved or only exist in one
+    # tree; the children of the latter may have been moved, so they are matched as well
+    only_in_source = {}
+    only_in_target = {}
+    while unmatched_source or unmatched_target:
+        if unmatched_source:
+            req_id, source_req = unmatched_source.popitem()
+            target_req = unmatched_target.pop(req_id, None)
+            descend = target_req is not None
+            if target_req is None:
+                target_req = only_in_target.pop(req_id, None)
+                # the children of a requirement without counterpart are matched one by one
+                unmatched_source.update((_child.req_id, _child) for _child in source_req.children)
+                if target_req is None:
+                    only_in_source[req_id] = source_req
+                    continue
+        else:
+            req_id, target_req = unmatched_target.popitem()
+            source_req = only_in_source.pop(req_id, None)
+            unmatched_target.update((_child.req_id, _child) for _child in target_req.children)
+            if source_req is None:
+                only_in_target[req_id] = target_req
+                continue
+            descend = False
+
+        source_parent = source_req.parent.req_id if source_req.parent else None
+        target_parent = target_req.parent.req_id if target_req.parent else None
+        if source_parent != target_parent:
+            result.parent_differences[req_id] = (source_parent, target_parent)
+        _diff_subtrees(source_req, target_req, result, unmatched_source, unmatched_target,
+                       descend=descend)
+
+    result.missing_in_target = sorted(only_in_source, key=str)
+    result.missing_in_source = sorted(only_in_target, key=str)
+    return result
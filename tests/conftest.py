@@ -0,0 +1,28 @@
+""" Makes the modules of this checkout importable as the modules of the installed requirements
+package, so that the tests import them the way the package does """
+
+import importlib
+import os
+
+_CHECKOUT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# packages whose modules are part of this checkout: requirement.py, requirement_comparison.py and
+# conversion_cache.py of requirements, jira_tranceiver.py of requirements.jira and
+# reqif_tranceiver.py of requirements.reqif
+_PACKAGES = ('requirements', 'requirements.jira', 'requirements.reqif')
+
+
+def _prefer_checkout():
+    """ puts the checkout in front of the installed modules of the packages; without the installed
+    package the tests skip themselves, because its other modules are needed anyway
+    """
+    for name in _PACKAGES:
+        try:
+            package = importlib.import_module(name)
+        except ImportError:
+            return
+        if _CHECKOUT not in package.__path__:
+            package.__path__ = [_CHECKOUT] + list(package.__path__)
+
+
+_prefer_checkout()
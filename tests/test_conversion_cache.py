@@ -0,0 +1,72 @@
+""" Tests for the cache of markup conversions """
+
+import pytest
+
+# the package provides the modules this checkout depends on
+pytest.importorskip('requirements.conversion_cache')
+# pylint: disable=wrong-import-position
+
+from requirements.conversion_cache import ConversionCache
+
+
+class _Conversion:
+    """ converts a text to upper case and counts the conversions """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text: str) -> str:
+        self.calls.append(text)
+        return text.upper()
+
+
+def test_conversions_are_cached_by_direction_content_and_config():
+    cache = ConversionCache()
+    conversion = _Conversion()
+
+    assert cache.convert('jira_to_xhtml', 'text', conversion) == 'TEXT'
+    assert cache.convert('jira_to_xhtml', 'text', conversion) == 'TEXT'
+    assert conversion.calls == ['text']
+
+    # another direction, content or config is converted again
+    cache.convert('reqif_to_xhtml', 'text', conversion)
+    cache.convert('jira_to_xhtml', 'other text', conversion)
+    cache.convert('jira_to_xhtml', 'text', conversion, frozenset({'image.png'}))
+    assert len(conversion.calls) == 4
+    assert cache.stats() == {'hits': 1, 'misses': 4, 'entries': 4}
+
+
+def test_least_recently_used_conversions_are_dropped():
+    cache = ConversionCache(max_entries=2)
+    conversion = _Conversion()
+    cache.convert('jira_to_xhtml', 'a', conversion)
+    cache.convert('jira_to_xhtml', 'b', conversion)
+    cache.convert('jira_to_xhtml', 'a', conversion)
+
+    cache.convert('jira_to_xhtml', 'c', conversion)
+    assert len(cache) == 2
+    cache.convert('jira_to_xhtml', 'a', conversion)
+    cache.convert('jira_to_xhtml', 'b', conversion)
+
+    assert conversion.calls == ['a', 'b', 'c', 'b']
+
+
+def test_disabled_cache_converts_every_time():
+    cache = ConversionCache(max_entries=0)
+    conversion = _Conversion()
+
+    cache.convert('jira_to_xhtml', 'text', conversion)
+    cache.convert('jira_to_xhtml', 'text', conversion)
+
+    assert conversion.calls == ['text', 'text']
+    assert len(cache) == 0
+
+
+def test_stats_of_other_processes_are_added():
+    cache = ConversionCache()
+    cache.convert('jira_to_xhtml', 'text', _Conversion())
+    cache.add_stats(3, 2)
+
+    assert cache.stats() == {'hits': 3, 'misses': 3, 'entries': 1}
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'entries': 0}
@@ -0,0 +1,475 @@
+""" Tests for the Jira transceiver """
+
+import json
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+# the package provides the modules this checkout depends on
+pytest.importorskip('requirements.jira.jira_tranceiver')
+# pylint: disable=wrong-import-position
+
+from em_utils.exceptions import UserErrorList
+from jira import JIRAError
+
+from requirements.exceptions import UserError
+from requirements.jira import jira_tranceiver
+from requirements.jira.jira_requirement import JiraRequirement
+from requirements.jira.jira_tranceiver import JiraTranceiver
+from requirements.requirement import InternalStatus, RequirementAttributes
+from requirements.xhtml_config import DEFAULT_BREAK, DEFAULT_BOLD, DEFAULT_SUB, DEFAULT_SUP, DEFAULT_IMAGE, \
+    DEFAULT_TABLE_HEAD, DEFAULT_TABLE_ROW, DEFAULT_TABLE_CELL
+
+
+def _create_transceiver(jira_instance, components: list = None, **kwargs) -> JiraTranceiver:
+    with mock.patch.object(jira_tranceiver, 'get_child_parent_dict_from_complete_tree', return_value={}), \
+            mock.patch.object(jira_tranceiver, 'get_or_create_folder', return_value={'id': '1'}):
+        return JiraTranceiver(jira_instance, 'PRJ', 'Requirements', components or [], **kwargs)
+
+
+@pytest.fixture
+def transceiver():
+    return _create_transceiver(mock.MagicMock())
+
+
+def _node(tag: str, text: str) -> str:
+    return tag + text + tag.replace('<', '</')
+
+
+def _round_trip(transceiver, jira_str: str) -> str:
+    xhtml = JiraTranceiver._convert_jira_str(jira_str)  # pylint: disable=protected-access
+    return transceiver._prepare_content(xhtml, JiraRequirement('PRJ-1'))  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('jira_str', [
+    'plain text',
+    'a *bold* word',
+    'some _italic_ text',
+    'a -strike- b',
+    '*bold _italic_ bold*',
+    'ends with *bold*',
+    'line one\nline two',
+])
+def test_markup_round_trip(transceiver, jira_str):
+    assert _round_trip(transceiver, jira_str) == jira_str
+
+
+@pytest.mark.parametrize('jira_str, xhtml', [
+    ('a *bold* word', 'a ' + _node(DEFAULT_BOLD, 'bold') + ' word'),
+    ('x ^sup^ and ~sub~', 'x ' + _node(DEFAULT_SUP, 'sup') + ' and ' + _node(DEFAULT_SUB, 'sub')),
+    ('image !pic.png! here', 'image ' + _node(DEFAULT_IMAGE, 'pic.png') + ' here'),
+    ('2*3*4', '2*3*4'),
+])
+def test_jira_markup_to_xhtml(jira_str, xhtml):
+    assert JiraTranceiver._convert_jira_str(jira_str) == xhtml  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('jira_str', [
+    '||h1||h2||\n|c1|c2|',
+    '||h1||h2||\n|c1|c2|\n|c3|c4|',
+    '||h1||h2||\n||c2|',
+    '|not|a table|',
+    'text with | pipes |',
+])
+def test_table_round_trip(transceiver, jira_str):
+    assert _round_trip(transceiver, jira_str) == jira_str
+
+
+def test_table_needs_header_row():
+    assert DEFAULT_TABLE_HEAD not in JiraTranceiver._convert_jira_str('|a|b|\n|c|d|')  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('before, after', [('before', 'after'), ('before', ''), ('', 'after'), ('a | b', 'c | d')])
+def test_text_around_a_table_is_kept(before, after):
+    xhtml = JiraTranceiver._convert_jira_str(  # pylint: disable=protected-access
+        before + '\n||h1||h2||\n|c1|c2|\n' + after)
+    table_end = DEFAULT_TABLE_HEAD.replace('<', '</')
+
+    assert xhtml.startswith(before + DEFAULT_BREAK + DEFAULT_TABLE_HEAD)
+    assert xhtml.endswith(table_end + DEFAULT_BREAK + after)
+    table = xhtml[len(before + DEFAULT_BREAK):-len(DEFAULT_BREAK + after)]
+    assert table.count(DEFAULT_TABLE_ROW) == 2
+    assert table.count(DEFAULT_TABLE_CELL) == 4
+
+
+def test_table_body_row_with_empty_first_cell():
+    xhtml = JiraTranceiver._convert_jira_str('||h1||h2||\n||c2|')  # pylint: disable=protected-access
+    rows = xhtml.split(DEFAULT_TABLE_ROW)[1:]
+    assert len(rows) == 2
+    assert rows[1].count(DEFAULT_TABLE_CELL) == 2
+    assert 'c2' in rows[1].split(DEFAULT_TABLE_CELL)[2]
+
+
+def test_jira_markup_is_cached_per_issue(transceiver):
+    first = JiraRequirement('PRJ-1')
+    first.content = _node(DEFAULT_BOLD, 'first')
+    second = JiraRequirement('PRJ-2')
+    second.content = _node(DEFAULT_BOLD, 'second')
+
+    assert transceiver._get_jira_markup(first, 'content') == '*first*'  # pylint: disable=protected-access
+    assert transceiver._get_jira_markup(second, 'content') == '*second*'  # pylint: disable=protected-access
+    first.content = _node(DEFAULT_BOLD, 'changed')
+    assert transceiver._get_jira_markup(first, 'content') == '*changed*'  # pylint: disable=protected-access
+
+    with mock.patch.object(transceiver, '_prepare_content', wraps=transceiver._prepare_content) as prepare_content:
+        assert transceiver._get_jira_markup(first, 'content') == '*changed*'  # pylint: disable=protected-access
+        assert transceiver._get_jira_markup(second, 'content') == '*second*'  # pylint: disable=protected-access
+    assert prepare_content.call_count == 0
+
+
+def _update(transceiver, jira_req, fields: dict, update: dict = None) -> tuple:
+    """ filters the changed fields and writes them as _update_reqs does """
+    fields, update = transceiver._get_changed_fields(jira_req, fields, update or {})  # pylint: disable=protected-access
+    if fields or update:
+        transceiver._update_req(jira_req, fields, update)  # pylint: disable=protected-access
+    return fields, update
+
+
+def test_repeated_writes_compare_with_the_written_fields(transceiver):
+    transceiver._raw_issues = {'PRJ-1': {'key': 'PRJ-1', 'fields': {'summary': 'old', 'labels': ['a']}}}  # pylint: disable=protected-access
+    jira_req = JiraRequirement('PRJ-1')
+
+    with mock.patch.object(transceiver, '_put_issue') as put_issue:
+        assert _update(transceiver, jira_req, {'summary': 'old'}) == ({}, {})
+        assert _update(transceiver, jira_req, {'summary': 'new'}, {'labels': [{'set': ['a']}]}) == \
+            ({'summary': 'new'}, {})
+        # changing a field back to the value of the read has to be written again
+        assert _update(transceiver, jira_req, {'summary': 'old'}, {'labels': [{'set': ['b']}]}) == \
+            ({'summary': 'old'}, {'labels': [{'set': ['b']}]})
+        assert _update(transceiver, jira_req, {'summary': 'old'}, {'labels': [{'set': ['b']}]}) == ({}, {})
+
+    assert put_issue.call_count == 2
+
+
+def test_failed_write_keeps_the_pending_changes(transceiver):
+    transceiver._raw_issues = {'PRJ-1': {'key': 'PRJ-1', 'fields': {'summary': 'old'}}}  # pylint: disable=protected-access
+    jira_req = JiraRequirement('PRJ-1')
+    jira_req.updated_fields.add('summary')
+    fields = {'summary': 'new'}
+
+    with mock.patch.object(transceiver, '_put_issue', side_effect=JIRAError(status_code=400, text='rejected')):
+        with pytest.raises(UserError):
+            _update(transceiver, jira_req, fields)
+
+    assert fields == {'summary': 'new'}
+    assert jira_req.updated_fields == {'summary'}
+    assert transceiver._get_changed_fields(jira_req, fields, {}) == ({'summary': 'new'}, {})  # pylint: disable=protected-access
+
+
+def test_updated_fields_are_the_attributes_of_the_changed_fields(transceiver):
+    summary, description = jira_tranceiver.jconst.SUMMARY, jira_tranceiver.jconst.DESCRIPTION
+    transceiver._raw_issues = {'PRJ-1': {'key': 'PRJ-1', 'fields': {summary: 'same', description: 'old'}}}  # pylint: disable=protected-access
+    jira_req = JiraRequirement('PRJ-1')
+    jira_req.updated_fields.update({RequirementAttributes.SUMMARY, RequirementAttributes.LINKS})
+
+    with mock.patch.object(transceiver, '_put_issue', side_effect=JIRAError(status_code=400, text='rejected')):
+        with pytest.raises(UserError):
+            _update(transceiver, jira_req, {summary: 'same', description: 'new'})
+    # the failed update leaves the updated fields alone
+    assert jira_req.updated_fields == {RequirementAttributes.SUMMARY, RequirementAttributes.LINKS}
+
+    with mock.patch.object(transceiver, '_put_issue'):
+        _update(transceiver, jira_req, {summary: 'same', description: 'new'})
+    assert jira_req.updated_fields == {RequirementAttributes.CONTENT, RequirementAttributes.LINKS}
+
+
+class _FakeJira:
+    """ evaluates the JQL queries of the transceiver on a list of issues """
+
+    def __init__(self, issues: list):
+        self.issues = issues
+        self.now = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+        self.queries = []
+
+    def project_components(self, _project):
+        return [SimpleNamespace(name='A'), SimpleNamespace(name='B')]
+
+    def project(self, project):
+        return SimpleNamespace(name=project)
+
+    def server_info(self):
+        return {'serverTime': self.now.strftime('%Y-%m-%dT%H:%M:%S.%f%z')}
+
+    def myself(self):
+        return {'timeZone': 'UTC'}
+
+    def update(self, key: str, summary: str):
+        self.now += timedelta(hours=1)
+        issue = next(_issue for _issue in self.issues if _issue['key'] == key)
+        issue['fields'] = dict(issue['fields'], summary=summary, updated=self.now.strftime('%Y-%m-%dT%H:%M:%S.%f%z'))
+
+    def get_all_issues_from_query(self, jql: str, json_result: bool, fields: list = None):
+        assert json_result
+        self.queries.append(jql)
+        return [self._copy(_issue, fields) for _issue in self.issues if self._matches(_issue, jql)]
+
+    def get_jira_issues_by_id_list(self, keys: list, json_result: bool):
+        assert json_result
+        return [self._copy(_issue) for _issue in self.issues if _issue['key'] in keys]
+
+    @staticmethod
+    def _copy(issue: dict, fields: list = None) -> dict:
+        return {'key': issue['key'],
+                'fields': {_name: _value for _name, _value in issue['fields'].items() if not fields or _name in fields}}
+
+    @staticmethod
+    def _matches(issue: dict, jql: str) -> bool:
+        updated = re.search(r' AND updated >= "([^"]+)"$', jql)
+        if updated:
+            since = datetime.strptime(updated.group(1), '%Y/%m/%d %H:%M').replace(tzinfo=timezone.utc)
+            if datetime.strptime(issue['fields']['updated'], '%Y-%m-%dT%H:%M:%S.%f%z') < since:
+                return False
+            jql = jql[1:updated.start() - 1]
+        return any(all(_FakeJira._matches_clause(issue, _clause) for _clause in _selection.strip('()').split(' AND '))
+                   for _selection in jql.split(' OR '))
+
+    @staticmethod
+    def _matches_clause(issue: dict, clause: str) -> bool:
+        values = re.findall(r'"([^"]+)"', clause)
+        if clause.startswith('project ='):
+            return issue['key'].startswith(values[0] + '-')
+        if clause.startswith('component in'):
+            return any(_component in values for _component in issue['fields']['components'])
+        if clause.startswith('labels in'):
+            return any(_label in values for _label in issue['fields']['labels'])
+        if clause.startswith('issue in requirementsPath'):
+            return issue['fields']['in_folder']
+        raise AssertionError('unexpected JQL: ' + clause)
+
+
+def _issue(key: str, components: list, labels: list, in_folder: bool = False) -> dict:
+    return {'key': key, 'fields': {'summary': key, 'components': components, 'labels': labels, 'in_folder': in_folder,
+                                   'updated': '2026-01-01T10:00:00.000000+0000'}}
+
+
+def _read_issues(jira: _FakeJira, snapshot_file: str, read_reqs_from_folder: bool) -> list:
+    transceiver = _create_transceiver(jira, ['A'], labels=['L'], snapshot_file=snapshot_file,
+                                      read_reqs_from_folder=read_reqs_from_folder)
+    return sorted(transceiver._get_req_issues(), key=lambda _issue: _issue['key'])  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('read_reqs_from_folder', [False, True])
+def test_snapshot_read_matches_full_read(tmp_path, read_reqs_from_folder):
+    jira = _FakeJira([_issue('PRJ-1', ['A'], ['L']),
+                      _issue('PRJ-2', ['A'], ['L'], in_folder=True),
+                      _issue('PRJ-3', ['B'], ['L']),
+                      _issue('PRJ-4', ['A'], ['X'], in_folder=True),
+                      _issue('PRJ-5', ['A'], ['X'])])
+    snapshot_file = str(tmp_path / 'snapshot.json')
+    _read_issues(jira, snapshot_file, read_reqs_from_folder)
+
+    jira.update('PRJ-1', 'changed')
+    jira.update('PRJ-3', 'other component')
+    jira.update('PRJ-4', 'changed in folder')
+    jira.update('PRJ-5', 'other label')
+    jira.queries.clear()
+    snapshot_issues = _read_issues(jira, snapshot_file, read_reqs_from_folder)
+
+    # the snapshot read only queries the updated issues of the filter
+    assert [_query for _query in jira.queries if 'component in' in _query and 'updated >=' not in _query] == []
+    assert any('updated >=' in _query for _query in jira.queries)
+    assert snapshot_issues == _read_issues(jira, str(tmp_path / 'other.json'), read_reqs_from_folder)
+    assert [_issue['key'] for _issue in snapshot_issues] == ['PRJ-1', 'PRJ-2'] + (['PRJ-4'] if read_reqs_from_folder else [])
+
+
+def test_failed_attachment_uploads_are_reported_together(transceiver):
+    reqs = []
+    for jira_id in ('PRJ-1', 'PRJ-2', 'PRJ-3'):
+        req = JiraRequirement(jira_id, req_id='REQ-' + jira_id)
+        req.internal_status.add(InternalStatus.CREATED)
+        req.attachment_hashes['hash-' + jira_id] = 'image.png'
+        reqs.append(req)
+
+    def add_attachment(jira_id, _image, _image_hash):
+        if jira_id != 'PRJ-2':
+            raise JIRAError(status_code=400, text='rejected')
+
+    transceiver.jira_instance.add_attachment.side_effect = add_attachment
+    with pytest.raises(UserErrorList) as error_list:
+        transceiver._update_attachments(reqs)  # pylint: disable=protected-access
+
+    messages = error_list.value.get_messages()
+    assert len(messages) == 2
+    assert any('REQ-PRJ-1' in _message for _message in messages)
+    assert any('REQ-PRJ-3' in _message for _message in messages)
+    assert transceiver.jira_instance.add_attachment.call_count == 3
+
+
+def test_new_issues_are_created_in_batches():
+    jira_instance = mock.MagicMock()
+    transceiver = _create_transceiver(jira_instance, bulk_create_size=2)
+    reqs = []
+    for idx in range(5):
+        req = JiraRequirement(req_id='REQ-{}'.format(idx))
+        req.internal_status.add(InternalStatus.CREATED)
+        reqs.append(req)
+    batches = []
+
+    def create_issues(field_list, prefetch):
+        assert not prefetch
+        batches.append([_fields['summary'] for _fields in field_list])
+        if 'REQ-4' in batches[-1]:
+            raise JIRAError(status_code=400, text='rejected batch')
+        return [{'status': 'Error', 'error': 'rejected issue'} if _fields['summary'] == 'REQ-1' else
+                {'status': 'Success', 'issue': mock.Mock(key='PRJ-1' + _fields['summary'][-1])}
+                for _fields in field_list]
+
+    jira_instance.create_issues.side_effect = create_issues
+    with mock.patch.object(transceiver, '_get_fields_for_creation', lambda _req: {'summary': _req.req_id}), \
+            pytest.raises(UserErrorList) as error_list:
+        transceiver._create_new_reqs(reqs + [JiraRequirement('PRJ-9', req_id='REQ-9')])  # pylint: disable=protected-access
+
+    assert batches == [['REQ-0', 'REQ-1'], ['REQ-2', 'REQ-3'], ['REQ-4']]
+    assert [_req.jira_id for _req in reqs] == ['PRJ-10', None, 'PRJ-12', 'PRJ-13', None]
+    assert transceiver.link_map == {'REQ-0': 'PRJ-10', 'REQ-2': 'PRJ-12', 'REQ-3': 'PRJ-13'}
+    messages = error_list.value.get_messages()
+    assert len(messages) == 2
+    assert 'REQ-1' in messages[0] and 'rejected issue' in messages[0]
+    assert 'REQ-4' in messages[1] and 'rejected batch' in messages[1]
+
+
+class _FlakyJira:
+    """ fails the requests with the given errors before answering them """
+
+    def __init__(self, errors: list):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def issue(self, key: str) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return key
+
+
+def _jira_error(status_code: int, retry_after: str = None) -> JIRAError:
+    headers = {'Retry-After': retry_after} if retry_after else {}
+    return JIRAError(text='failed', status_code=status_code, response=mock.Mock(headers=headers))
+
+
+@pytest.mark.parametrize('errors, retry_server_errors, sleeps', [
+    # Retry-After is only used if it is longer than the backoff
+    ([_jira_error(429, '5'), _jira_error(503, '0')], True, [5, 1.0]),
+    ([_jira_error(429), _jira_error(502)], True, [0.5, 1.0]),
+    ([_jira_error(429)], False, [0.5]),
+])
+def test_failed_jira_requests_are_retried(monkeypatch, errors, retry_server_errors, sleeps):
+    slept = []
+    monkeypatch.setattr(jira_tranceiver.time, 'sleep', slept.append)
+    transceiver = _create_transceiver(mock.MagicMock(), max_retries=2, retry_backoff=0.5)
+    jira = _FlakyJira(errors)
+
+    assert transceiver._call_jira(jira.issue, 'PRJ-1', retry_server_errors=retry_server_errors) == 'PRJ-1'  # pylint: disable=protected-access
+    assert slept == sleeps
+    assert jira.calls == len(errors) + 1
+
+
+@pytest.mark.parametrize('errors, retry_server_errors, calls', [
+    # the retries are exhausted
+    ([_jira_error(429)] * 3, True, 3),
+    ([_jira_error(500)], False, 1),
+    ([_jira_error(400)], True, 1),
+])
+def test_failed_jira_requests_are_raised(monkeypatch, errors, retry_server_errors, calls):
+    monkeypatch.setattr(jira_tranceiver.time, 'sleep', lambda _seconds: None)
+    transceiver = _create_transceiver(mock.MagicMock(), max_retries=2, retry_backoff=0.5)
+    jira = _FlakyJira(errors)
+
+    with pytest.raises(JIRAError):
+        transceiver._call_jira(jira.issue, 'PRJ-1', retry_server_errors=retry_server_errors)  # pylint: disable=protected-access
+    assert jira.calls == calls
+
+
+def test_rate_limiter_spaces_the_requests(monkeypatch):
+    slept = []
+    monkeypatch.setattr(jira_tranceiver.time, 'monotonic', lambda: 100.0)
+    monkeypatch.setattr(jira_tranceiver.time, 'sleep', slept.append)
+    limiter = jira_tranceiver.RateLimiter(10)
+
+    for _ in range(3):
+        limiter.wait()
+
+    assert slept == pytest.approx([0.1, 0.2])
+    jira_tranceiver.RateLimiter().wait()
+    assert len(slept) == 2
+
+
+def test_transceivers_of_a_host_share_the_rate_limiter():
+    jira_instance = mock.MagicMock(server_url='https://jira.example.com/shared')
+    transceiver = _create_transceiver(jira_instance, requests_per_second=5)
+    other_transceiver = _create_transceiver(jira_instance, requests_per_second=5)
+
+    assert transceiver._rate_limiter is other_transceiver._rate_limiter  # pylint: disable=protected-access
+    assert transceiver._rate_limiter.requests_per_second == 5  # pylint: disable=protected-access
+
+
+def test_requirements_are_processed_in_a_bounded_pool():
+    transceiver = _create_transceiver(mock.MagicMock(), max_workers=2)
+    # both workers have to run at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def process(req_id: str):
+        with lock:
+            running.append(req_id)
+            max_running.append(len(running))
+        barrier.wait()
+        with lock:
+            running.remove(req_id)
+        if req_id == 'REQ-3':
+            raise UserError(req_id)
+
+    exceptions = transceiver._run_concurrently(process, ['REQ-{}'.format(_idx) for _idx in range(4)])  # pylint: disable=protected-access
+
+    assert [_exception.args[0] for _exception in exceptions] == ['REQ-3']
+    assert max(max_running) == 2
+
+
+def test_issues_of_the_read_are_not_fetched_again(transceiver):
+    raw_issue = {'key': 'PRJ-1', 'self': 'https://jira.example.com/rest/api/2/issue/1',
+                 'fields': {'summary': 'read', 'issuelinks': []}}
+    transceiver._raw_issues = {'PRJ-1': raw_issue}  # pylint: disable=protected-access
+    fetch = transceiver.jira_instance.issue
+
+    assert transceiver._get_issue('PRJ-1', fields=['issuelinks']).raw is raw_issue  # pylint: disable=protected-access
+    assert transceiver._get_issue('PRJ-1').raw is raw_issue  # pylint: disable=protected-access
+    fetch.assert_not_called()
+
+    # fields that were not read and issues that were not read are fetched
+    assert transceiver._get_issue('PRJ-1', fields=['attachment']) is fetch.return_value  # pylint: disable=protected-access
+    fetch.assert_called_once_with('PRJ-1', fields=['attachment'])
+    transceiver._get_issue('PRJ-2', fields=['issuelinks'])  # pylint: disable=protected-access
+    fetch.assert_called_with('PRJ-2', fields=['issuelinks'])
+
+
+def test_updates_are_put_without_fetching_the_issue(transceiver):
+    transceiver._put_issue('PRJ-1', {'summary': 'new'}, {'labels': [{'set': ['a']}]})  # pylint: disable=protected-access
+
+    transceiver.jira_instance.issue.assert_not_called()
+    transceiver.jira_instance._get_url.assert_called_once_with('issue/PRJ-1')  # pylint: disable=protected-access
+    _, kwargs = transceiver.jira_instance._session.put.call_args  # pylint: disable=protected-access
+    assert json.loads(kwargs['data']) == {'fields': {'summary': 'new'}, 'update': {'labels': [{'set': ['a']}]}}
+
+
+def test_only_missing_attachments_are_uploaded(transceiver):
+    transceiver._raw_issues = {'PRJ-1': {'key': 'PRJ-1', 'fields': {'attachment': []}}}  # pylint: disable=protected-access
+    req = JiraRequirement('PRJ-1', req_id='REQ-1')
+    req.updated_fields.add(RequirementAttributes.ATTACHMENT_HASHES)
+    req.attachment_hashes.update({'hash1.png': 'one.png', 'hash2.png': 'two.png', 'hash3.png': 'three.png',
+                                  'not-an-image': 'not-an-image'})
+    issue = SimpleNamespace(fields=SimpleNamespace(attachment=[SimpleNamespace(filename='hash1.png')]))
+
+    with mock.patch.object(transceiver, '_get_issue', return_value=issue) as get_issue:
+        transceiver._update_attachments([req])  # pylint: disable=protected-access
+
+    # the attachments of the issue are listed once, not once per attachment
+    get_issue.assert_called_once_with('PRJ-1', fields=['attachment'])
+    assert sorted(_call.args for _call in transceiver.jira_instance.add_attachment.call_args_list) == [
+        ('PRJ-1', 'three.png', 'hash3.png'), ('PRJ-1', 'two.png', 'hash2.png')]
+    assert 'attachment' not in transceiver._raw_issues['PRJ-1']['fields']  # pylint: disable=protected-access
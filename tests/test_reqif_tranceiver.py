@@ -0,0 +1,527 @@
+""" Tests for the ReqIF transceiver """
+
+import copy
+import io
+import pickle
+import re
+import zipfile
+from datetime import datetime
+from itertools import chain
+
+import pytest
+from lxml import etree
+
+# the package provides the modules this checkout depends on
+pytest.importorskip('requirements.reqif.reqif_tranceiver')
+# pylint: disable=wrong-import-position
+
+from requirements.reqif import reqif_tranceiver
+from requirements.reqif.reqif_tranceiver import ReqIfTransceiver
+from requirements.requirement import RequirementStatus, InternalStatus
+from requirements.xhtml_config import ALL_XHTML_DEFAULT_TAGS, BOLD_TAGS, BREAK_TAGS, DEFAULT_BOLD, DEFAULT_BREAK, \
+    ITALIC_TAGS, LIST_TAGS, LIST_TYPE_TAGS, STRIKE_TROUGH_TAGS, SUB_TAGS, SUP_TAGS
+
+_HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<REQ-IF xmlns="http://www.omg.org/spec/ReqIF/20110401/reqif.xsd" xmlns:xhtml="http://www.w3.org/1999/xhtml">
+  <CORE-CONTENT><REQ-IF-CONTENT>
+    <DATATYPES>
+      <DATATYPE-DEFINITION-STRING IDENTIFIER="dt-string" LONG-NAME="String" MAX-LENGTH="100"/>
+      <DATATYPE-DEFINITION-XHTML IDENTIFIER="dt-xhtml" LONG-NAME="XHTML"/>
+      <DATATYPE-DEFINITION-ENUMERATION IDENTIFIER="dt-status" LONG-NAME="Status"><SPECIFIED-VALUES>
+        <ENUM-VALUE IDENTIFIER="ev-new" LONG-NAME="new"/>
+        <ENUM-VALUE IDENTIFIER="ev-accepted" LONG-NAME="accepted"/>
+      </SPECIFIED-VALUES></DATATYPE-DEFINITION-ENUMERATION>
+    </DATATYPES>
+    <SPEC-TYPES>
+      <SPEC-OBJECT-TYPE IDENTIFIER="sot" LONG-NAME="Requirement"><SPEC-ATTRIBUTES>
+        <ATTRIBUTE-DEFINITION-STRING IDENTIFIER="ad-id" LONG-NAME="ID"><TYPE><DATATYPE-DEFINITION-STRING-REF>dt-string</DATATYPE-DEFINITION-STRING-REF></TYPE></ATTRIBUTE-DEFINITION-STRING>
+        <ATTRIBUTE-DEFINITION-XHTML IDENTIFIER="ad-text" LONG-NAME="ReqIF.Text"><TYPE><DATATYPE-DEFINITION-XHTML-REF>dt-xhtml</DATATYPE-DEFINITION-XHTML-REF></TYPE></ATTRIBUTE-DEFINITION-XHTML>
+        <ATTRIBUTE-DEFINITION-XHTML IDENTIFIER="ad-comment" LONG-NAME="Comment"><TYPE><DATATYPE-DEFINITION-XHTML-REF>dt-xhtml</DATATYPE-DEFINITION-XHTML-REF></TYPE></ATTRIBUTE-DEFINITION-XHTML>
+        <ATTRIBUTE-DEFINITION-ENUMERATION IDENTIFIER="ad-status" LONG-NAME="Status"><TYPE><DATATYPE-DEFINITION-ENUMERATION-REF>dt-status</DATATYPE-DEFINITION-ENUMERATION-REF></TYPE></ATTRIBUTE-DEFINITION-ENUMERATION>
+      </SPEC-ATTRIBUTES></SPEC-OBJECT-TYPE>
+    </SPEC-TYPES>
+'''
+
+_SPEC_OBJECT = '''      <SPEC-OBJECT IDENTIFIER="so-{0}" LONG-NAME="REQ-{0}" LAST-CHANGE="2020-01-01T00:00:00"><TYPE><SPEC-OBJECT-TYPE-REF>sot</SPEC-OBJECT-TYPE-REF></TYPE><VALUES>
+        <ATTRIBUTE-VALUE-STRING THE-VALUE="REQ-{0}"><DEFINITION><ATTRIBUTE-DEFINITION-STRING-REF>ad-id</ATTRIBUTE-DEFINITION-STRING-REF></DEFINITION></ATTRIBUTE-VALUE-STRING>
+        <ATTRIBUTE-VALUE-XHTML><DEFINITION><ATTRIBUTE-DEFINITION-XHTML-REF>ad-text</ATTRIBUTE-DEFINITION-XHTML-REF></DEFINITION><THE-VALUE><xhtml:div>Text of requirement {0}</xhtml:div></THE-VALUE></ATTRIBUTE-VALUE-XHTML>
+        <ATTRIBUTE-VALUE-ENUMERATION><DEFINITION><ATTRIBUTE-DEFINITION-ENUMERATION-REF>ad-status</ATTRIBUTE-DEFINITION-ENUMERATION-REF></DEFINITION><VALUES><ENUM-VALUE-REF>ev-new</ENUM-VALUE-REF></VALUES></ATTRIBUTE-VALUE-ENUMERATION>
+      </VALUES></SPEC-OBJECT>
+'''
+
+_SPEC_HIERARCHY = '''        <SPEC-HIERARCHY IDENTIFIER="sh-{0}"><OBJECT><SPEC-OBJECT-REF>so-{0}</SPEC-OBJECT-REF></OBJECT></SPEC-HIERARCHY>
+'''
+
+_FOOTER = '''  </REQ-IF-CONTENT></CORE-CONTENT>
+</REQ-IF>
+'''
+
+_ATTRIBUTE_CONFIG = {'status': 'Status', 'internal_comments': 'Comment'}
+_ACCEPTED_REF = '<ENUM-VALUE-REF>ev-accepted</ENUM-VALUE-REF>'
+_VALUE_MAPPING = {'new': RequirementStatus.NEW, 'accepted': RequirementStatus.ACCEPTED}
+
+
+def _write_reqif(path, count: int = 5) -> str:
+    """ writes a reqif document with a flat hierarchy of the given number of requirements """
+    content = _HEADER + '    <SPEC-OBJECTS>\n'
+    content += ''.join(_SPEC_OBJECT.format(_idx) for _idx in range(count))
+    content += '    </SPEC-OBJECTS>\n    <SPECIFICATIONS><SPECIFICATION IDENTIFIER="spec"><CHILDREN>\n'
+    content += ''.join(_SPEC_HIERARCHY.format(_idx) for _idx in range(count))
+    content += '    </CHILDREN></SPECIFICATION></SPECIFICATIONS>\n' + _FOOTER
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def _write_nested_reqif(path) -> str:
+    """ writes a reqif document with a nested hierarchy, a relation and a comment """
+    comment = ('<ATTRIBUTE-VALUE-XHTML><DEFINITION><ATTRIBUTE-DEFINITION-XHTML-REF>ad-comment'
+               '</ATTRIBUTE-DEFINITION-XHTML-REF></DEFINITION><THE-VALUE><xhtml:div>a comment</xhtml:div></THE-VALUE>'
+               '</ATTRIBUTE-VALUE-XHTML>\n      </VALUES></SPEC-OBJECT>')
+    content = _HEADER + '    <SPEC-OBJECTS>\n'
+    content += ''.join(_SPEC_OBJECT.format(_idx) for _idx in range(4)).replace('      </VALUES></SPEC-OBJECT>', comment, 1)
+    content += '''    </SPEC-OBJECTS>
+    <SPEC-RELATIONS><SPEC-RELATION IDENTIFIER="rel"><SOURCE><SPEC-OBJECT-REF>so-1</SPEC-OBJECT-REF></SOURCE>
+      <TARGET><SPEC-OBJECT-REF>so-3</SPEC-OBJECT-REF></TARGET></SPEC-RELATION></SPEC-RELATIONS>
+    <SPECIFICATIONS><SPECIFICATION IDENTIFIER="spec"><CHILDREN>
+      <SPEC-HIERARCHY IDENTIFIER="sh-0"><OBJECT><SPEC-OBJECT-REF>so-0</SPEC-OBJECT-REF></OBJECT><CHILDREN>
+'''
+    content += ''.join(_SPEC_HIERARCHY.format(_idx) for _idx in (2, 1))
+    content += '      </CHILDREN></SPEC-HIERARCHY>\n' + _SPEC_HIERARCHY.format(3)
+    content += '    </CHILDREN></SPECIFICATION></SPECIFICATIONS>\n' + _FOOTER
+    path.write_text(content, encoding='utf-8')
+    return str(path)
+
+
+def _describe_reqs(req_tree) -> list:
+    return [(_req.req_id, _req.reqif_id, _req.status, _req.content, _req.internal_comments, sorted(_req.links),
+             _req.parent.req_id if _req.parent else None, [_child.req_id for _child in _req.children])
+            for _req in req_tree.get_all_requirements_list()]
+
+
+def test_streaming_read_matches_dom_read(tmp_path):
+    reqif_file = _write_nested_reqif(tmp_path / 'doc.reqif')
+    attribute_config = dict(_ATTRIBUTE_CONFIG, content='ReqIF.Text')
+    dom_transceiver = ReqIfTransceiver(reqif_file, attribute_config, _VALUE_MAPPING)
+    streaming_transceiver = ReqIfTransceiver(reqif_file, attribute_config, _VALUE_MAPPING, streaming=True)
+
+    expected = _describe_reqs(dom_transceiver.read())
+    streamed_tree = streaming_transceiver.read()
+
+    # the streamed read does not load the dom
+    assert streaming_transceiver._reqif_dom is None  # pylint: disable=protected-access
+    assert _describe_reqs(streamed_tree) == expected
+    assert [_req.req_id for _req in streamed_tree.get_tree()] == ['REQ-0', 'REQ-3']
+    assert expected[0][4] == 'a comment'
+    assert expected[0][7] == ['REQ-2', 'REQ-1']
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_transceiver_can_be_pickled(tmp_path, streaming):
+    reqif_file = _write_reqif(tmp_path / 'doc.reqif')
+    transceiver = ReqIfTransceiver(reqif_file, _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming)
+    transceiver.read()
+    transceiver.write()
+
+    copy = pickle.loads(pickle.dumps(transceiver))
+
+    # the dom and the structures holding its elements are loaded again on demand
+    assert [_req.req_id for _req in copy.read().get_tree()] == ['REQ-{}'.format(_idx) for _idx in range(5)]
+    copy.write()
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_parallel_read_keeps_document_order(tmp_path, streaming):
+    reqif_file = _write_reqif(tmp_path / 'doc.reqif', count=23)
+    serial = ReqIfTransceiver(reqif_file, _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming)
+    parallel = ReqIfTransceiver(reqif_file, _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming,
+                                processes=2, chunk_size=2)
+
+    serial_ids = [_req.req_id for _req in serial.read().get_tree()]
+    parallel_ids = [_req.req_id for _req in parallel.read().get_tree()]
+
+    assert parallel_ids == serial_ids
+    assert len(parallel_ids) == 23
+
+
+def _get_req(transceiver, req_id: str):
+    return next(_req for _req in transceiver.read().get_tree() if _req.req_id == req_id)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_repeated_writes_include_changes_in_place(tmp_path, streaming):
+    reqif_path = tmp_path / 'doc.reqif'
+    transceiver = ReqIfTransceiver(_write_reqif(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming)
+    reqs = {_req.req_id: _req for _req in transceiver.read().get_tree()}
+    req = reqs['REQ-1']
+    req.status = RequirementStatus.ACCEPTED
+    other_req = reqs['REQ-2']
+    other_req.internal_status.add(InternalStatus.UPDATED)
+    other_req.status = RequirementStatus.ACCEPTED
+    transceiver.write()
+    # without the internal status UPDATED the requirement is not written
+    assert reqif_path.read_text(encoding='utf-8').count(_ACCEPTED_REF) == 1
+
+    req.internal_status.add(InternalStatus.UPDATED)
+    transceiver.write()
+    assert reqif_path.read_text(encoding='utf-8').count(_ACCEPTED_REF) == 2
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_unchanged_reqs_are_not_written_again(tmp_path, monkeypatch, streaming):
+    transceiver = ReqIfTransceiver(_write_reqif(tmp_path / 'doc.reqif'), _ATTRIBUTE_CONFIG, _VALUE_MAPPING,
+                                   streaming=streaming)
+    req = _get_req(transceiver, 'REQ-1')
+    req.internal_status.add(InternalStatus.UPDATED)
+    req.status = RequirementStatus.ACCEPTED
+    transceiver.write()
+
+    written = []
+    monkeypatch.setattr(transceiver, '_update_spec_object', lambda _req, *args: written.append(_req.req_id))
+    transceiver.write()
+    assert not written
+
+    req.links.add('REQ-2')
+    transceiver.write()
+    assert written == ['REQ-1']
+
+
+def test_write_without_changes_writes_the_file(tmp_path):
+    reqif_path = tmp_path / 'doc.reqif'
+    transceiver = ReqIfTransceiver(_write_reqif(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING)
+    transceiver.read()
+    reqif_path.unlink()
+
+    assert transceiver.write() is not None
+    assert reqif_path.read_text(encoding='utf-8').count('<SPEC-OBJECT-REF>') == 5
+
+
+def test_changed_reqs_only_writes_marked_requirements(tmp_path):
+    reqif_path = tmp_path / 'doc.reqif'
+    transceiver = ReqIfTransceiver(_write_reqif(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING,
+                                   changed_reqs_only=True)
+    reqs = {_req.req_id: _req for _req in transceiver.read().get_tree()}
+    reqs['REQ-1'].status = RequirementStatus.ACCEPTED
+    reqs['REQ-2'].status = RequirementStatus.ACCEPTED
+    # only the requirements marked as updated are written
+    reqs['REQ-1'].internal_status.add(InternalStatus.UPDATED)
+    transceiver.write()
+    assert reqif_path.read_text(encoding='utf-8').count(_ACCEPTED_REF) == 1
+
+    # the change in place marks the requirement as changed after the last write
+    reqs['REQ-2'].internal_status.add(InternalStatus.UPDATED)
+    transceiver.write()
+    assert reqif_path.read_text(encoding='utf-8').count(_ACCEPTED_REF) == 2
+
+
+def _update_reqs(transceiver):
+    """ changes the status of one requirement and the comments of another one """
+    reqs = {_req.req_id: _req for _req in transceiver.read().get_tree()}
+    reqs['REQ-1'].internal_status.add(InternalStatus.UPDATED)
+    reqs['REQ-1'].status = RequirementStatus.ACCEPTED
+    reqs['REQ-3'].internal_status.add(InternalStatus.UPDATED)
+    reqs['REQ-3'].internal_comments = 'first line<reqif-xhtml:br/>second line'
+
+
+def test_streamed_update_matches_dom_write(tmp_path):
+    dom_path = tmp_path / 'dom.reqif'
+    streamed_path = tmp_path / 'streamed.reqif'
+    dom_transceiver = ReqIfTransceiver(_write_reqif(dom_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING)
+    streaming_transceiver = ReqIfTransceiver(_write_reqif(streamed_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING,
+                                             streaming=True)
+    _update_reqs(dom_transceiver)
+    _update_reqs(streaming_transceiver)
+
+    assert dom_transceiver.write() is not None
+    # the streamed file is updated without loading the dom
+    assert streaming_transceiver.write() is None
+
+    assert streamed_path.read_bytes() == dom_path.read_bytes()
+    assert _ACCEPTED_REF in streamed_path.read_text(encoding='utf-8')
+    assert 'second line' in streamed_path.read_text(encoding='utf-8')
+
+
+class _FixedDatetime(datetime):
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2020, 1, 1)
+
+
+def test_streamed_template_matches_dom_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(reqif_tranceiver, 'datetime', _FixedDatetime)
+    template = _write_reqif(tmp_path / 'template.reqif', count=0)
+    req_tree = ReqIfTransceiver(_write_reqif(tmp_path / 'doc.reqif'), _ATTRIBUTE_CONFIG, _VALUE_MAPPING).read()
+    for req in req_tree.get_all_requirements_list():
+        req.status = RequirementStatus.NEW
+    attribute_config = dict(_ATTRIBUTE_CONFIG, content='ReqIF.Text')
+
+    written = []
+    for streaming in (False, True):
+        output_path = tmp_path / 'output_{}.reqif'.format(streaming)
+        transceiver = ReqIfTransceiver(str(output_path), attribute_config, _VALUE_MAPPING, template=template,
+                                       streaming=streaming, id_seed=1)
+        transceiver._reqTree = req_tree  # pylint: disable=protected-access
+        transceiver.write()
+        written.append(output_path.read_bytes())
+
+    assert written[1] == written[0]
+    assert written[0].count(b'<SPEC-OBJECT-REF>') == 5
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_reqifz_can_be_read_and_written(tmp_path, streaming):
+    reqif_path = tmp_path / 'doc.reqifz'
+    with zipfile.ZipFile(str(reqif_path), 'w') as archive:
+        archive.write(_write_reqif(tmp_path / 'source.reqif'), 'doc.reqif')
+    transceiver = ReqIfTransceiver(str(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming)
+    _update_reqs(transceiver)
+    transceiver.write()
+
+    with zipfile.ZipFile(str(reqif_path)) as archive:
+        assert archive.namelist() == ['doc.reqif']
+        assert _ACCEPTED_REF.encode() in archive.read('doc.reqif')
+    reqs = ReqIfTransceiver(str(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming).read()
+    assert [_req.req_id for _req in reqs.get_tree()] == ['REQ-{}'.format(_idx) for _idx in range(5)]
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_written_comments_are_appended_to_the_existing_ones(tmp_path, streaming):
+    reqif_path = tmp_path / 'doc.reqif'
+    transceiver = ReqIfTransceiver(_write_reqif(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING, streaming=streaming)
+    req = _get_req(transceiver, 'REQ-1')
+    req.internal_status.add(InternalStatus.UPDATED)
+    req.internal_comments = 'first comment'
+    transceiver.write()
+
+    req = _get_req(transceiver, 'REQ-1')
+    req.internal_status.add(InternalStatus.UPDATED)
+    req.internal_comments = 'second comment'
+    transceiver.write()
+
+    content = reqif_path.read_text(encoding='utf-8')
+    assert 'first comment' in content
+    assert 'second comment' in content
+
+
+def test_reqif_index_finds_the_elements_of_the_xpath_searches(tmp_path):
+    reqif_path = tmp_path / 'doc.reqif'
+    _write_reqif(reqif_path)
+    # a specobject that is only found by the text of its values
+    reqif_path.write_text(reqif_path.read_text(encoding='utf-8').replace(
+        'LONG-NAME="REQ-4"', 'LONG-NAME="Other"').replace(
+            '<xhtml:div>Text of requirement 4</xhtml:div>', '<xhtml:div><xhtml:p>REQ-9</xhtml:p></xhtml:div>'),
+        encoding='utf-8')
+    transceiver = ReqIfTransceiver(str(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING)
+    transceiver.read()
+    dom = transceiver._reqif_dom  # pylint: disable=protected-access
+    namespace = transceiver._namespace  # pylint: disable=protected-access
+    index = reqif_tranceiver.ReqifIndex(dom, namespace)
+
+    assert index.identifiers['so-2'] is dom.xpath('//*[@IDENTIFIER="so-2"]')[0]
+    assert index.enum_values_by_datatype['dt-status']['accepted'].get('IDENTIFIER') == 'ev-accepted'
+    assert index.get_spec_object('REQ-1') is dom.xpath('//def:SPEC-OBJECT[@LONG-NAME="REQ-1"]', namespaces=namespace)[0]
+    assert index.get_spec_object('REQ-9') is index.identifiers['so-4']
+    assert index.get_spec_object('REQ-404') is None
+
+    # elements added to the dom are found once they are added to the index
+    spec_object = copy.deepcopy(index.identifiers['so-4'])
+    spec_object.set('IDENTIFIER', 'so-new')
+    spec_object.set('LONG-NAME', 'Added')
+    spec_object.find('def:VALUES/*/*/*/*', namespace).text = 'REQ-10'
+    index.identifiers['so-4'].getparent().append(spec_object)
+    index.add(spec_object)
+    assert index.identifiers['so-new'] is spec_object
+    assert index.get_spec_object('REQ-10') is spec_object
+
+
+def _resolve_with_the_resolve_functions(content: str) -> str:
+    """ the chain of resolve functions the normalizer replaces, without images """
+    for tags, resolve in ((BOLD_TAGS, reqif_tranceiver.resolve_bold), (LIST_TAGS, reqif_tranceiver.resolve_list),
+                          (SUB_TAGS, reqif_tranceiver.resolve_sub), (SUP_TAGS, reqif_tranceiver.resolve_sup),
+                          (ITALIC_TAGS, reqif_tranceiver.resolve_italic),
+                          (STRIKE_TROUGH_TAGS, reqif_tranceiver.resolve_strikethrough),
+                          (BREAK_TAGS, reqif_tranceiver.resolve_break)):
+        if any(tag in content for tag in tags):
+            content = resolve(content)
+    for remaining_tag in re.findall(r'(</?(reqif-)?xhtml.*?/?>)', content):
+        if remaining_tag[0] not in ALL_XHTML_DEFAULT_TAGS:
+            content = content.replace(remaining_tag[0], '')
+    return content
+
+
+@pytest.mark.parametrize('content', [
+    'a  ' + _tag + 'b  c' for _tag in chain(BOLD_TAGS, LIST_TAGS, LIST_TYPE_TAGS, SUB_TAGS, SUP_TAGS, ITALIC_TAGS,
+                                           STRIKE_TROUGH_TAGS, BREAK_TAGS)
+] + [
+    'plain  text with  spaces',
+    '<xhtml:div>a <reqif-xhtml:span>b</reqif-xhtml:span>  c</xhtml:div>',
+    '<reqif-xhtml:ul><reqif-xhtml:li>one</reqif-xhtml:li><xhtml:li>two</xhtml:li></reqif-xhtml:ul>',
+    '<xhtml:ol>no list items</xhtml:ol>',
+    DEFAULT_BOLD + 'kept' + DEFAULT_BOLD.replace('<', '</') + '  ' + DEFAULT_BREAK,
+    '<xhtml:p>first</xhtml:p><xhtml:br />  <xhtml:p>second</xhtml:p>',
+])
+def test_xhtml_normalizer_matches_the_resolve_functions(content):
+    assert reqif_tranceiver.XhtmlNormalizer().normalize(content) == _resolve_with_the_resolve_functions(content)
+
+
+def test_image_hashes_are_cached_until_the_image_changes(tmp_path, monkeypatch):
+    hashed = []
+    monkeypatch.setattr(reqif_tranceiver, 'create_md5hash_of_file',
+                        lambda path: hashed.append(path) or 'hash-{}'.format(len(hashed)))
+    reqif_file = str(tmp_path / 'doc.reqif')
+    image = tmp_path / 'image.png'
+    image.write_bytes(b'image')
+    removed_image = tmp_path / 'removed.png'
+    removed_image.write_bytes(b'removed')
+
+    cache = reqif_tranceiver.ImageHashCache(reqif_file)
+    assert cache.get_hash(str(image)) == 'hash-1'
+    assert cache.get_hash(str(image)) == 'hash-1'
+    cache.get_hash(str(removed_image))
+    cache.save()
+    assert len(hashed) == 2
+
+    # the hashes are read from the file of the cache, stale entries are dropped when it is saved
+    removed_image.unlink()
+    cache = reqif_tranceiver.ImageHashCache(reqif_file)
+    assert cache.get_hash(str(image)) == 'hash-1'
+    cache.save()
+    assert len(hashed) == 2
+    assert str(removed_image) not in (tmp_path / 'doc.reqif.imagehashes.json').read_text(encoding='utf-8')
+
+    image.write_bytes(b'changed image')
+    assert reqif_tranceiver.ImageHashCache(reqif_file).get_hash(str(image)) == 'hash-3'
+
+
+def _stream(writer, element, containers: set):
+    """ writes the children of the container elements one at a time """
+    if element.tag is etree.Comment or etree.QName(element).localname not in containers:
+        writer.write(copy.deepcopy(element))
+        return
+    writer.start(element)
+    for child in element:
+        _stream(writer, child, containers)
+    writer.end(element)
+
+
+@pytest.mark.parametrize('containers', [{'ROOT'}, {'ROOT', 'LIST', 'EMPTY'}, {'ROOT', 'LIST', 'GROUP', 'EMPTY'}])
+def test_stream_writer_writes_as_pretty_print(containers):
+    root = etree.fromstring(
+        '<ROOT xmlns="urn:default" xmlns:x="urn:x" VERSION="1"><LIST><ITEM ID="1"><x:VALUE>a &lt; b</x:VALUE></ITEM>'
+        '<ITEM ID="2"/><!-- a comment --><ITEM ID="3">text<x:B>bold</x:B> tail</ITEM>'
+        '<GROUP><ITEM ID="4"/><GROUP/></GROUP></LIST>'
+        '<EMPTY>only text</EMPTY><x:LEAF/></ROOT>')
+    output = io.BytesIO()
+
+    _stream(reqif_tranceiver.ReqifStreamWriter(output), root, containers)
+
+    assert output.getvalue() == etree.tostring(root, pretty_print=True)
+
+
+def test_failed_write_keeps_the_file(tmp_path):
+    reqif_path = tmp_path / 'doc.reqif'
+    reqif_path.write_bytes(b'original')
+
+    with pytest.raises(ValueError):
+        with reqif_tranceiver._open_reqif_output(str(reqif_path)) as output:  # pylint: disable=protected-access
+            output.write(b'incomplete')
+            raise ValueError('failed')
+
+    assert reqif_path.read_bytes() == b'original'
+    assert [_path.name for _path in tmp_path.iterdir()] == ['doc.reqif']
+
+
+def _structure(element) -> tuple:
+    """ the local names, attributes and texts of an element and its children, without the namespaces """
+    return (etree.QName(element).localname, dict(element.attrib), element.text, element.tail,
+            [_structure(_child) for _child in element])
+
+
+@pytest.mark.parametrize('text', ['plain text', 'two\nlines', '\nempty\n\nlines\n', 'a < b > c', 'R&amp;D',
+                                  'line\r\nbreak', 'umlaut ä'])
+def test_xhtml_values_are_built_as_parsed_before(text):
+    parsed = etree.fromstring(
+        '<ATTRIBUTE-VALUE-XHTML><DEFINITION><ATTRIBUTE-DEFINITION-XHTML-REF>ad-text</ATTRIBUTE-DEFINITION-XHTML-REF>'
+        '</DEFINITION><THE-VALUE><xhtml:div xmlns:xhtml="http://www.w3.org/1999/xhtml">{}</xhtml:div></THE-VALUE>'
+        '</ATTRIBUTE-VALUE-XHTML>'.format(
+            text.replace('<', '&lt;').replace('>', '&gt;').replace('\n', '<xhtml:br/>')))
+
+    xhtml_value = reqif_tranceiver.ReqifNodeFactory().xhtml_value('ad-text', text)
+
+    assert _structure(xhtml_value) == _structure(parsed)
+    assert xhtml_value.tag == '{http://www.omg.org/spec/ReqIF/20110401/reqif.xsd}ATTRIBUTE-VALUE-XHTML'
+
+
+def test_spec_objects_and_hierarchies_are_built_as_parsed_before():
+    factory = reqif_tranceiver.ReqifNodeFactory()
+    spec_object = etree.fromstring(
+        '<SPEC-OBJECT LAST-CHANGE="now" IDENTIFIER="so-1" LONG-NAME="REQ-1"><TYPE><SPEC-OBJECT-TYPE-REF>sot'
+        '</SPEC-OBJECT-TYPE-REF></TYPE><VALUES></VALUES></SPEC-OBJECT>')
+    hierarchy = etree.fromstring(
+        '<SPEC-HIERARCHY IS-TABLE-INTERNAL="false" LAST-CHANGE="now" IDENTIFIER="sh-1"><OBJECT><SPEC-OBJECT-REF>so-1'
+        '</SPEC-OBJECT-REF></OBJECT><CHILDREN></CHILDREN></SPEC-HIERARCHY>')
+
+    created_spec_object = factory.spec_object('now', 'so-1', 'REQ-1', 'sot')
+    assert _structure(created_spec_object) == _structure(spec_object)
+    assert _structure(factory.hierarchy('now', 'sh-1', 'so-1')) == _structure(hierarchy)
+    # the values node is found in the created and in the parsed spec-objects
+    assert factory.get_values_node(created_spec_object) is created_spec_object[1]
+    assert factory.get_values_node(spec_object) is spec_object[1]
+    # every element is a copy of its own
+    assert factory.spec_object('now', 'so-2', 'REQ-2', 'sot') is not created_spec_object
+    assert created_spec_object.get('IDENTIFIER') == 'so-1'
+
+
+def test_seeded_id_generator_is_deterministic():
+    generator = reqif_tranceiver.ReqifIdGenerator(seed=7, batch_size=4)
+    sequence = [generator.create_id() for _ in range(10)]
+    generator = reqif_tranceiver.ReqifIdGenerator(seed=7, batch_size=4)
+
+    assert [generator.create_id() for _ in range(10)] == sequence
+    assert len(set(sequence)) == 10
+    assert all(re.fullmatch('_[a-z0-9]{8}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{4}-[a-z0-9]{12}', _id) for _id in sequence)
+    assert sequence != [reqif_tranceiver.ReqifIdGenerator(seed=8, batch_size=4).create_id() for _ in range(10)]
+
+
+def test_id_generator_skips_existing_and_issued_ids():
+    generator = reqif_tranceiver.ReqifIdGenerator(seed=7)
+    sequence = [generator.create_id() for _ in range(4)]
+
+    generator = reqif_tranceiver.ReqifIdGenerator(seed=7, existing_ids={sequence[0]: None, sequence[2]: None})
+    assert [generator.create_id() for _ in range(2)] == [sequence[1], sequence[3]]
+
+    # the same random chars drawn again do not issue the same ids again
+    generator = reqif_tranceiver.ReqifIdGenerator(seed=7, batch_size=2)
+    issued = [generator.create_id() for _ in range(2)]
+    generator._random.seed(7)  # pylint: disable=protected-access
+    assert generator.create_id() not in issued
+
+
+def test_spectype_index_looks_up_the_attribute_definitions():
+    spectypes = {'ad-status': ['Status', 'ATTRIBUTE-DEFINITION-ENUMERATION', 'dt-status'],
+                 'ad-text': ['ReqIF.Text', 'ATTRIBUTE-DEFINITION-XHTML', 'dt-xhtml'],
+                 'ad-comment': ['Comment', 'ATTRIBUTE-DEFINITION-XHTML', 'dt-xhtml'],
+                 'ad-status-2': ['Status', 'ATTRIBUTE-DEFINITION-ENUMERATION', 'dt-status-2']}
+
+    spectype_index = reqif_tranceiver.SpectypeIndex(spectypes)
+
+    for name in ('Status', 'ReqIF.Text', 'Comment', 'Missing'):
+        # the definitions of a name in document order, as a scan of all definitions finds them
+        assert spectype_index.get_ids(name) == [_id for _id, _spectype in spectypes.items() if _spectype[0] == name]
+    assert spectype_index.ids_by_datatype['dt-xhtml'] == ['ad-text', 'ad-comment']
+    assert spectype_index.get_name('ad-comment') == 'Comment'
+    assert spectype_index.get_datatype('ad-status-2') == 'dt-status-2'
+
+
+def test_status_is_updated_in_its_existing_value_node(tmp_path):
+    reqif_path = tmp_path / 'doc.reqif'
+    transceiver = ReqIfTransceiver(_write_reqif(reqif_path), _ATTRIBUTE_CONFIG, _VALUE_MAPPING)
+    req = _get_req(transceiver, 'REQ-1')
+    req.internal_status.add(InternalStatus.UPDATED)
+    req.status = RequirementStatus.ACCEPTED
+
+    transceiver.write()
+
+    spec_object = etree.parse(str(reqif_path)).find('.//{*}SPEC-OBJECT[@IDENTIFIER="so-1"]')
+    status_refs = spec_object.findall('{*}VALUES/{*}ATTRIBUTE-VALUE-ENUMERATION/{*}VALUES/{*}ENUM-VALUE-REF')
+    assert [_ref.text for _ref in status_refs] == ['ev-accepted']
@@ -0,0 +1,138 @@
+""" Tests for the Requirement class """
+
+import pickle
+import re
+
+import pytest
+from lxml import etree
+
+# the package provides the modules this checkout depends on
+pytest.importorskip('requirements.requirement')
+# pylint: disable=wrong-import-position
+
+from requirements import requirement
+from requirements.requirement import Requirement, DirtySet, InternalStatus, xhtml_to_raw
+from requirements.xhtml_config import BREAK_TAGS
+
+
+def test_collections_are_allocated_once():
+    req = Requirement(req_id='REQ-1')
+    links = req.links
+    links.add('REQ-2')
+
+    assert req.links is links
+    assert req.links == {'REQ-2'}
+    assert req.attachment_hashes is req.attachment_hashes
+
+
+def test_assignments_mark_the_requirement_as_changed():
+    req = Requirement(req_id='REQ-1')
+    dirty_set = DirtySet([req])
+    assert req not in dirty_set
+
+    req.summary = 'changed'
+
+    assert req in dirty_set
+
+
+@pytest.mark.parametrize('change', [
+    lambda req: req.internal_status.add(InternalStatus.UPDATED),
+    lambda req: req.links.update({'REQ-2'}),
+    lambda req: req.components.discard('missing'),
+    lambda req: req.test_levels.clear(),
+    lambda req: req.attachment_hashes.update(image='image'),
+])
+def test_changes_of_collections_mark_the_requirement_as_changed(change):
+    req = Requirement(req_id='REQ-1')
+    dirty_set = DirtySet([req])
+
+    change(req)
+
+    assert req in dirty_set
+
+
+def test_mark_changed_adds_the_requirement_to_the_dirty_set():
+    req = Requirement(req_id='REQ-1')
+    dirty_set = DirtySet([req])
+
+    req.mark_changed()
+
+    assert req in dirty_set
+
+
+def test_collections_stay_tracked_after_pickling():
+    req = Requirement(req_id='REQ-1')
+    req.links.add('REQ-2')
+
+    copy = pickle.loads(pickle.dumps(req))
+    dirty_set = DirtySet([copy])
+    copy.links.add('REQ-3')
+
+    assert copy.links == {'REQ-2', 'REQ-3'}
+    assert copy in dirty_set
+
+
+def _natural_sort_key(req_id: str) -> list:
+    """ the natural sort key the comparison of requirements used to build on every call """
+    return [int(_text) if _text.isdigit() else _text.lower() for _text in re.split('([0-9]+)', req_id)]
+
+
+def test_requirements_are_sorted_naturally_by_their_req_id():
+    req_ids = ['REQ-10', 'req-9', 'REQ-9a', 'REQ-1-2', 'REQ-1-10', 'ABC-100', 'REQ-010', 'REQ-', 'REQ-9']
+    reqs = [Requirement(req_id=_req_id) for _req_id in req_ids]
+
+    assert [_req.req_id for _req in sorted(reqs)] == sorted(req_ids, key=_natural_sort_key)
+    assert [_req.req_id for _req in sorted(reqs, key=lambda _req: _req.sort_key)] == \
+        sorted(req_ids, key=_natural_sort_key)
+    assert Requirement(req_id='REQ-2') < Requirement(req_id='REQ-10') <= Requirement(req_id='REQ-10')
+
+
+def test_sort_key_is_renewed_when_the_req_id_changes():
+    req = Requirement(req_id='REQ-2')
+    assert req.sort_key == ('req-', 2, '')
+    assert req.sort_key is req.sort_key
+
+    req.req_id = 'REQ-20'
+    assert req.sort_key == ('req-', 20, '')
+    assert Requirement().sort_key == ()
+
+
+def _xhtml_to_raw_by_bytes(attribute_value):
+    """ the conversion to a raw string through bytes, which xhtml_to_raw replaces """
+    if isinstance(attribute_value, etree._Element):  # pylint: disable=protected-access
+        attribute_value = etree.tostring(attribute_value, encoding='utf-8', method='xml')
+    if attribute_value is not None:
+        if not isinstance(attribute_value, bytes):
+            for break_tag in BREAK_TAGS:
+                attribute_value = attribute_value.replace(break_tag, '\n')
+            attribute_value = str.encode(attribute_value)
+        attribute_value = re.sub(b'<[^>]*>', b' ', attribute_value).decode('utf-8').strip()
+    return attribute_value
+
+
+@pytest.mark.parametrize('attribute_value', [
+    None,
+    '  plain text  ',
+    'first' + BREAK_TAGS[0] + 'second <xhtml:b>bold</xhtml:b> ä',
+    '<xhtml:div>a < b</xhtml:div>',
+    b'<xhtml:div>bytes \xc3\xa4</xhtml:div>',
+    etree.fromstring('<div xmlns="http://www.w3.org/1999/xhtml">element <b>ä</b><br/>end</div>'),
+])
+def test_xhtml_to_raw_matches_the_conversion_by_bytes(attribute_value):
+    assert xhtml_to_raw(attribute_value) == _xhtml_to_raw_by_bytes(attribute_value)
+
+
+@pytest.mark.parametrize('field', ['content', 'customer_comments', 'review_comments', 'internal_comments'])
+def test_raw_values_are_converted_once_per_assignment(monkeypatch, field):
+    converted = []
+    monkeypatch.setattr(requirement, 'xhtml_to_raw', lambda value: converted.append(value) or xhtml_to_raw(value))
+    req = Requirement(req_id='REQ-1')
+    setattr(req, field, '<xhtml:div>first</xhtml:div>')
+
+    assert getattr(req, 'raw_' + field) == 'first'
+    assert getattr(req, 'raw_' + field) == 'first'
+    assert converted == ['<xhtml:div>first</xhtml:div>']
+
+    setattr(req, field, '<xhtml:div>second</xhtml:div>')
+    assert getattr(req, 'raw_' + field) == 'second'
+    assert len(converted) == 2
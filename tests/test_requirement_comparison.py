@@ -0,0 +1,139 @@
+""" Tests for the comparison of requirement trees """
+
+import pytest
+
+# the package provides the modules this checkout depends on
+pytest.importorskip('requirements.requirement_comparison')
+# pylint: disable=wrong-import-position
+
+from requirements.requirement import ASIL, InternalStatus, Requirement, RequirementAttributes, RequirementStatus
+from requirements.requirement_comparison import compare_requirements, diff_trees, requirement_fingerprint, \
+    tree_hash
+
+
+def _build_tree(structure: list, parent: Requirement = None) -> list:
+    """ builds requirements from nested (req_id, children) tuples and returns the top level ones """
+    reqs = []
+    for req_id, children in structure:
+        req = Requirement(req_id=req_id)
+        req.parent = parent
+        for child in _build_tree(children, req):
+            req.children.append(child)
+        reqs.append(req)
+    return reqs
+
+
+def _all_reqs(roots: list) -> list:
+    reqs = []
+    for req in roots:
+        reqs.append(req)
+        reqs.extend(_all_reqs(req.children))
+    return reqs
+
+
+@pytest.mark.parametrize('source, target', [
+    # the tree is unchanged
+    ([('A', [('B', [])])], [('A', [('B', [])])]),
+    # the subtree of X is moved below M, which is moved below the new root N
+    ([('M', []), ('X', [('C', [])])], [('N', [('M', [('X', [('C', [])])])])]),
+    # the same move in the other direction
+    ([('N', [('M', [('X', [('C', [])])])])], [('M', []), ('X', [('C', [])])]),
+    # a requirement is moved from one parent to another
+    ([('A', [('B', []), ('C', [])]), ('D', [])], [('A', [('B', [])]), ('D', [('C', [])])]),
+    # a subtree is moved below a requirement that only exists in the target
+    ([('A', [('B', [('C', [])])])], [('A', [('N', [('B', [('C', [])])])])]),
+    # requirements are added and removed
+    ([('A', [('B', []), ('C', [('D', [])])])], [('A', [('B', [('E', [])])])]),
+])
+def test_diff_trees_matches_compare_requirements(source, target):
+    source_roots = _build_tree(source)
+    target_roots = _build_tree(target)
+
+    expected = compare_requirements(_all_reqs(source_roots), _all_reqs(target_roots), source_roots, target_roots)
+    result = diff_trees(source_roots, target_roots)
+
+    assert result.missing_in_target == expected.missing_in_target
+    assert result.missing_in_source == expected.missing_in_source
+    assert result.parent_differences == expected.parent_differences
+    assert result.ordering_differences == expected.ordering_differences
+    assert result.attribute_differences == expected.attribute_differences
+
+
+def test_diff_trees_finds_moved_subtree():
+    source_roots = _build_tree([('M', []), ('X', [('C', [])])])
+    target_roots = _build_tree([('N', [('M', [('X', [('C', [])])])])])
+
+    result = diff_trees(source_roots, target_roots)
+
+    assert result.missing_in_target == []
+    assert result.missing_in_source == ['N']
+    assert result.parent_differences == {'M': (None, 'N'), 'X': (None, 'M')}
+
+
+@pytest.mark.parametrize('set_parent', [True, False])
+def test_changing_links_after_hashing_changes_the_tree_hash(set_parent):
+    root = Requirement(req_id='A')
+    child = Requirement(req_id='B')
+    if set_parent:
+        child.parent = root
+    root.children.append(child)
+    unchanged_hash = tree_hash(root)
+
+    child.links.add('C')
+
+    assert tree_hash(root) != unchanged_hash
+    child.links.discard('C')
+    assert tree_hash(root) == unchanged_hash
+
+
+def _fingerprinted_req() -> Requirement:
+    req = Requirement(req_id='REQ-1')
+    req.summary = 'a summary'
+    req.content = '<xhtml:div>some <xhtml:b>text</xhtml:b></xhtml:div>'
+    req.status = RequirementStatus.IN_WORK
+    req.links.update({'REQ-2', 'REQ-3'})
+    req.attachment_hashes['hash.png'] = 'image.png'
+    return req
+
+
+@pytest.mark.parametrize('change', [
+    lambda req: setattr(req, 'summary', 'another summary'),
+    lambda req: setattr(req, 'content', '<xhtml:div>other text</xhtml:div>'),
+    lambda req: setattr(req, 'internal_comments', 'a comment'),
+    lambda req: setattr(req, 'status', RequirementStatus.ACCEPTED),
+    lambda req: setattr(req, 'asil', ASIL.B),
+    lambda req: setattr(req, 'release', '1.0'),
+    lambda req: req.links.add('REQ-4'),
+    lambda req: req.components.add('component'),
+    lambda req: req.attachment_hashes.update({'other.png': 'other.png'}),
+])
+def test_changed_attributes_change_the_fingerprint(change):
+    req = _fingerprinted_req()
+    fingerprint = requirement_fingerprint(req)
+
+    change(req)
+
+    assert requirement_fingerprint(req) != fingerprint
+
+
+@pytest.mark.parametrize('change', [
+    # whitespace, markup and order do not matter
+    lambda req: setattr(req, 'summary', '  a\n summary '),
+    lambda req: setattr(req, 'content', 'some   text'),
+    lambda req: [req.links.discard('REQ-2'), req.links.add('REQ-2')],
+    # only the names of the attachments are compared
+    lambda req: req.attachment_hashes.update({'hash.png': 'moved/image.png'}),
+    lambda req: req.components.clear(),
+    # the state of the transfer and the position in the tree are no attributes
+    lambda req: req.internal_status.add(InternalStatus.UPDATED),
+    lambda req: req.updated_fields.add(RequirementAttributes.SUMMARY),
+    lambda req: setattr(req, 'parent', Requirement(req_id='REQ-0')),
+    lambda req: req.children.append(Requirement(req_id='REQ-5')),
+])
+def test_other_changes_keep_the_fingerprint(change):
+    req = _fingerprinted_req()
+    fingerprint = requirement_fingerprint(req)
+
+    change(req)
+
+    assert requirement_fingerprint(req) == fingerprint